@@ -4,21 +4,83 @@ import uuid
 import json
 import base64
 import re # Import regex for parsing image HTML
+import hashlib
 from datetime import datetime, timedelta
-from html import escape
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLineEdit, QComboBox, QPushButton, QTextEdit, QAction, QToolBar,
-    QFileDialog, QMessageBox, QLabel, QDialog, QFormLayout, QSpinBox
+    QFileDialog, QMessageBox, QLabel, QDialog, QFormLayout, QSpinBox, QProgressBar
 )
 from PyQt5.QtGui import QFont, QImage, QTextDocument, QTextCursor, QPixmap, QTextCharFormat, QTextImageFormat
 from PyQt5.QtCore import Qt, QUrl, QMimeData, QBuffer, QIODevice
 
+# Shared modules (media store, ...) live in the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mediaStore import MediaStore
+from newsStore import NewsStore
+from articleText import write_sidecar, sidecar_path
+from imageVariants import add_image_variants
+from newsExport import ExportQueue
+from articleTemplate import render_article
+
 # Define the base directory for news HTML files.
 # This path is relative to where the Python script is executed.
 # Assuming the script is in '2.0/AI Applications/', this will save HTML files to '2.0/News/{category}/{unique_id}.html'.
 NEWS_HTML_BASE_DIR = "../2.0/News" # Corrected path to be relative to the project root
+NEWS_JSON_PATH = "Data/news.json" # Corrected path to be relative to the project root
+
+# Images live in the editor's QTextDocument as resources named
+# editor-image://<sha256 of the original bytes>/<width>x<height>; the original
+# bytes are kept once per image and only encoded into files at export time,
+# and each display size of an image is one resource, however often it is used.
+EDITOR_IMAGE_SCHEME = "editor-image"
+EDITOR_IMAGE_RE = re.compile(EDITOR_IMAGE_SCHEME + r"://([0-9a-f]{64})/\d+x\d+")
+
+def encode_image(image, fmt):
+    """Encodes a QImage (PNG, JPEG, ...) and returns the bytes. Safe off the GUI thread."""
+    buffer = QBuffer()
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, fmt)
+    data = buffer.data().data()
+    buffer.close()
+    return data
+
+def serialize_editor_images(html, image_sources, media_store):
+    """
+    Replaces editor-image:// sources with media store URLs. Each original is
+    scaled once per exported size; images shown at full size keep their
+    original bytes (and format).
+    """
+    encoded = {}
+
+    def replace(match):
+        tag = match.group(0)
+        src_match = EDITOR_IMAGE_RE.search(tag)
+        if not src_match or src_match.group(1) not in image_sources:
+            return tag
+        digest = src_match.group(1)
+        data, original = image_sources[digest]
+
+        width_match = re.search(r'width="(\d+)', tag)
+        height_match = re.search(r'height="(\d+)', tag)
+        width = int(width_match.group(1)) if width_match else original.width()
+        height = int(height_match.group(1)) if height_match else original.height()
+
+        key = (digest, width, height)
+        if key not in encoded:
+            if (width, height) == (original.width(), original.height()):
+                ext = "jpg" if data[:2] == b"\xff\xd8" else "gif" if data[:4] == b"GIF8" else "png"
+                encoded[key] = media_store.put(data, ext)
+            else:
+                scaled = original.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                if data[:2] == b"\xff\xd8":
+                    encoded[key] = media_store.put(encode_image(scaled, "JPEG"), "jpg")
+                else:
+                    encoded[key] = media_store.put(encode_image(scaled, "PNG"), "png")
+        return tag.replace(src_match.group(0), encoded[key])
+
+    return re.sub(r'<img[^>]*>', replace, html)
 
 class ImageResizeDialog(QDialog):
     """Dialog to get new dimensions for an image."""
@@ -97,6 +159,9 @@ class AdvancedNewsEditorApp(QMainWindow):
             "Food", "Fashion", "Automotive", "Space", "Culture", "Lifestyle", "Gaming" # Added more categories
         ]
 
+        # Original image bytes + decoded QImage per sha256 digest (see EDITOR_IMAGE_SCHEME)
+        self.image_sources = {}
+
         self.init_ui()
         self.apply_styles() # Apply styling after UI initialization
 
@@ -242,6 +307,17 @@ class AdvancedNewsEditorApp(QMainWindow):
         self.export_button.clicked.connect(self.export_news)
         main_layout.addWidget(self.export_button, alignment=Qt.AlignCenter) # Center the button
 
+        # --- Export progress (exports run in the background, see newsExport.py) ---
+        self.export_queue = ExportQueue(self)
+        self.export_progress = QProgressBar()
+        self.export_progress.setRange(0, 100)
+        self.export_progress.setMaximumWidth(200)
+        self.cancel_exports_button = QPushButton("Cancel Exports")
+        self.cancel_exports_button.clicked.connect(self.cancel_exports)
+        self.statusBar().addPermanentWidget(self.export_progress)
+        self.statusBar().addPermanentWidget(self.cancel_exports_button)
+        self.update_export_status()
+
     def apply_styles(self):
         # Global application styling using QSS (Qt Style Sheets)
         self.setStyleSheet("""
@@ -362,40 +438,66 @@ class AdvancedNewsEditorApp(QMainWindow):
             }
         """)
 
+    def register_image_source(self, data):
+        """Caches the original bytes of an image once. Returns its digest, or None if unreadable."""
+        digest = hashlib.sha256(data).hexdigest()
+        if digest not in self.image_sources:
+            image = QImage.fromData(data)
+            if image.isNull():
+                return None
+            self.image_sources[digest] = (data, image)
+        return digest
+
+    def create_image_format(self, digest, width, height):
+        """
+        Registers a display-sized copy of a cached original as a document resource
+        (once per image and size) and returns the image format referencing it
+        (aspect ratio is kept).
+        """
+        name = f"{EDITOR_IMAGE_SCHEME}://{digest}/{width}x{height}"
+        document = self.text_editor.document()
+        display_image = document.resource(QTextDocument.ImageResource, QUrl(name))
+        if not isinstance(display_image, QImage) or display_image.isNull():
+            original = self.image_sources[digest][1]
+            display_image = original.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            document.addResource(QTextDocument.ImageResource, QUrl(name), display_image)
+
+        image_format = QTextImageFormat()
+        image_format.setName(name)
+        image_format.setWidth(display_image.width())
+        image_format.setHeight(display_image.height())
+        return image_format
+
     def insert_image_into_editor(self, image_path=None, image_data=None):
         """
         Inserts an image into the QTextEdit, optionally resizing it.
         Image can be from a file path or raw QImage data.
         """
-        original_image = QImage()
+        data = None
         if image_path:
-            original_image.load(image_path)
-        elif image_data:
-            original_image = image_data
-
-        if original_image.isNull():
+            try:
+                with open(image_path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                data = None
+        elif image_data and not image_data.isNull():
+            data = encode_image(image_data, "PNG")
+
+        digest = self.register_image_source(data) if data else None
+        if digest is None:
             QMessageBox.warning(self, "Image Error", "Could not load image.")
             return
+        original_image = self.image_sources[digest][1]
 
         # Show resize dialog
         dialog = ImageResizeDialog(original_image.width(), original_image.height(), self)
         if dialog.exec_() == QDialog.Accepted:
             new_width, new_height = dialog.get_dimensions()
 
-            # Resize the image
-            resized_image = original_image.scaled(new_width, new_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-
-            # Convert QImage to QPixmap, then to Base64
-            buffer = QBuffer()
-            buffer.open(QIODevice.WriteOnly)
-            resized_image.save(buffer, "PNG") # Save as PNG
-            base64_data = base64.b64encode(buffer.data().data()).decode("utf-8")
-            buffer.close()
-
-            # Insert image as HTML
-            image_html = f'<img src="data:image/png;base64,{base64_data}" width="{new_width}" height="{new_height}"/>'
-            self.text_editor.insertHtml(image_html)
-            self.text_editor.insertPlainText("\n") # Add a newline after the image
+            # The document references the cached original; no base64 round trip
+            cursor = self.text_editor.textCursor()
+            cursor.insertImage(self.create_image_format(digest, new_width, new_height))
+            cursor.insertText("\n") # Add a newline after the image
 
     def insert_image_from_file(self):
         """Opens a file dialog to select and insert an image."""
@@ -440,54 +542,37 @@ class AdvancedNewsEditorApp(QMainWindow):
             char_format = cursor.charFormat()
             if char_format.isImageFormat():
                 image_format = char_format.toImageFormat()
-                image_src = image_format.name() # This will be the data:image/png;base64,... string
-                
-                # Extract base64 data and dimensions from the src string
-                if image_src.startswith("data:image/"):
-                    # Extract base64 data
+                image_src = image_format.name() # editor-image://<digest>/<width>x<height> (or a pasted data URI)
+
+                match = EDITOR_IMAGE_RE.match(image_src)
+                digest = match.group(1) if match else None
+                if digest not in self.image_sources and image_src.startswith("data:image/"):
+                    # Image pasted as HTML: decode it once and keep it as a resource from now on
                     base64_data_match = re.match(r"data:image/[^;]+;base64,(.*)", image_src)
-                    if base64_data_match:
-                        base64_only_data = base64_data_match.group(1)
-                        try:
-                            decoded_image_data = base64.b64decode(base64_only_data)
-                            qimage = QImage()
-                            qimage.loadFromData(decoded_image_data)
-
-                            # Show resize dialog with current dimensions
-                            dialog = ImageResizeDialog(qimage.width(), qimage.height(), self)
-                            if dialog.exec_() == QDialog.Accepted:
-                                new_width, new_height = dialog.get_dimensions()
-
-                                # Remove the old image
-                                cursor.beginEditBlock() # Start an edit block for undo/redo
-                                # To delete the image, we need to select it.
-                                # An image is represented as a single character.
-                                cursor.movePosition(QTextCursor.PreviousCharacter, QTextCursor.KeepAnchor)
-                                cursor.deleteChar()
-                                cursor.endEditBlock()
-
-                                # Insert the new resized image
-                                resized_image = qimage.scaled(new_width, new_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                                buffer = QBuffer()
-                                buffer.open(QIODevice.WriteOnly)
-                                resized_image.save(buffer, "PNG")
-                                new_base64_data = base64.b64encode(buffer.data().data()).decode("utf-8")
-                                buffer.close()
-
-                                new_image_format = QTextImageFormat()
-                                new_image_format.setName(f"data:image/png;base64,{new_base64_data}")
-                                new_image_format.setWidth(new_width)
-                                new_image_format.setHeight(new_height)
-
-                                self.text_editor.textCursor().insertImage(new_image_format)
-                                self.text_editor.textCursor().insertPlainText("\n") # Add a newline after the image
-                        except Exception as e:
-                            QMessageBox.critical(self, "Image Processing Error", f"Failed to process image for resizing: {e}")
-                    else:
-                        QMessageBox.warning(self, "Image Error", "Could not extract base64 data from image source.")
-                else:
-                    QMessageBox.warning(self, "Image Error", "Clicked image is not a base64 embedded image or format is unsupported for direct editing.")
+                    try:
+                        digest = self.register_image_source(base64.b64decode(base64_data_match.group(1)))
+                    except Exception:
+                        digest = None
+
+                if digest not in self.image_sources:
+                    QMessageBox.warning(self, "Image Error", "Clicked image format is unsupported for direct editing.")
+                    return
 
+                original_image = self.image_sources[digest][1]
+                current_width = int(image_format.width()) or original_image.width()
+                current_height = int(image_format.height()) or original_image.height()
+
+                # Show resize dialog with current dimensions
+                dialog = ImageResizeDialog(current_width, current_height, self)
+                if dialog.exec_() == QDialog.Accepted:
+                    new_width, new_height = dialog.get_dimensions()
+
+                    # Rescale from the cached original and swap the format of the image character
+                    cursor.beginEditBlock() # Start an edit block for undo/redo
+                    # An image is represented as a single character before the cursor.
+                    cursor.movePosition(QTextCursor.PreviousCharacter, QTextCursor.KeepAnchor)
+                    cursor.setCharFormat(self.create_image_format(digest, new_width, new_height))
+                    cursor.endEditBlock()
 
     def export_news(self):
         # Confirmation dialog
@@ -515,198 +600,157 @@ class AdvancedNewsEditorApp(QMainWindow):
             QMessageBox.warning(self, "Export Error", "Headline, content, and location cannot be empty.")
             return
 
-        unique_id = uuid.uuid4().hex
         now = datetime.now()
-        timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
-        date = now.strftime("%Y-%m-%d")
-        time_only = now.strftime("%H:%M:%S")
-
-        # Extract summary and first image for JSON
-        doc = QTextDocument()
-        doc.setHtml(editor_html) # Use original editor_html to parse for summary/image
-
-        # Get plain text for summary
-        plain_text = doc.toPlainText()
-        summary = plain_text[:200] + '...' if len(plain_text) > 200 else plain_text
-
-        # Find first image source (base64) from the original editor_html
-        img_base64 = ""
-        # Use regex to find the first <img> tag and its src attribute
-        match = re.search(r'<img[^>]+src="([^">]+)"', editor_html)
-        if match:
-            img_base64 = match.group(1)
-
-        # Ensure category directory for HTML files exists
-        # This will create 'News/{category}/' relative to the script's execution directory
-        category_dir = os.path.join(NEWS_HTML_BASE_DIR, category)
-        try:
+        # Snapshot of everything the export needs; the steps below run on the
+        # export thread and never touch the widgets.
+        article = {
+            "unique_id": uuid.uuid4().hex,
+            "headline": headline,
+            "category": category,
+            "location": location,
+            "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
+            "date": now.strftime("%Y-%m-%d"),
+            "time_only": now.strftime("%H:%M:%S"),
+            "body_html": clean_editor_html,
+            "plain_text": self.text_editor.toPlainText(), # Straight from the editor's document
+            "image_sources": dict(self.image_sources),
+        }
+
+        self.export_queue.submit(self.export_steps(), label=headline, state=article,
+                                 on_progress=self.on_export_progress, on_finished=self.on_export_finished,
+                                 on_failed=self.on_export_failed, on_cancelled=self.on_export_cancelled)
+        self.update_export_status()
+
+        # The article is handed over; start a fresh one while it is being published
+        self.clear_editor()
+
+    def export_steps(self):
+        """Steps of one export (see newsExport.ExportJob); they run on the export thread."""
+
+        def store_images(state):
+            # Write the editor's image resources (and any pasted inline base64
+            # images) into the content-addressed media store so both the article
+            # page and News.json only carry short URLs.
+            media_store = MediaStore()
+            body_html = serialize_editor_images(state["body_html"], state.pop("image_sources"), media_store)
+            state["body_html"] = media_store.rewrite_html(body_html)
+
+            # Find first image source (media URL) for the card thumbnail
+            match = re.search(r'<img[^>]+src="([^">]+)"', state["body_html"])
+            state["img_url"] = match.group(1) if match else ""
+
+        def write_page(state):
+            # Ensure category directory for HTML files exists
+            # This will create 'News/{category}/' relative to the script's execution directory
+            category_dir = os.path.join(NEWS_HTML_BASE_DIR, state["category"])
             os.makedirs(category_dir, exist_ok=True)
-        except OSError as e:
-            QMessageBox.critical(self, "Directory Creation Error",
-                                 f"Failed to create directory: {category_dir}\nError: {e}\nPlease check permissions.")
-            return
 
-        # Construct the full HTML content for the individual news page
-        # The style block within the HTML is designed to mimic newspaper-like content
-        full_html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>{escape(headline)}</title>
-<link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&display=swap" rel="stylesheet">
-<style>
-body {{
-    font-family: 'Arial', -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif, "Apple Color Emoji", "Segoe UI Emoji", "Segoe UI Symbol"; /* Changed to Arial with fallbacks for newspaper look */
-    background: #f9f9f9;
-    color: #222;
-    text-align: justify; /* Justify text for newspaper style */
-    padding: 30px; /* Increased padding for the body */
-    line-height: 1.6; /* Improved line spacing for readability */
-}}
-header {{
-    background: linear-gradient(90deg, #1e3c72 0%, #2a5298 100%);
-    color: white;
-    padding: 20px;
-    text-align: center;
-    border-radius: 8px; /* Rounded corners */
-    margin-bottom: 30px; /* Added margin below header */
-}}
-footer {{
-    background: linear-gradient(90deg, #1e3c72 0%, #2a5298 100%);
-    color: white;
-    text-align: center;
-    padding: 15px; /* Increased padding for footer */
-    margin-top: 50px; /* Increased margin above footer */
-    border-radius: 8px; /* Rounded corners */
-}}
-.container {{
-    max-width: 900px; /* Slightly wider container */
-    margin: auto;
-    padding: 40px; /* Increased padding inside the container */
-    background: #fff;
-    border-radius: 12px; /* More rounded corners for the container */
-    box-shadow: 0 6px 20px rgba(0,0,0,0.15); /* More prominent shadow for depth */
-}}
-h2 {{
-    font-size: 2.2em; /* Larger headline */
-    color: #333;
-    margin-bottom: 20px; /* Space below headline */
-    text-align: center; /* Center the headline */
-}}
-.metadata-line {{ /* New class for metadata line */
-    font-weight: bold;
-    font-style: italic;
-    margin: 15px 0 25px 0; /* Adjusted margin */
-    color: #666;
-    text-align: center; /* Center the metadata */
-    font-size: 0.95em;
-}}
-img {{
-    display: block;
-    margin: 30px auto; /* More margin around images */
-    max-width: 95%; /* Slightly larger max-width for images */
-    height: auto;
-    border-radius: 10px; /* More rounded corners for images */
-    box-shadow: 0 4px 15px rgba(0,0,0,0.1); /* Subtle shadow for images */
-}}
-p {{
-    text-align: justify; /* Justify paragraphs for newspaper style */
-    margin-bottom: 18px; /* More space between paragraphs */
-    font-size: 1.1em; /* Slightly larger paragraph text */
-    color: #444;
-}}
-/* Tailwind-like rounded corners for consistency */
-.rounded-lg {{ border-radius: 0.5rem; }}
-.shadow-lg {{ box-shadow: 0 10px 15px -3px rgba(0, 0, 0, 0.1), 0 44px 6px -2px rgba(0, 0, 0, 0.05); }}
-</style>
-</head>
-<body>
-<header>
-  <h1>Classic News</h1>
-</header>
-<div class="container">
-  <p class="metadata-line">{location} | {timestamp}</p> <!-- Display location and timestamp -->
-  <h2>{escape(headline)}</h2>
-  {clean_editor_html}
-</div>
-<footer>&copy; 2025 Classic News | Educational Demo</footer>
-</body>
-</html>"""
-
-        # Save the individual HTML file
-        html_filename = os.path.join(category_dir, f"{unique_id}.html")
-        try:
+            # Shared page template; styles come from the versioned css/article.css
+            full_html_content = render_article(state["headline"], state["body_html"], state["timestamp"],
+                                               location=state["location"])
+
+            # Save the individual HTML file (removed again if the export does not complete)
+            html_filename = os.path.join(category_dir, f"{state['unique_id']}.html")
             with open(html_filename, "w", encoding="utf-8") as f:
                 f.write(full_html_content)
-            QMessageBox.information(self, "HTML Saved", f"HTML file saved successfully to:\n{os.path.abspath(html_filename)}")
-        except IOError as e:
-            QMessageBox.critical(self, "File Save Error",
-                                 f"Failed to save HTML file: {os.path.abspath(html_filename)}\nError: {e}\nPlease check permissions.")
-            return
-        except Exception as e:
-            QMessageBox.critical(self, "File Save Error",
-                                 f"An unexpected error occurred while saving HTML: {os.path.abspath(html_filename)}\nError: {e}")
-            return
+            state["html_filename"] = html_filename
+            state["cleanup"].append(lambda: os.remove(html_filename))
 
-        # Update the central News.json file
-        # This path is relative to where the script is executed, assuming it's in 'AI Applications/'
-        json_path = "Data/news.json" # Corrected path to be relative to the project root
-        
-        news_entry = {
-            "img": img_base64,
-            "title": headline,
-            "summary": summary,
-            "category": category,
-            "date": date,
-            "Time": time_only,
-            "location": location, # Add location to JSON
-            "uniqueId": unique_id
-        }
+        def write_text_sidecar(state):
+            # Save the plain-text sidecar so summaries and other text features skip HTML parsing
+            try:
+                write_sidecar(state["html_filename"], state["plain_text"], uniqueId=state["unique_id"],
+                              title=state["headline"], category=state["category"], location=state["location"],
+                              date=state["date"], Time=state["time_only"])
+                state["cleanup"].append(lambda: os.remove(sidecar_path(state["html_filename"])))
+            except (OSError, ValueError) as e:
+                state["warnings"].append(f"Plain-text sidecar could not be written: {e}")
+
+        def build_news_entry(state):
+            plain_text = state["plain_text"]
+            state["news_entry"] = {
+                "img": state["img_url"],
+                "title": state["headline"],
+                "summary": plain_text[:200] + '...' if len(plain_text) > 200 else plain_text,
+                "category": state["category"],
+                "date": state["date"],
+                "Time": state["time_only"],
+                "location": state["location"], # Add location to JSON
+                "uniqueId": state["unique_id"]
+            }
 
-        data = []
-        if os.path.exists(json_path):
+            # Card/slider sized thumbnails (WebP + PNG fallback); skipped when Pillow is missing
             try:
-                with open(json_path, "r", encoding="utf-8") as jf:
-                    data = json.load(jf)
-                    if not isinstance(data, list):
-                        data = []
-            except json.JSONDecodeError:
-                QMessageBox.warning(self, "JSON Read Error",
-                                    f"Could not read existing News.json file: {os.path.abspath(json_path)}\nFile might be empty or corrupted. Starting with an empty list.")
-                data = []
-            except Exception as e:
-                QMessageBox.critical(self, "JSON Read Error",
-                                     f"An unexpected error occurred while reading News.json: {os.path.abspath(json_path)}\nError: {e}")
-                data = []
-
-        data.append(news_entry)
-
-        try:
-            with open(json_path, "w", encoding="utf-8") as jf:
-                json.dump(data, jf, indent=4)
-            
-            QMessageBox.information(self, "JSON Updated", "News.json updated successfully!")
-            
-            # Disable editing after export
-            self.headline_input.setEnabled(False)
-            self.category_combo.setEnabled(False)
-            self.location_input.setEnabled(False) # Disable location input
-            self.text_editor.setEnabled(False)
-            self.export_button.setEnabled(False)
-            
-            # Close the application
-            self.close()
-
-        except Exception as e:
-            QMessageBox.critical(self, "JSON Save Error", f"Could not update News.json: {os.path.abspath(json_path)}\nError: {e}")
+                add_image_variants(state["news_entry"])
+            except (OSError, ValueError) as e:
+                state["warnings"].append(f"Could not build image variants: {e}")
+
+        def append_to_index(state):
+            # Append-only write: cost does not grow with the size of the archive.
+            # This is the commit point of the export.
+            NewsStore(NEWS_JSON_PATH).append(state["news_entry"])
+
+        return [
+            ("Storing images", store_images),
+            ("Writing article page", write_page),
+            ("Writing plain-text sidecar", write_text_sidecar),
+            ("Building news entry", build_news_entry),
+            ("Updating News.json", append_to_index),
+        ]
+
+    def update_export_status(self, message=None):
+        pending = self.export_queue.pending()
+        self.cancel_exports_button.setEnabled(pending > 0)
+        if message is None:
+            message = f"{pending} export(s) in progress" if pending else "Ready"
+        self.statusBar().showMessage(message)
+
+    def on_export_progress(self, job_id, percent, step):
+        job = self.export_queue.jobs.get(job_id)
+        headline = job.label if job else ""
+        self.export_progress.setValue(percent)
+        self.update_export_status(f"Exporting \"{headline}\": {step}... ({self.export_queue.pending()} in queue)")
+
+    def on_export_finished(self, job_id, state):
+        self.export_progress.setValue(100)
+        self.update_export_status(f"Exported \"{state['headline']}\" to {os.path.abspath(state['html_filename'])}")
+        if state["warnings"]:
+            QMessageBox.warning(self, "Export Warning",
+                                f"\"{state['headline']}\" was exported, but:\n" + "\n".join(state["warnings"]))
+
+    def on_export_failed(self, job_id, error):
+        self.update_export_status()
+        QMessageBox.critical(self, "Export Error", f"Could not export the article.\nError: {error}")
+
+    def on_export_cancelled(self, job_id):
+        self.update_export_status("Export cancelled")
+
+    def cancel_exports(self):
+        """Cancels queued exports and stops the running one before it updates News.json."""
+        self.export_queue.cancel_all()
+        self.update_export_status("Cancelling exports...")
+
+    def closeEvent(self, event):
+        if self.export_queue.pending():
+            reply = QMessageBox.question(self, 'Exports in Progress',
+                                         "Some articles are still being exported. Wait for them to finish?\n"
+                                         "Choose No to cancel the exports that have not been saved yet.",
+                                         QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.Yes)
+            if reply == QMessageBox.Cancel:
+                event.ignore()
+                return
+            if reply == QMessageBox.No:
+                self.export_queue.cancel_all()
+            self.export_queue.wait_for_done()
+        super().closeEvent(event)
 
     def clear_editor(self):
-        # This method is now primarily for initial setup or if you wanted to reset without closing
+        # Resets the form for the next article (called after an export was queued)
         self.headline_input.clear()
         self.category_combo.setCurrentIndex(0)
         self.location_input.clear() # Clear location input
         self.text_editor.clear()
+        self.image_sources = {} # Queued exports keep their own copy
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
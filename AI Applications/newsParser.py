@@ -3,17 +3,26 @@ import os
 import uuid
 import json
 import base64
+import re
 from datetime import datetime, timedelta
-from html import escape
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLineEdit, QComboBox, QPushButton, QTextEdit, QAction, QToolBar,
-    QFileDialog, QMessageBox, QLabel, QDialog, QFormLayout, QSpinBox
+    QFileDialog, QMessageBox, QLabel, QDialog, QFormLayout, QSpinBox, QProgressBar
 )
 from PyQt5.QtGui import QFont, QImage, QTextDocument, QTextCursor, QPixmap
 from PyQt5.QtCore import Qt, QUrl, QMimeData, QBuffer, QIODevice
 
+# Shared modules (media store, ...) live in the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mediaStore import MediaStore
+from newsStore import NewsStore
+from articleText import write_sidecar, sidecar_path
+from imageVariants import add_image_variants
+from newsExport import ExportQueue
+from articleTemplate import render_article
+
 # Define the base directory for news files
 NEWS_BASE_DIR = "News"
 
@@ -170,6 +179,17 @@ class AdvancedNewsEditorApp(QMainWindow):
         export_button.clicked.connect(self.export_news)
         main_layout.addWidget(export_button)
 
+        # --- Export progress (exports run in the background, see newsExport.py) ---
+        self.export_queue = ExportQueue(self)
+        self.export_progress = QProgressBar()
+        self.export_progress.setRange(0, 100)
+        self.export_progress.setMaximumWidth(200)
+        self.cancel_exports_button = QPushButton("Cancel Exports")
+        self.cancel_exports_button.clicked.connect(self.cancel_exports)
+        self.statusBar().addPermanentWidget(self.export_progress)
+        self.statusBar().addPermanentWidget(self.cancel_exports_button)
+        self.update_export_status()
+
     def insert_image_into_editor(self, image_path=None, image_data=None):
         """
         Inserts an image into the QTextEdit, optionally resizing it.
@@ -248,147 +268,133 @@ class AdvancedNewsEditorApp(QMainWindow):
             QMessageBox.warning(self, "Export Error", "Headline and content cannot be empty.")
             return
 
-        unique_id = uuid.uuid4().hex
         now = datetime.now()
-        timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
-        date = now.strftime("%Y-%m-%d")
-        time_only = now.strftime("%H:%M:%S")
-
-        # Extract summary and first image for JSON
-        # This requires parsing the HTML content
-        doc = QTextDocument()
-        doc.setHtml(editor_html)
-
-        # Get plain text for summary
-        plain_text = doc.toPlainText()
-        summary = plain_text[:200] + '...' if len(plain_text) > 200 else plain_text
-
-        # Find first image source (base64)
-        img_base64 = ""
-        # QTextDocument doesn't directly expose image sources from HTML.
-        # We'll need to parse the HTML string to find the first img src.
-        # A simple regex or BeautifulSoup could be used here for robustness.
-        # For simplicity, let's assume the first <img> tag's src is what we need.
-        import re
-        match = re.search(r'<img[^>]+src="([^">]+)"', editor_html)
-        if match:
-            img_base64 = match.group(1)
-
-
-        # Ensure category directory exists
-        category_dir = os.path.join(NEWS_BASE_DIR, category)
-        os.makedirs(category_dir, exist_ok=True)
-
-        # Construct the full HTML content for the individual news page
-        full_html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>{escape(headline)}</title>
-<style>
-body {{
-    font-family: 'Inter', sans-serif; /* Using Inter font */
-    background: #f9f9f9;
-    color: #222;
-    padding: 20px;
-}}
-header {{
-    background: linear-gradient(90deg, #1e3c72 0%, #2a5298 100%);
-    color: white;
-    padding: 20px;
-    text-align: center;
-    border-radius: 8px; /* Rounded corners */
-}}
-footer {{
-    background: linear-gradient(90deg, #1e3c72 0%, #2a5298 100%);
-    color: white;
-    text-align: center;
-    padding: 10px;
-    margin-top: 40px;
-    border-radius: 8px; /* Rounded corners */
-}}
-.container {{
-    max-width: 800px;
-    margin: auto;
-    padding: 20px;
-    background: #fff;
-    border-radius: 8px; /* Rounded corners */
-    box-shadow: 0 4px 12px rgba(0,0,0,0.1);
-}}
-img {{
-    display: block;
-    margin: 20px auto;
-    max-width: 90%;
-    height: auto;
-    border-radius: 8px; /* Rounded corners */
-}}
-p {{
-    text-align: justify;
-    margin-bottom: 16px;
-}}
-.date-line {{
-    font-weight: bold;
-    font-style: italic;
-    margin: 20px 0;
-}}
-/* Tailwind-like rounded corners for consistency */
-.rounded-lg {{ border-radius: 0.5rem; }}
-.shadow-lg {{ box-shadow: 0 10px 15px -3px rgba(0, 0, 0, 0.1), 0 4px 6px -2px rgba(0, 0, 0, 0.05); }}
-</style>
-</head>
-<body>
-<header>
-  <h1>Classic News</h1>
-</header>
-<div class="container">
-  <p class="date-line">{timestamp}</p>
-  <h2>{escape(headline)}</h2>
-  {editor_html}
-</div>
-<footer>&copy; 2025 Classic News | Educational Demo</footer>
-</body>
-</html>"""
-
-        # Save the individual HTML file
-        html_filename = os.path.join(category_dir, f"{unique_id}.html")
-        try:
-            with open(html_filename, "w", encoding="utf-8") as f:
-                f.write(full_html_content)
-        except Exception as e:
-            QMessageBox.critical(self, "File Save Error", f"Could not save HTML file: {e}")
-            return
-
-        # Update the central News.json file
-        json_path = os.path.join(NEWS_BASE_DIR, "News.json")
-        news_entry = {
-            "img": img_base64,
-            "title": headline,
-            "summary": summary,
+        # Everything the export needs is copied here; the steps run on the export thread
+        article = {
+            "unique_id": uuid.uuid4().hex,
+            "headline": headline,
             "category": category,
-            "date": date,
-            "Time": time_only
+            "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
+            "date": now.strftime("%Y-%m-%d"),
+            "time_only": now.strftime("%H:%M:%S"),
+            "body_html": editor_html,
+            "plain_text": self.text_editor.toPlainText(),
         }
 
-        data = []
-        if os.path.exists(json_path):
+        self.export_queue.submit(self.export_steps(), label=headline, state=article,
+                                 on_progress=self.on_export_progress, on_finished=self.on_export_finished,
+                                 on_failed=self.on_export_failed, on_cancelled=self.on_export_cancelled)
+        self.update_export_status()
+        self.clear_editor()
+
+    def export_steps(self):
+        """Steps of one export (see newsExport.ExportJob); they run on the export thread."""
+
+        def store_images(state):
+            # Write inline base64 images once into the media store and reference them by URL
+            state["body_html"] = MediaStore().rewrite_html(state["body_html"])
+
+            # Find first image source (media URL)
+            match = re.search(r'<img[^>]+src="([^">]+)"', state["body_html"])
+            state["img_url"] = match.group(1) if match else ""
+
+        def write_page(state):
+            # Ensure category directory exists
+            category_dir = os.path.join(NEWS_BASE_DIR, state["category"])
+            os.makedirs(category_dir, exist_ok=True)
+
+            # Shared page template; styles come from the versioned css/article.css
+            full_html_content = render_article(state["headline"], state["body_html"], state["timestamp"])
+
+            # Save the individual HTML file (removed again if the export does not complete)
+            html_filename = os.path.join(category_dir, f"{state['unique_id']}.html")
+            with open(html_filename, "w", encoding="utf-8") as f:
+                f.write(full_html_content)
+            state["html_filename"] = html_filename
+            state["cleanup"].append(lambda: os.remove(html_filename))
+
+        def write_text_sidecar(state):
+            # Plain-text sidecar next to the page (text, word count, paragraph offsets)
+            try:
+                write_sidecar(state["html_filename"], state["plain_text"], uniqueId=state["unique_id"],
+                              title=state["headline"], category=state["category"], date=state["date"],
+                              Time=state["time_only"])
+                state["cleanup"].append(lambda: os.remove(sidecar_path(state["html_filename"])))
+            except (OSError, ValueError) as e:
+                state["warnings"].append(f"Could not save plain-text sidecar: {e}")
+
+        def build_news_entry(state):
+            plain_text = state["plain_text"]
+            state["news_entry"] = {
+                "img": state["img_url"],
+                "title": state["headline"],
+                "summary": plain_text[:200] + '...' if len(plain_text) > 200 else plain_text,
+                "category": state["category"],
+                "date": state["date"],
+                "Time": state["time_only"],
+                "uniqueId": state["unique_id"]
+            }
+
+            # Card/slider sized thumbnails (WebP + PNG fallback); skipped when Pillow is missing
             try:
-                with open(json_path, "r", encoding="utf-8") as jf:
-                    data = json.load(jf)
-                    if not isinstance(data, list):
-                        data = []
-            except json.JSONDecodeError:
-                data = []
-
-        data.append(news_entry)
-
-        try:
-            with open(json_path, "w", encoding="utf-8") as jf:
-                json.dump(data, jf, indent=4)
-            QMessageBox.information(self, "Success", "News exported and JSON updated successfully!")
-            self.clear_editor()
-        except Exception as e:
-            QMessageBox.critical(self, "JSON Save Error", f"Could not update News.json: {e}")
+                add_image_variants(state["news_entry"])
+            except (OSError, ValueError) as e:
+                state["warnings"].append(f"Could not build image variants: {e}")
+
+        def append_to_index(state):
+            # Update the central News.json file (the commit point of the export)
+            NewsStore(os.path.join(NEWS_BASE_DIR, "News.json")).append(state["news_entry"])
+
+        return [
+            ("Storing images", store_images),
+            ("Writing article page", write_page),
+            ("Writing plain-text sidecar", write_text_sidecar),
+            ("Building news entry", build_news_entry),
+            ("Updating News.json", append_to_index),
+        ]
+
+    def update_export_status(self, message=None):
+        pending = self.export_queue.pending()
+        self.cancel_exports_button.setEnabled(pending > 0)
+        if message is None:
+            message = f"{pending} export(s) in progress" if pending else "Ready"
+        self.statusBar().showMessage(message)
+
+    def on_export_progress(self, job_id, percent, step):
+        self.export_progress.setValue(percent)
+        self.update_export_status(f"{step}... ({self.export_queue.pending()} export(s) in queue)")
+
+    def on_export_finished(self, job_id, state):
+        self.export_progress.setValue(100)
+        self.update_export_status(f"Exported \"{state['headline']}\"")
+        if state["warnings"]:
+            QMessageBox.warning(self, "Export Warning",
+                                f"\"{state['headline']}\" was exported, but:\n" + "\n".join(state["warnings"]))
+
+    def on_export_failed(self, job_id, error):
+        self.update_export_status()
+        QMessageBox.critical(self, "Export Error", f"Could not export news: {error}")
+
+    def on_export_cancelled(self, job_id):
+        self.update_export_status("Export cancelled")
+
+    def cancel_exports(self):
+        self.export_queue.cancel_all()
+        self.update_export_status("Cancelling exports...")
+
+    def closeEvent(self, event):
+        if self.export_queue.pending():
+            reply = QMessageBox.question(self, 'Exports in Progress',
+                                         "Some articles are still being exported. Wait for them to finish?\n"
+                                         "Choose No to cancel the exports that have not been saved yet.",
+                                         QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.Yes)
+            if reply == QMessageBox.Cancel:
+                event.ignore()
+                return
+            if reply == QMessageBox.No:
+                self.export_queue.cancel_all()
+            self.export_queue.wait_for_done()
+        super().closeEvent(event)
 
     def clear_editor(self):
         self.headline_input.clear()
@@ -0,0 +1,157 @@
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Shared modules live in the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+from appConfig import load_config, resolve_news_html_dir
+from articleText import read_local_article
+from newsStore import NewsStore
+from summaryCache import SummaryCache, summary_cache_key
+from summarizer import create_summarizer
+
+# Pre-summarizes the archive so the site can answer /summarize from the cache.
+#
+# Articles come from the news index (default) or from walking the News/ tree.
+# Summaries are written to the same SQLite summary store the server reads, one
+# at a time, so an interrupted run simply resumes: anything already in the
+# store is skipped on the next run.
+#
+# Usage:
+#   python "General Applications/batchSummarize.py" --workers 4 --rate 2
+#   python "General Applications/batchSummarize.py" --source tree --dry-run
+
+
+class RateLimiter:
+    """Spaces calls evenly so at most `rate` start per second across all threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def articles_from_index(news_dir):
+    for entry in NewsStore().load():
+        if entry.get("uniqueId") and entry.get("category"):
+            yield entry["uniqueId"], os.path.join(news_dir, entry["category"], f"{entry['uniqueId']}.html")
+
+
+def articles_from_tree(news_dir):
+    for dirpath, _, filenames in os.walk(news_dir):
+        for name in sorted(filenames):
+            if name.endswith(".html"):
+                yield name[:-len(".html")], os.path.join(dirpath, name)
+
+
+def summarize_with_retries(summarizer, text, limiter, retries, backoff):
+    """Calls the LLM, retrying failures with exponential backoff and jitter."""
+    for attempt in range(retries + 1):
+        limiter.wait()
+        try:
+            return summarizer.summarize(text)
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * (2 ** attempt) * (1 + random.random()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize every article that has no cached summary yet.")
+    parser.add_argument("--source", choices=("index", "tree"), default="index",
+                        help="Take articles from the news index or by walking the News/ directory")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent LLM calls")
+    parser.add_argument("--rate", type=float, default=1.0, help="Max LLM calls started per second (0 = unlimited)")
+    parser.add_argument("--retries", type=int, default=3, help="Retries per article after a failed call")
+    parser.add_argument("--backoff", type=float, default=2.0, help="Initial retry delay in seconds")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after this many articles (0 = all)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Use the local stub LLM and do not write to the summary store")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(PROJECT_ROOT, ".env"))
+    config = load_config()
+    news_dir = resolve_news_html_dir(config)
+
+    # Cache keys always use the configured backend, so a dry run reports exactly
+    # what a real run would summarize.
+    summarizer = create_summarizer(config, os.getenv("GOOGLE_API_KEY"))
+    version = summarizer.cache_version()
+    if args.dry_run:
+        summarizer = create_summarizer(config, backend="stub")
+    cache = SummaryCache()
+
+    source = articles_from_index(news_dir) if args.source == "index" else articles_from_tree(news_dir)
+    todo = []
+    skipped = missing = 0
+    for unique_id, path in source:
+        try:
+            text = read_local_article(path)
+        except (OSError, ValueError) as e:
+            print(f"{unique_id}: cannot read article ({e})")
+            missing += 1
+            continue
+        key = summary_cache_key(text, *version)
+        if cache.contains(key):
+            skipped += 1
+            continue
+        todo.append((unique_id, key, text))
+        if args.limit and len(todo) >= args.limit:
+            break
+
+    print(f"{len(todo)} to summarize, {skipped} already summarized, {missing} unreadable"
+          + (" (dry run, stub LLM)" if args.dry_run else ""))
+    if not todo:
+        return 0
+
+    limiter = RateLimiter(args.rate)
+    started = time.perf_counter()
+    done = failed = 0
+
+    def work(item):
+        unique_id, key, text = item
+        summary = summarize_with_retries(summarizer, text, limiter, args.retries, args.backoff)
+        if not args.dry_run:
+            cache.put(key, summary)
+        return unique_id
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(work, item): item[0] for item in todo}
+        for future in as_completed(futures):
+            try:
+                future.result()
+                done += 1
+            except Exception as e:
+                failed += 1
+                print(f"{futures[future]}: failed after {args.retries} retries ({e})")
+
+            finished = done + failed
+            if finished % 10 == 0 or finished == len(todo):
+                elapsed = time.perf_counter() - started
+                rate = finished / elapsed if elapsed else 0.0
+                eta = (len(todo) - finished) / rate if rate else 0.0
+                print(f"[{finished}/{len(todo)}] {rate:.2f} articles/s, ETA {eta:.0f}s")
+
+    elapsed = time.perf_counter() - started
+    print(f"Summarized {done}, failed {failed} in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.2f} articles/s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+import os
+import sys
+import time
+import argparse
+
+# Shared modules live in the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+from assetPipeline import DIST_DIR, AssetPipeline, brotli
+
+# Minifies, fingerprints and precompresses the static files into dist/
+# (see assetPipeline.py). app.py serves dist/ when it exists.
+#
+# Usage:
+#   python "General Applications/buildAssets.py"
+#   python "General Applications/buildAssets.py" --force
+#
+# Brotli siblings (.br) need the optional Brotli package: pip install Brotli
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build minified, fingerprinted and precompressed static assets.")
+    parser.add_argument("--dist-dir", default=DIST_DIR, help="Output directory")
+    parser.add_argument("--force", action="store_true", help="Rebuild files whose sources did not change")
+    args = parser.parse_args()
+
+    if brotli is None:
+        print("Brotli is not installed; writing gzip variants only (pip install Brotli).")
+
+    started = time.perf_counter()
+    stats = AssetPipeline(dist_dir=args.dist_dir).build(force=args.force)
+    print(f"{stats['files']} files: {stats['built']} built, {stats['skipped']} unchanged, "
+          f"{stats['removed']} removed in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import os
+import sys
+import argparse
+
+# Shared modules live in the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+from imageVariants import add_image_variants, variants_available
+from mediaStore import MediaStore
+from newsStore import NewsStore
+
+# Generates card/slider image variants for news index entries exported before
+# the editors produced them. Updated entries are appended to the news store,
+# replacing the old record with the same uniqueId.
+#
+# Usage:
+#   python "General Applications/buildImageVariants.py"
+#   python "General Applications/buildImageVariants.py" --force
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build card/slider image variants for the news index.")
+    parser.add_argument("--force", action="store_true", help="Rebuild variants that already exist")
+    args = parser.parse_args()
+
+    if not variants_available():
+        print("Pillow is not installed (pip install Pillow).")
+        return 1
+
+    news_store = NewsStore()
+    media = MediaStore()
+    updated = skipped = failed = 0
+    for entry in news_store.load():
+        if not entry.get("uniqueId") or (entry.get("imgVariants") and not args.force):
+            skipped += 1
+            continue
+        try:
+            if add_image_variants(entry, media):
+                news_store.append(entry)
+                updated += 1
+            else:
+                skipped += 1  # Image is not in the media store (run migrateImages.py first)
+        except (OSError, ValueError) as e:
+            print(f"{entry['uniqueId']}: {e}")
+            failed += 1
+
+    print(f"Entries updated: {updated}, skipped: {skipped}, failed: {failed}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
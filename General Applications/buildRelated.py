@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+import argparse
+
+# Shared modules live in the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+from appConfig import load_config, resolve_news_html_dir
+from newsStore import NewsStore
+import relatedArticles
+from relatedArticles import RelatedArticles
+
+# Builds the related-articles index (Data/related/index.npz, see
+# relatedArticles.py) from the news index and the article pages under News/.
+# The server keeps it current as articles are published and rebuilds it on
+# its own when needed; run this for an existing archive, or on a schedule so
+# a restarted server does not have to build it first.
+#
+# Usage:
+#   python "General Applications/buildRelated.py"
+#   python "General Applications/buildRelated.py" --no-body --show 5a762bd214554f7e82d11c52730895f7
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the related-articles index.")
+    parser.add_argument("--no-body", action="store_true", help="Index titles and summaries only (faster)")
+    parser.add_argument("--show", nargs="*", default=[], metavar="UNIQUE_ID",
+                        help="Print the related articles of these articles after the build")
+    args = parser.parse_args()
+
+    if not relatedArticles.available():
+        print("Related articles need numpy and scipy: pip install numpy scipy")
+        return 1
+
+    store = NewsStore()
+    news_dir = None if args.no_body else resolve_news_html_dir(load_config())
+    related = RelatedArticles(store, news_dir=news_dir)
+    started = time.perf_counter()
+    related.build()
+    built = time.perf_counter()
+    related.save()
+    stats = related.stats()
+    print(f"{stats['articles']} articles, {stats['terms']} terms, {stats['nonzeros']} weights "
+          f"(build {built - started:.2f}s, save {time.perf_counter() - built:.2f}s) -> {related.index_path}")
+
+    titles = {e.get("uniqueId"): e.get("title", "") for e in store.load()} if args.show else {}
+    for unique_id in args.show:
+        neighbors = related.related(unique_id)
+        if neighbors is None:
+            print(f"{unique_id}: not in the index")
+            continue
+        print(f"{unique_id}: {titles.get(unique_id, '')}")
+        for other, score in neighbors:
+            print(f"    {score:.3f}  {other}  {titles.get(other, '')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+import os
+import sys
+import time
+
+# Shared modules live in the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+from newsStore import NewsStore
+
+# Builds (or repairs) the date-partitioned category shards of Data/news.json
+# (see newsShards.py). Publishing keeps them current afterwards; run this
+# once for an existing archive or after a warning about a failed shard update.
+#
+# Usage:
+#   python "General Applications/buildShards.py"
+
+
+def main():
+    store = NewsStore()
+    started = time.perf_counter()
+    store.rebuild_shards()
+    manifest = store.shards.read_manifest()
+    shard_count = sum(len(info["months"]) for info in manifest["categories"].values())
+    article_count = sum(sum(info["months"].values()) for info in manifest["categories"].values())
+    print(f"{article_count} articles in {shard_count} shards across {len(manifest['categories'])} categories "
+          f"({time.perf_counter() - started:.3f}s) -> {store.shards_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
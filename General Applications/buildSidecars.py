@@ -0,0 +1,57 @@
+import os
+import sys
+import argparse
+
+# Shared modules live in the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+from newsStore import NewsStore, write_json_atomic
+from articleText import build_sidecar, extract_article_paragraphs, sidecar_path
+
+# Writes the plain-text sidecar (<id>.text.json) for article pages exported
+# before the editors started producing it.
+#
+# Usage:
+#   python "General Applications/buildSidecars.py"
+#   python "General Applications/buildSidecars.py" --force
+
+DEFAULT_NEWS_DIR = os.path.join(PROJECT_ROOT, "News")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill plain-text sidecars for News/**/*.html.")
+    parser.add_argument("--news-dir", default=DEFAULT_NEWS_DIR, help="Directory with generated article pages")
+    parser.add_argument("--force", action="store_true", help="Rewrite sidecars that already exist")
+    args = parser.parse_args()
+
+    # Metadata (title, location, ...) comes from the news index when the article is listed there
+    entries = {e["uniqueId"]: e for e in NewsStore().load() if e.get("uniqueId")}
+    metadata_fields = ("uniqueId", "title", "category", "location", "date", "Time")
+
+    written = skipped = failed = 0
+    for dirpath, _, filenames in os.walk(args.news_dir):
+        for name in filenames:
+            if not name.endswith(".html"):
+                continue
+            path = os.path.join(dirpath, name)
+            if not args.force and os.path.exists(sidecar_path(path)):
+                skipped += 1
+                continue
+
+            unique_id = name[:-len(".html")]
+            entry = entries.get(unique_id, {"uniqueId": unique_id, "category": os.path.basename(dirpath)})
+            metadata = {k: entry[k] for k in metadata_fields if k in entry}
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    paragraphs = extract_article_paragraphs(f.read())
+                write_json_atomic(sidecar_path(path), build_sidecar(paragraphs, **metadata), ensure_ascii=False)
+                written += 1
+            except (OSError, ValueError) as e:
+                print(f"{path}: {e}")
+                failed += 1
+
+    print(f"Sidecars written: {written}, already present: {skipped}, failed: {failed}")
+
+
+if __name__ == "__main__":
+    main()
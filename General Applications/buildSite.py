@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import argparse
+
+# Shared modules live in the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+from siteBuilder import SITE_DIR, SiteBuilder
+
+# Pre-renders the news archive into static pages (see siteBuilder.py).
+# Only pages whose inputs changed since the last build are written.
+#
+# Usage:
+#   python "General Applications/buildSite.py"
+#   python "General Applications/buildSite.py" --force
+#   python "General Applications/buildSite.py" --watch 2
+#
+# The pages reference article images under /media, so serve site/ with
+# media/ mounted next to it (or build into the project root's web root).
+
+
+def print_stats(stats, elapsed):
+    print(f"{stats['outputs']} outputs: {stats['rendered']} rendered, {stats['unchanged']} unchanged, "
+          f"{stats['removed']} removed, {stats['failed']} failed in {elapsed:.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the static news site from the news index.")
+    parser.add_argument("--site-dir", default=SITE_DIR, help="Output directory")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Threads rendering pages in parallel (default: CPU count, max 8)")
+    parser.add_argument("--force", action="store_true", help="Ignore the manifest and render every page")
+    parser.add_argument("--watch", type=float, metavar="SECONDS",
+                        help="Keep running and rebuild incrementally every SECONDS")
+    args = parser.parse_args()
+
+    builder = SiteBuilder(site_dir=args.site_dir, workers=args.workers)
+    started = time.perf_counter()
+    stats = builder.build(force=args.force)
+    print_stats(stats, time.perf_counter() - started)
+    if not args.watch:
+        return 1 if stats["failed"] else 0
+
+    try:
+        while True:
+            time.sleep(args.watch)
+            started = time.perf_counter()
+            stats = builder.update()
+            if stats["rendered"] or stats["removed"] or stats["failed"]:
+                print_stats(stats, time.perf_counter() - started)
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,13 @@
-import json
+import os
+import sys
 
-with open("news.json", "r", encoding="utf-8") as f:
-    news = json.load(f)
+# Shared modules live in the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from newsStore import NewsStore
+
+store = NewsStore("news.json")
+news = store.load()
 
 cleaned = [n for n in news if all(k in n for k in ("img", "title", "summary", "category", "date"))]
 
-with open("news.json", "w", encoding="utf-8") as f:
-    json.dump(cleaned, f, indent=2)
\ No newline at end of file
+store.write_all(cleaned)
@@ -0,0 +1,89 @@
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import urllib.request
+import urllib.error
+
+# Fires concurrent summary requests at a running server through the job API
+# (POST /summarize/jobs + long-polling) and reports latency percentiles.
+#
+# For an offline run start the server with the stub LLM backend:
+#   SUMMARIZER_BACKEND=stub python app.py
+#   python "General Applications/loadTestSummarize.py" --clients 50 --requests 10 \
+#       /News/Politics/e6ca98d4c6464d03b8686a579dee8599.html /News/Health/5a762bd214554f7e82d11c52730895f7.html
+
+
+def post_json(url, payload):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def get_json(url):
+    try:
+        with urllib.request.urlopen(url, timeout=60) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def summarize(base_url, article_url):
+    status, job = post_json(f"{base_url}/summarize/jobs", {"url": article_url})
+    while status in (200, 202) and job.get("status") in ("queued", "running"):
+        status, job = get_json(f"{base_url}/summarize/jobs/{job['job_id']}?wait=25")
+    return status, job
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the summarization job API.")
+    parser.add_argument("articles", nargs="+", help="Article URLs/paths to summarize")
+    parser.add_argument("--base-url", default="http://localhost:5000")
+    parser.add_argument("--clients", type=int, default=20, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=5, help="Requests per client")
+    args = parser.parse_args()
+
+    latencies = []
+    outcomes = {}
+    lock = threading.Lock()
+
+    def client():
+        for _ in range(args.requests):
+            started = time.perf_counter()
+            status, job = summarize(args.base_url, random.choice(args.articles))
+            elapsed = time.perf_counter() - started
+            outcome = "cached" if job.get("cached") else job.get("status", str(status))
+            with lock:
+                latencies.append(elapsed)
+                outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(args.clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    total = time.perf_counter() - started
+
+    print(f"{len(latencies)} requests in {total:.2f}s ({len(latencies) / total:.1f} req/s)")
+    print(f"outcomes: {outcomes}")
+    for pct in (50, 90, 99):
+        print(f"p{pct}: {percentile(latencies, pct) * 1000:.0f} ms")
+    return 0 if "error" not in outcomes else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+# The measured worker imports app.py from the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Measures how fast a fresh server worker becomes useful: the import time of
+# app.py (with the slowest imports from `python -X importtime`) and the
+# latency of the first and second call of a few requests, made through
+# Flask's test client in a new interpreter. Every warm-up mode given is
+# measured in its own process, so the numbers are real cold starts.
+#
+# Usage:
+#   python "General Applications/measureStartup.py"
+#   python "General Applications/measureStartup.py" --warmup off blocking --backend stub \
+#       --summarize /News/Health/5a762bd214554f7e82d11c52730895f7.html
+
+HEAVY_MODULES = ["requests", "bs4", "langchain", "langchain_google_genai", "numpy", "scipy"]
+
+PROBE = r"""
+import sys, json, time
+started = time.perf_counter()
+sys.path.insert(0, PROJECT_ROOT)
+import app
+imported = time.perf_counter()
+loaded_at_import = [m for m in HEAVY_MODULES if m in sys.modules]
+
+client = app.app.test_client()
+timings = []
+for method, path, body in REQUESTS:
+    for attempt in ("first", "second"):
+        request_started = time.perf_counter()
+        response = client.open(path, method=method, json=body)
+        response.get_data()
+        timings.append([method, path, attempt, response.status_code, time.perf_counter() - request_started])
+
+print(json.dumps({
+    "import_seconds": imported - started,
+    "loaded_at_import": loaded_at_import,
+    "requests": timings,
+}))
+"""
+
+
+def slowest_imports(importtime_output, count):
+    """Imports made directly by app.py (or at top level) from `-X importtime` output, slowest first."""
+    rows = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            cumulative = int(cumulative)
+        except ValueError:
+            continue  # Header line
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        if depth > 1 or name.strip() == "app":
+            continue  # Nested import, already counted in its parent
+        rows.append((cumulative / 1e6, name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def measure(mode, requests, backend, top):
+    env = dict(os.environ, SERVER_WARMUP=mode)
+    if backend:
+        env["SUMMARIZER_BACKEND"] = backend
+    code = (f"PROJECT_ROOT = {PROJECT_ROOT!r}\nHEAVY_MODULES = {HEAVY_MODULES!r}\n"
+            f"REQUESTS = {requests!r}\n" + PROBE)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True)
+    report = None
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith("{"):
+            report = json.loads(line)
+            break
+    if result.returncode != 0 or report is None:
+        print(f"[{mode}] worker failed (exit {result.returncode}):")
+        print("\n".join(line for line in result.stderr.splitlines() if not line.startswith("import time:")))
+        return False
+
+    print(f"[warm-up: {mode}] app import {report['import_seconds'] * 1000:.0f} ms; "
+          f"heavy modules loaded at import: {', '.join(report['loaded_at_import']) or 'none'}")
+    for seconds, name in slowest_imports(result.stderr, top):
+        print(f"    import {name:<28} {seconds * 1000:8.1f} ms")
+    for method, path, attempt, status, seconds in report["requests"]:
+        print(f"    {method:<4} {path:<40} {attempt:<6} {status}  {seconds * 1000:8.1f} ms")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import and first-request latency of app.py.")
+    parser.add_argument("--warmup", nargs="+", default=["off", "blocking"],
+                        choices=["off", "background", "blocking"], help="SERVER_WARMUP modes to compare")
+    parser.add_argument("--backend", help="Summarizer backend for the worker (e.g. stub)")
+    parser.add_argument("--summarize", metavar="ARTICLE_PATH",
+                        help="Also time POST /summarize for this article (uses the LLM unless --backend stub)")
+    parser.add_argument("--top", type=int, default=8, help="Number of slowest imports to list")
+    args = parser.parse_args()
+
+    requests = [
+        ["GET", "/health", None],
+        ["GET", "/news?category=All", None],
+        ["GET", "/news?category=Politics&page=2", None],
+        ["GET", "/news/changes", None],
+        ["GET", "/", None],
+    ]
+    if args.summarize:
+        requests.append(["POST", "/summarize", {"url": args.summarize}])
+
+    ok = True
+    for mode in args.warmup:
+        ok = measure(mode, requests, args.backend, args.top) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
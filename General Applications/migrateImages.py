@@ -0,0 +1,89 @@
+import os
+import sys
+import argparse
+
+# Shared modules live in the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+from mediaStore import MediaStore
+from newsStore import NewsStore
+
+# Moves inline base64 images out of the news index files and the generated
+# article pages into the content-addressed media store.
+#
+# Usage (from anywhere):
+#   python "General Applications/migrateImages.py"
+#   python "General Applications/migrateImages.py" Data/news.json --no-html
+
+DEFAULT_JSON_FILES = [
+    os.path.join(PROJECT_ROOT, "Data", "news.json"),
+    os.path.join(PROJECT_ROOT, "Data", "news1.json"),
+]
+DEFAULT_NEWS_DIR = os.path.join(PROJECT_ROOT, "News")
+
+
+def write_atomic(path, text):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def migrate_json(path, store):
+    # Go through the news store so records still sitting in the append log are migrated too
+    news_store = NewsStore(path)
+    news = news_store.load()
+
+    changed = 0
+    for entry in news:
+        img = entry.get("img", "")
+        new_img = store.put_data_uri(img)
+        if new_img != img:
+            entry["img"] = new_img
+            changed += 1
+
+    if changed:
+        before = os.path.getsize(path)
+        news_store.write_all(news)
+        print(f"{path}: {changed} image(s) moved, {before} -> {os.path.getsize(path)} bytes")
+    else:
+        print(f"{path}: nothing to migrate")
+
+
+def migrate_html(news_dir, store):
+    for dirpath, _, filenames in os.walk(news_dir):
+        for name in filenames:
+            if not name.endswith(".html"):
+                continue
+            path = os.path.join(dirpath, name)
+            with open(path, "r", encoding="utf-8") as f:
+                html = f.read()
+            new_html = store.rewrite_html(html)
+            if new_html != html:
+                write_atomic(path, new_html)
+                print(f"{path}: {len(html)} -> {len(new_html)} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move inline base64 images into the media store.")
+    parser.add_argument("json_files", nargs="*", default=DEFAULT_JSON_FILES,
+                        help="News index files to rewrite (default: Data/news.json and Data/news1.json)")
+    parser.add_argument("--news-dir", default=DEFAULT_NEWS_DIR, help="Directory with generated article pages")
+    parser.add_argument("--no-html", action="store_true", help="Only rewrite the JSON index files")
+    args = parser.parse_args()
+
+    store = MediaStore()
+    for path in args.json_files:
+        if os.path.exists(path):
+            migrate_json(path, store)
+        else:
+            print(f"{path}: not found, skipping")
+
+    if not args.no_html:
+        migrate_html(args.news_dir, store)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
-import json
+import os
+import sys
 import random
 from datetime import datetime, timedelta
 
+# Shared modules live in the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from newsStore import NewsStore
+
 categories = [
     "Politics", "Science", "Health", "Sports", "India", "World",
     "Business", "Tech", "Travel", "Art"
@@ -20,5 +25,5 @@ for i in range(1, 2001):  # Use 2001 for a smaller test, or 20001 for full
         "date": date.strftime("%Y-%m-%d")
     })
 
-with open("news.json", "w", encoding="utf-8") as f:
-    json.dump(news, f, indent=2)
\ No newline at end of file
+# Atomic snapshot write through the news store (also resets its append log)
+NewsStore("news.json").write_all(news)
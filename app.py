@@ -1,74 +1,115 @@
 # app.py
 import os
-import requests
-from bs4 import BeautifulSoup
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate
+import re
+import json
+import time
+import logging
+import threading
+import importlib
+import mimetypes
 from dotenv import load_dotenv
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, send_file
 from flask_cors import CORS
 
-# --- Helper Functions for Summarization ---
+from appConfig import load_config, resolve_news_html_dir
+from assetPipeline import StaticAssets
+from articleText import extract_article_text, resolve_local_article, read_local_article, check_external_article_url
+from newsChanges import NewsChanges, MAX_CHANGES
+from newsFeed import NewsFeed, DEFAULT_PAGE_SIZE
+from serverMetrics import Metrics, AccessLog, PROMETHEUS_CONTENT_TYPE, install as install_metrics
+from summaryCache import SummaryCache, summary_cache_key
+from rateLimiter import RateLimiter, RateLimited, rate_limit_settings
+import relatedArticles
+from relatedArticles import RelatedArticles
+from summaryJobs import SummaryJobQueue, QueueFullError, DONE, ERROR
+from summarizer import get_summarizer
+from weatherProxy import WeatherProxy, WeatherUnavailable, weather_settings
 
-def fetch_article_content(url: str) -> str:
-    """Fetches and extracts the main text content from a news article URL."""
-    print(f"Fetching content from: {url}")
-    try:
-        response = requests.get(url, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # This selector targets the main content container from your generated HTML
-        container = soup.find('div', class_='container')
-        if not container:
-            return "Error: Could not find the main news container."
+# --- Configuration ---
 
-        paragraphs = container.find_all('p')
-        article_text = ' '.join([p.get_text() for p in paragraphs])
+config = load_config()
+NEWS_HTML_BASE_DIR = resolve_news_html_dir(config)
+# External hosts /summarize may fetch articles from; everything else must be a local article
+EXTERNAL_ARTICLE_HOSTS = {host.lower() for host in config.get("externalArticleHosts", [])}
 
-        if not article_text:
-            return "Error: Could not find any paragraph content on the page."
+# Request latency / error metrics and per-stage summary timings, served at /metrics
+metrics = Metrics()
 
-        print("Successfully fetched and parsed content.")
-        return article_text
+# Heavy dependencies (requests, BeautifulSoup, LangChain + the Gemini client)
+# are imported on first use, so a worker can serve the news API and static
+# files as soon as Flask is up. warm_up() (bottom of this file) loads them
+# ahead of the first summary; SERVER_WARMUP selects how:
+#   background (default) - in a thread right after start-up
+#   blocking             - before the module finishes importing
+#   off                  - only on first use
+WARMUP_MODE = os.getenv("SERVER_WARMUP", "background")
 
+# Shared HTTP session: keeps connections to external article hosts pooled between requests
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_http_session():
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                import requests
+                session = requests.Session()
+                session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=20))
+                session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=20))
+                _http_session = session
+    return _http_session
+
+# --- Helper Functions for Summarization ---
+
+log = logging.getLogger(__name__)
+
+class ArticleUnavailable(Exception):
+    """Raised when an article's text cannot be read; `status` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=500):
+        super().__init__(message)
+        self.status = status
+
+def fetch_article_content(url: str) -> str:
+    """Fetches and extracts the main text content from a news article URL."""
+    log.info("Fetching content from: %s", url)
+    session = get_http_session()
+    import requests
+    try:
+        with metrics.stage("fetch"):
+            # Redirects are not followed: the target was only checked for the original host
+            response = session.get(url, timeout=15, allow_redirects=False)
+            if response.is_redirect:
+                raise requests.exceptions.RequestException(f"Redirected to {response.headers.get('Location')}")
+            response.raise_for_status()
+        with metrics.stage("parse"):
+            return extract_article_text(response.text)
     except requests.exceptions.RequestException as e:
-        return f"Error: Failed to fetch URL content. {e}"
+        raise ArticleUnavailable(f"Failed to fetch URL content. {e}", 502) from None
+    except ValueError as e:
+        raise ArticleUnavailable(str(e)) from None
+    except Exception as e:
+        log.exception("Unexpected error while fetching %s", url)
+        raise ArticleUnavailable(f"An unexpected error occurred: {e}") from None
+
+def read_article_content(path: str) -> str:
+    """Extracts the main text content from an article page on disk."""
+    log.info("Reading content from: %s", path)
+    try:
+        with metrics.stage("parse"):
+            return read_local_article(path)
+    except FileNotFoundError:
+        raise ArticleUnavailable("Article not found.", 404) from None
+    except ValueError as e:
+        raise ArticleUnavailable(str(e)) from None
     except Exception as e:
-        return f"An unexpected error occurred: {e}"
-
-def summarize_with_gemini(api_key: str, article_text: str) -> str:
-    """Summarizes the given text using the Gemini LLM via LangChain."""
-    print("Initializing LLM and preparing for summarization...")
-    
-    prompt_template = """
-    You are an expert news summarizer. Your goal is to provide a concise, easy-to-understand summary 
-    of the following news article content. Focus on the key points and present them clearly.
-
-    Article Content:
-    "{article_text}"
-
-    Your Concise Summary:
-    """
-    prompt = PromptTemplate(input_variables=["article_text"], template=prompt_template)
-    
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-pro",
-        google_api_key=api_key,
-        temperature=0.3,
-        convert_system_message_to_human=True
-    )
-    
-    chain = LLMChain(llm=llm, prompt=prompt)
-
-    print("Generating summary...")
-    summary = chain.run({"article_text": article_text})
-    return summary
+        log.exception("Unexpected error while reading %s", path)
+        raise ArticleUnavailable(f"An unexpected error occurred: {e}") from None
 
 # --- Flask API Application ---
 
-# Load environment variables (for GOOGLE_API_KEY)
+# Load environment variables (GOOGLE_API_KEY, WEATHER_API_KEY)
 load_dotenv()
 api_key = os.getenv("GOOGLE_API_KEY")
 
@@ -76,41 +117,468 @@ api_key = os.getenv("GOOGLE_API_KEY")
 app = Flask(__name__)
 # Enable Cross-Origin Resource Sharing to allow your frontend to call the API
 CORS(app) 
+# ACCESS_LOG=- (stdout) or a file path adds a JSON line per request
+install_metrics(app, metrics, AccessLog(os.environ["ACCESS_LOG"]) if os.getenv("ACCESS_LOG") else None)
+
+# Summaries keyed by article text + prompt/model, shared by all workers via SQLite
+summary_cache = SummaryCache()
+timed_summary_cache = metrics.instrument(summary_cache, "cache", ("get", "contains", "put"))
+
+# Per-client token buckets and the cross-worker LLM concurrency/budget guard ("rateLimits" in config.json)
+rate_limiter = RateLimiter(rate_limit_settings(config))
+
+# Process-wide summarizer (backend/model/temperature from config.json, built lazily).
+# Each LLM call it makes, map-reduce chunks included, takes a slot and a budget token.
+summarizer = get_summarizer(config, api_key,
+                            admit=lambda: rate_limiter.admit_llm_call(wait=rate_limiter.lease_seconds))
+
+# LLM calls run on a bounded worker pool; identical in-flight requests share one call
+def record_llm_timings(timings):
+    """Map and reduce time of map-reduce summaries as their own stages."""
+    for stage in ("map", "reduce"):
+        if f"{stage}_seconds" in timings:
+            metrics.observe("summary_stage_duration_seconds", (("stage", f"llm_{stage}"),),
+                            timings[f"{stage}_seconds"])
+
+def summarize_article(article_text):
+    with metrics.stage("llm"):
+        summary, timings = summarizer.summarize_with_timings(article_text)
+    record_llm_timings(timings)
+    return summary, timings
+
+def stream_article(article_text, timings):
+    """Summary pieces as the LLM produces them (run as a streamed summary job)."""
+    with metrics.stage("llm"):
+        yield from summarizer.summarize_stream(article_text, timings)
+    record_llm_timings(timings)
+    if "first_token_seconds" in timings:
+        metrics.observe("summary_stage_duration_seconds", (("stage", "llm_first_token"),),
+                        timings["first_token_seconds"])
+
+summary_jobs = SummaryJobQueue(summarize_article, cache=timed_summary_cache,
+                               concurrency=rate_limiter.llm_concurrency, admission=rate_limiter.check_llm_budget)
+metrics.gauge_callback("summary_jobs_pending", "Summary jobs queued or running.", summary_jobs.pending)
+metrics.gauge_callback("summary_cache_hit_ratio", "Share of summary cache lookups that hit.",
+                       lambda: summary_cache.stats()["hit_ratio"])
+metrics.gauge_callback("llm_calls_running", "LLM calls in progress across all workers.",
+                       rate_limiter.running_llm_calls)
+SYNC_SUMMARY_TIMEOUT = 120  # seconds /summarize waits for its job
+MAX_POLL_WAIT = 30  # seconds a poll request may block with ?wait=
+
+def load_article_content(news_url):
+    """
+    Returns (article_text, None) for a summarizable URL, or (None, (error_response, status)).
+    Local articles (/News/<Category>/<id>.html) are read straight from disk;
+    external URLs are fetched over HTTP only from EXTERNAL_ARTICLE_HOSTS.
+    """
+    try:
+        article_path = resolve_local_article(news_url, NEWS_HTML_BASE_DIR, local_hosts=(request.host,))
+        if not article_path:
+            check_external_article_url(news_url, EXTERNAL_ARTICLE_HOSTS)
+    except ValueError as e:
+        return None, (jsonify({"error": f"Error: {e}"}), 400)
+
+    try:
+        if article_path:
+            return read_article_content(article_path), None
+        return fetch_article_content(news_url), None
+    except ArticleUnavailable as e:
+        return None, (jsonify({"error": f"Error: {e}"}), e.status)
+
+def client_address():
+    if rate_limiter.trust_forwarded_for and request.headers.get('X-Forwarded-For'):
+        return request.headers['X-Forwarded-For'].split(',')[0].strip()
+    return request.remote_addr or 'unknown'
+
+def rate_limited_response(error):
+    """429 with Retry-After, so clients back off instead of holding a worker."""
+    metrics.inc("rate_limited_total", (("reason", error.reason),))
+    response = jsonify({"error": str(error), "retry_after": error.retry_after_header()})
+    response.headers['Retry-After'] = error.retry_after_header()
+    return response, 429
+
+def read_summary_request():
+    """Validates a summary request. Returns (article_text, cache_key, None) or (None, None, error)."""
+    try:
+        rate_limiter.check_client(client_address())
+    except RateLimited as e:
+        return None, None, rate_limited_response(e)
+
+    if summarizer.requires_api_key and not api_key:
+        return None, None, (jsonify({"error": "GOOGLE_API_KEY not found on the server."}), 500)
+
+    data = request.get_json(silent=True)
+    if not data or 'url' not in data:
+        return None, None, (jsonify({"error": "Invalid request. 'url' not provided."}), 400)
+
+    article_content, error = load_article_content(data['url'])
+    if error:
+        return None, None, error
+    return article_content, summary_cache_key(article_content, *summarizer.cache_version()), None
+
+def submit_summary_job(stream=None):
+    """Validates the request and submits (or joins) a summary job. Returns (job, error)."""
+    article_content, cache_key, error = read_summary_request()
+    if error:
+        return None, error
+    try:
+        return summary_jobs.submit(cache_key, article_content, stream=stream), None
+    except QueueFullError as e:
+        response = jsonify({"error": str(e)})
+        response.headers['Retry-After'] = '5'
+        return None, (response, 503)
+    except RateLimited as e:
+        return None, rate_limited_response(e)
 
 @app.route('/summarize', methods=['POST'])
 def summarize_endpoint():
     """
     API endpoint to summarize a news article.
-    Expects a JSON payload with a "url" key.
+    Expects a JSON payload with a "url" key and waits for the summary.
     """
-    if not api_key:
-        return jsonify({"error": "GOOGLE_API_KEY not found on the server."}), 500
+    job, error = submit_summary_job()
+    if error:
+        return error
 
-    data = request.get_json()
-    if not data or 'url' not in data:
-        return jsonify({"error": "Invalid request. 'url' not provided."}), 400
+    if not job.wait(SYNC_SUMMARY_TIMEOUT):
+        return jsonify({"error": "Timed out waiting for the summary.", "job_id": job.id}), 504
+    if job.status == ERROR:
+        return jsonify({"error": job.error}), 500
+    return jsonify({"summary": job.summary, "cached": job.cached})
+
+def sse_event(event, data, event_id=None):
+    """One Server-Sent Events message with a JSON payload."""
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def event_stream(events):
+    return Response(events, mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/summarize/stream', methods=['POST'])
+def summarize_stream_endpoint():
+    """
+    Streaming variant of /summarize, sent as Server-Sent Events in the POST
+    response: "token" events ({"text"}) as the summary is generated, then
+    "done" ({"summary", "cached", "timings"}) or "error" ({"error"}).
+    The stream is a summary job: a request for an article that is already
+    being summarized follows that job (replaying the tokens so far), and
+    cached summaries arrive as a single "done" event.
+    """
+    job, error = submit_summary_job(stream=stream_article)
+    if error:
+        return error
+    if job.cached:
+        return event_stream([sse_event("done", {"summary": job.summary, "cached": True})])
+
+    def follow_job():
+        try:
+            for piece in job.follow(SYNC_SUMMARY_TIMEOUT):
+                yield sse_event("token", {"text": piece})
+        except TimeoutError as e:
+            yield sse_event("error", {"error": str(e)})
+            return
+        if job.status == ERROR:
+            yield sse_event("error", {"error": job.error})
+        else:
+            yield sse_event("done", {"summary": job.summary, "cached": False, "timings": job.timings})
+
+    return event_stream(follow_job())
+
+@app.route('/summarize/jobs', methods=['POST'])
+def submit_summary_job_endpoint():
+    """
+    Asynchronous variant of /summarize. Returns 200 with the summary when it
+    is already cached, otherwise 202 with a job id to poll.
+    """
+    job, error = submit_summary_job()
+    if error:
+        return error
+
+    body = job.to_dict()
+    if job.status in (DONE, ERROR):
+        return jsonify(body), 200
+    body["poll_url"] = f"/summarize/jobs/{job.id}"
+    return jsonify(body), 202
+
+@app.route('/summarize/jobs/<job_id>', methods=['GET'])
+def summary_job_status_endpoint(job_id):
+    """Job status; ?wait=<seconds> long-polls until the job finishes."""
+    job = summary_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job."}), 404
+
+    wait = min(request.args.get('wait', 0, type=float), MAX_POLL_WAIT)
+    if wait > 0:
+        job.wait(wait)
+    return jsonify(job.to_dict())
+
+@app.route('/summarize/cache-stats', methods=['GET'])
+def summary_cache_stats_endpoint():
+    """Hit/miss counters of the summary cache (this worker's in-memory view)."""
+    return jsonify(summary_cache.stats())
+
+# --- News Feed API ---
+
+# Sorted, category-indexed view of Data/news.json (+ its append log). Only
+# searches need the whole archive in memory; everything else is answered
+# from the date-partitioned category shards once they have been built.
+news_feed = NewsFeed()
+news_shards = news_feed.store.shards
+ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+@app.route('/news', methods=['GET'])
+def news_endpoint():
+    """
+    Returns one page of news cards, newest first.
+    Query parameters: category (a category name, "All" or "Breaking News"),
+    page, page_size, q (search term) and from / to (inclusive YYYY-MM-DD dates).
+    """
+    category = request.args.get('category', 'All')
+    page = request.args.get('page', 1, type=int)
+    page_size = request.args.get('page_size', DEFAULT_PAGE_SIZE, type=int)
+    q = request.args.get('q', '').strip()
+    date_from = request.args.get('from') or None
+    date_to = request.args.get('to') or None
+    if any(value is not None and not ISO_DATE_RE.match(value) for value in (date_from, date_to)):
+        return jsonify({"error": "Invalid request. 'from' and 'to' must be YYYY-MM-DD dates."}), 400
+
+    if not q and news_shards is not None and news_shards.available():
+        source = news_shards
+        last_modified = news_shards.last_modified()
+    else:
+        source = news_feed
+        news_feed.refresh()
+        last_modified = news_feed.last_modified
+
+    # The ETag only depends on the index version and the query, so unchanged
+    # pages are answered with 304 before any work is done.
+    etag = source.etag(category, page, page_size, q, date_from, date_to)
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains(etag)
+    else:
+        not_modified = bool(request.if_modified_since) and last_modified <= request.if_modified_since
+    if not_modified:
+        response = app.response_class(status=304)
+    elif source is news_shards:
+        response = jsonify(news_shards.query(category, page, page_size, date_from, date_to))
+    else:
+        response = jsonify(news_feed.query(category, page, page_size, q, date_from, date_to))
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# --- News Change Feed ---
 
-    news_url = data['url']
-    
-    # The URL needs to be a full path. We assume the server runs from the project root.
-    # The frontend will send a relative path like /News/Category/id.html
-    # We need to construct the correct local file path.
-    # However, it's better if the frontend sends the full URL. Let's adjust the frontend logic for that.
-    
-    full_url = request.host_url + news_url.lstrip('/')
+# Lets open pages pick up newly exported articles without reloading the
+# index: clients keep the "seq" cursor of the last change they saw and ask
+# only for what came after it.
+news_changes = NewsChanges(news_feed.store)
+CHANGES_POLL_INTERVAL = 1     # seconds between checks of the index files for the event stream
+STREAM_KEEPALIVE = 15         # seconds between keep-alive comments on an idle stream
+STREAM_MAX_DURATION = 300     # streams are closed after this; EventSource reconnects with Last-Event-ID
 
-    article_content = fetch_article_content(full_url)
-    if "Error:" in article_content:
-        return jsonify({"error": article_content}), 500
+def parse_cursor(value):
+    """Cursor from a query parameter or header: None if absent, ValueError if malformed."""
+    if value is None or value == '':
+        return None
+    if not value.isdigit():
+        raise ValueError(value)
+    return int(value)
 
+@app.route('/news/changes', methods=['GET'])
+def news_changes_endpoint():
+    """
+    Articles added or updated since a cursor: {"cursor", "items", "more", "reset"}.
+    Without `since` only the current cursor is returned. `reset` means the
+    cursor is too old to answer and the client should reload its view.
+    """
     try:
-        summary = summarize_with_gemini(api_key, article_content)
-        return jsonify({"summary": summary})
-    except Exception as e:
-        return jsonify({"error": f"Failed to generate summary. {e}"}), 500
+        since = parse_cursor(request.args.get('since'))
+    except ValueError:
+        return jsonify({"error": "Invalid request. 'since' must be a cursor returned by this endpoint."}), 400
+    limit = max(1, min(request.args.get('limit', MAX_CHANGES, type=int), MAX_CHANGES))
+
+    news_changes.refresh()
+    response = jsonify(news_changes.changes(since, limit))
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@app.route('/news/stream', methods=['GET'])
+def news_stream_endpoint():
+    """
+    Server-Sent Events: an "articles" event with the same payload as
+    /news/changes whenever articles are published, "reset" when the client
+    must reload. Resumes from the Last-Event-ID header or `since`.
+    """
+    try:
+        since = parse_cursor(request.headers.get('Last-Event-ID') or request.args.get('since'))
+    except ValueError:
+        return jsonify({"error": "Invalid request. 'since' must be a cursor returned by /news/changes."}), 400
+
+    news_changes.watch(CHANGES_POLL_INTERVAL)
+    news_changes.refresh()
+
+    def events():
+        cursor = news_changes.cursor() if since is None else since
+        yield "retry: 5000\n" + sse_event("cursor", {"cursor": cursor}, cursor)
+        deadline = time.monotonic() + STREAM_MAX_DURATION
+        while time.monotonic() < deadline:
+            news_changes.wait_for_changes(cursor, STREAM_KEEPALIVE)
+            result = news_changes.changes(cursor)
+            if result["reset"] or result["items"]:
+                cursor = result["cursor"]
+                event = "reset" if result["reset"] else "articles"
+                yield sse_event(event, result, cursor)
+            else:
+                yield ": keep-alive\n\n"
+
+    return event_stream(events())
+
+# TF-IDF nearest neighbours of every article (needs numpy + scipy), kept
+# current from the same change history as the event stream
+related_articles = RelatedArticles(news_feed.store, news_dir=NEWS_HTML_BASE_DIR)
+MAX_RELATED = relatedArticles.TOP_K
+
+@app.route('/news/related/<unique_id>', methods=['GET'])
+def related_articles_endpoint(unique_id):
+    """
+    Articles most similar to one article, best first, as news cards with a
+    "score" (cosine similarity). Query parameter: count (at most MAX_RELATED).
+    """
+    if not relatedArticles.available():
+        return jsonify({"error": "Related articles are not available on this server (numpy/scipy missing)."}), 503
+    count = max(1, min(request.args.get('count', MAX_RELATED, type=int), MAX_RELATED))
+    if not related_articles.sync(news_changes):
+        response = jsonify({"error": "The related articles index is being built, please retry shortly."})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+
+    neighbors = related_articles.related(unique_id, count)
+    if neighbors is None:
+        return jsonify({"error": "Article not found."}), 404
+    news_feed.refresh()
+    items = [dict(news_feed.articles[other], score=score) for other, score in neighbors
+             if other in news_feed.articles]
+    return jsonify({"uniqueId": unique_id, "items": items})
+
+# --- Weather ---
+
+# Upstream weather calls are made here instead of in every browser, cached per
+# grid cell ("weatherApi" in config.json; WEATHER_PROVIDER=stub for a local provider)
+weather = WeatherProxy(weather_settings(config), session_factory=get_http_session,
+                       on_upstream_call=lambda: metrics.inc("weather_upstream_calls_total"))
+metrics.inc("weather_upstream_calls_total", amount=0)  # Exported from the start, not after the first call
+
+@app.route('/weather', methods=['GET'])
+def weather_endpoint():
+    """
+    Current weather near a point, in the provider's shape ({"location", "current"}).
+    Query parameters: lat and lon in degrees. The X-Weather-Cache header says
+    whether the answer was fresh, stale (being refreshed) or a miss.
+    """
+    lat = request.args.get('lat', type=float)
+    lon = request.args.get('lon', type=float)
+    if lat is None or lon is None or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return jsonify({"error": "Invalid request. 'lat' and 'lon' must be coordinates in degrees."}), 400
+
+    try:
+        data, state, max_age = weather.get(lat, lon)
+    except WeatherUnavailable as e:
+        metrics.inc("weather_requests_total", (("cache", "error"),))
+        response = jsonify({"error": str(e)})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    metrics.inc("weather_requests_total", (("cache", state),))
+    response = jsonify(data)
+    response.headers['Cache-Control'] = f'public, max-age={max_age}'
+    response.headers['X-Weather-Cache'] = state
+    return response
+
+# --- Static Files ---
+
+# dist/ (built by "General Applications/buildAssets.py") holds minified,
+# fingerprinted and precompressed copies; files that were not built yet are
+# served from the project as they are.
+static_assets = StaticAssets(news_dir=NEWS_HTML_BASE_DIR, config=config)
+
+@app.route('/', methods=['GET'])
+def home_page():
+    return static_file('homePage.html')
+
+@app.route('/<path:filename>', methods=['GET'])
+def static_file(filename):
+    """
+    Serves the site. Picks the .br/.gz variant the client accepts;
+    fingerprinted assets and media are cached for a year, everything else
+    is revalidated with its ETag.
+    """
+    accepted = [encoding for encoding in ("br", "gzip") if request.accept_encodings[encoding]]
+    resolved = static_assets.resolve(filename, accepted)
+    if resolved is None:
+        return jsonify({"error": "Not found."}), 404
+
+    path, encoding, cache_control = resolved
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    response = send_file(path, mimetype=mimetype, conditional=True, etag=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+# --- Metrics ---
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Request and summarization-stage metrics of this worker in the Prometheus text format."""
+    return app.response_class(metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+# --- Warm-up ---
+
+warm_up_timings = {}
+warm_up_done = threading.Event()
+
+def warm_up():
+    """Loads what the first requests would otherwise pay for. Returns seconds per step."""
+    steps = [
+        ("html_parser", lambda: importlib.import_module("bs4")),
+        ("http_client", get_http_session),
+        ("summarizer", summarizer.warm_up),
+        ("news_index", lambda: news_shards.read_manifest() if news_shards and news_shards.available()
+                       else news_feed.refresh()),
+        ("news_changes", news_changes.refresh),
+        ("related_articles", lambda: relatedArticles.available() and related_articles.sync(news_changes)),
+    ]
+    started = time.perf_counter()
+    for name, step in steps:
+        step_started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            log.warning("Warm-up step %r failed: %s", name, e)
+        warm_up_timings[name] = round(time.perf_counter() - step_started, 3)
+    warm_up_timings["total"] = round(time.perf_counter() - started, 3)
+    warm_up_done.set()
+    log.info("Warm-up finished in %.3fs", warm_up_timings["total"])
+    return warm_up_timings
+
+@app.route('/health', methods=['GET'])
+def health_endpoint():
+    """Liveness/readiness: "warm" turns true once warm_up() has run (load balancers can wait for it)."""
+    return jsonify({"status": "ok", "warm": warm_up_done.is_set(), "warm_up": warm_up_timings})
+
+if WARMUP_MODE == "blocking":
+    warm_up()
+elif WARMUP_MODE == "background":
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
 
 if __name__ == '__main__':
-    # Make sure to have a .env file with your GOOGLE_API_KEY
+    # Copy .env.example to .env and set your GOOGLE_API_KEY (and WEATHER_API_KEY for the weather widget)
     # pip install python-dotenv langchain-google-genai Flask Flask-Cors requests beautifulsoup4
-    print("Starting summarization server...")
+    # Set "summarizer": {"backend": "stub"} in config.json (or SUMMARIZER_BACKEND=stub) to run without Gemini
+    # Measure cold start: python "General Applications/measureStartup.py"
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    log.info("Starting summarization server...")
     app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,25 @@
+import os
+import json
+
+# Shared access to config.json for the server and the command-line tools.
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(PROJECT_ROOT, "config.json")
+
+
+def load_config(path=CONFIG_PATH):
+    """Reads config.json from the project root (empty config if it is missing or invalid)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def resolve_news_html_dir(cfg):
+    """Directory holding News/<Category>/<id>.html, as configured by the editors."""
+    configured = cfg.get("NEWS_HTML_BASE_DIR") or cfg.get("weatherApi", {}).get("NEWS_HTML_BASE_DIR")
+    if configured:
+        path = configured if os.path.isabs(configured) else os.path.join(PROJECT_ROOT, configured)
+        if os.path.isdir(path):
+            return os.path.normpath(path)
+    return os.path.join(PROJECT_ROOT, "News")
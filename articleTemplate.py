@@ -0,0 +1,89 @@
+import os
+import hashlib
+from html import escape
+from string import Template
+
+# Page template for the generated articles under News/<Category>/<id>.html.
+#
+# Both editors render through here. The styles live in css/article.css,
+# which every article references with a content-hash version
+# (?v=<hash>), so browsers download it once for the whole archive and
+# pick up a new copy as soon as the file changes. The body of the article
+# sits between ARTICLE_BODY_START / ARTICLE_BODY_END so build tools can
+# re-render old pages without parsing the surrounding markup.
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+ARTICLE_CSS_PATH = os.path.join(PROJECT_ROOT, "css", "article.css")
+# Relative to News/<Category>/<id>.html, so pages work wherever the site root is mounted
+ARTICLE_CSS_HREF = "../../css/article.css"
+
+ARTICLE_BODY_START = "<!-- article-body -->"
+ARTICLE_BODY_END = "<!-- /article-body -->"
+
+ARTICLE_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>$title</title>
+<link rel="stylesheet" href="$stylesheet">
+</head>
+<body>
+<header>
+  <h1>Classic News</h1>
+</header>
+<div class="container">
+  <p class="metadata-line">$metadata</p>
+  <h2>$title</h2>
+""" + ARTICLE_BODY_START + """
+$body
+""" + ARTICLE_BODY_END + """
+</div>
+<footer>&copy; 2025 Classic News | Educational Demo</footer>
+</body>
+</html>""")
+
+_stylesheet_versions = {}  # path -> (mtime_ns, size, version)
+
+
+def stylesheet_version(path=ARTICLE_CSS_PATH):
+    """Short content hash of the article stylesheet (recomputed only when the file changes)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return ""
+    cached = _stylesheet_versions.get(path)
+    if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2]
+    with open(path, "rb") as f:
+        version = hashlib.sha256(f.read()).hexdigest()[:10]
+    _stylesheet_versions[path] = (st.st_mtime_ns, st.st_size, version)
+    return version
+
+
+def stylesheet_href(path=ARTICLE_CSS_PATH, href=ARTICLE_CSS_HREF):
+    version = stylesheet_version(path)
+    return f"{href}?v={version}" if version else href
+
+
+def render_article(headline, body_html, timestamp, location=None, stylesheet=None):
+    """
+    Full HTML page for one article. `body_html` is trusted editor output and
+    inserted as is; headline and location are escaped. Batch renderers pass
+    a precomputed `stylesheet` href instead of re-checking the CSS per page.
+    """
+    metadata = f"{escape(location)} | {timestamp}" if location else timestamp
+    return ARTICLE_TEMPLATE.substitute(
+        title=escape(headline),
+        stylesheet=stylesheet or stylesheet_href(),
+        metadata=metadata,
+        body=body_html,
+    )
+
+
+def extract_article_body(page_html):
+    """Editor HTML between the body markers, or None for pages rendered before the markers existed."""
+    start = page_html.find(ARTICLE_BODY_START)
+    end = page_html.find(ARTICLE_BODY_END, start + 1)
+    if start == -1 or end == -1:
+        return None
+    return page_html[start + len(ARTICLE_BODY_START):end].strip("\n")
@@ -0,0 +1,158 @@
+import os
+import re
+import json
+import math
+import socket
+import ipaddress
+from urllib.parse import urlparse, unquote
+
+from newsStore import write_json_atomic
+
+# Helpers to get the plain text of a generated article page
+# (News/<Category>/<uniqueId>.html) straight from disk.
+#
+# At export time the editors also write a sidecar, <uniqueId>.text.json, next
+# to the page with the article's plain text, word count and paragraph
+# offsets, so summarization and other text features never have to parse
+# the HTML again. Pages without a sidecar fall back to BeautifulSoup.
+
+# Matches the ".../News/<Category>/<uniqueId>.html" tail of a URL path
+ARTICLE_PATH_RE = re.compile(r"(?:^|/)News/([^/]+)/([^/]+\.html)$")
+SIDECAR_SUFFIX = ".text.json"
+WORDS_PER_MINUTE = 200
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+OBJECT_REPLACEMENT_CHAR = "\ufffc"  # How QTextDocument.toPlainText() renders inline images
+
+
+def extract_article_paragraphs(html):
+    """Extracts the paragraph texts of the main news container of an article page."""
+    from bs4 import BeautifulSoup  # Only needed when no precomputed text exists
+
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # This selector targets the main content container of the generated HTML
+    container = soup.find('div', class_='container')
+    if not container:
+        raise ValueError("Could not find the main news container.")
+
+    paragraphs = [p.get_text() for p in container.find_all('p')]
+    if not ''.join(paragraphs):
+        raise ValueError("Could not find any paragraph content on the page.")
+    return paragraphs
+
+
+def extract_article_text(html):
+    """
+    Extracts the paragraph text of the main news container of an article page,
+    one paragraph per line (the same layout as sidecar text, so long articles
+    can be chunked on paragraph boundaries).
+    """
+    return '\n'.join(extract_article_paragraphs(html))
+
+
+# --- Plain-text sidecars ---
+
+def sidecar_path(html_path):
+    return html_path[:-len(".html")] + SIDECAR_SUFFIX if html_path.endswith(".html") else html_path + SIDECAR_SUFFIX
+
+
+def build_sidecar(paragraphs, **metadata):
+    """
+    Builds the sidecar dict from a list of paragraph strings. `text` joins the
+    non-empty paragraphs with newlines and `paragraphs` holds [start, end)
+    character offsets of each one inside `text`.
+    """
+    cleaned = [p.replace(OBJECT_REPLACEMENT_CHAR, "").strip() for p in paragraphs]
+    cleaned = [p for p in cleaned if p]
+
+    offsets = []
+    position = 0
+    for paragraph in cleaned:
+        offsets.append([position, position + len(paragraph)])
+        position += len(paragraph) + 1
+    text = "\n".join(cleaned)
+    word_count = len(WORD_RE.findall(text))
+
+    sidecar = dict(metadata)
+    sidecar.update({
+        "text": text,
+        "word_count": word_count,
+        "reading_minutes": max(1, math.ceil(word_count / WORDS_PER_MINUTE)) if word_count else 0,
+        "paragraphs": offsets,
+    })
+    return sidecar
+
+
+def write_sidecar(html_path, plain_text, **metadata):
+    """Writes the sidecar for an article page from its plain text (one paragraph per line)."""
+    sidecar = build_sidecar(plain_text.split("\n"), **metadata)
+    write_json_atomic(sidecar_path(html_path), sidecar, ensure_ascii=False)
+    return sidecar
+
+
+def load_sidecar(html_path):
+    """Returns the sidecar dict of an article page, or None if there is none."""
+    try:
+        with open(sidecar_path(html_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def resolve_local_article(url, news_base_dir, local_hosts=()):
+    """
+    Maps an article URL ("/News/Politics/<id>.html", "../News/...", or an absolute
+    URL on one of `local_hosts`) to the file under `news_base_dir`.
+
+    Returns None for URLs that do not point at a local article (external sites),
+    and raises ValueError for local paths that try to escape `news_base_dir`.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme or parsed.netloc:
+        if parsed.scheme not in ("http", "https") or parsed.netloc not in local_hosts:
+            return None
+
+    match = ARTICLE_PATH_RE.search(unquote(parsed.path))
+    if not match:
+        return None
+    category, filename = match.groups()
+    if category in (".", "..") or "\\" in category or "\\" in filename or "\0" in category + filename:
+        raise ValueError("Invalid article path.")
+
+    base_dir = os.path.realpath(news_base_dir)
+    path = os.path.realpath(os.path.join(base_dir, category, filename))
+    if os.path.commonpath([base_dir, path]) != base_dir:
+        raise ValueError("Invalid article path.")
+    return path
+
+
+def check_external_article_url(url, allowed_hosts):
+    """
+    Validates an external article URL before the server fetches it: http(s),
+    a host on the `allowed_hosts` allowlist, and only public addresses, so the
+    server cannot be used to reach loopback, private or link-local services.
+    Raises ValueError otherwise.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError("'url' is not a news article.")
+    host = parsed.hostname.lower()
+    if host not in allowed_hosts:
+        raise ValueError("Only articles on this site or an allowed news host can be summarized.")
+    try:
+        addresses = socket.getaddrinfo(host, parsed.port or (443 if parsed.scheme == "https" else 80),
+                                       proto=socket.IPPROTO_TCP)
+    except socket.gaierror:
+        raise ValueError(f"Cannot resolve the article host {host}.") from None
+    for *_, sockaddr in addresses:
+        if not ipaddress.ip_address(sockaddr[0].split("%")[0]).is_global:
+            raise ValueError(f"The article host {host} does not resolve to a public address.")
+
+
+def read_local_article(path):
+    """Returns the text of an article page on disk, from its sidecar when available."""
+    sidecar = load_sidecar(path)
+    if sidecar and sidecar.get("text"):
+        return sidecar["text"]
+    with open(path, "r", encoding="utf-8") as f:
+        return extract_article_text(f.read())
@@ -0,0 +1,359 @@
+import os
+import re
+import gzip
+import json
+import hashlib
+import posixpath
+
+from appConfig import PROJECT_ROOT, load_config, resolve_news_html_dir
+from newsStore import write_json_atomic
+
+try:
+    import brotli  # Optional: pip install Brotli
+except ImportError:
+    brotli = None
+
+# Static asset pipeline.
+#
+# Copies the files the site is served from into DIST_DIR:
+#   - stylesheets and scripts are minified and fingerprinted
+#     (css/homePage.css -> css/homePage.<hash>.css), so they can be cached
+#     forever; HTML pages are rewritten to reference the fingerprinted names
+#   - pages and data keep their URL (homePage.html, News/**.html,
+#     Data/news.json, config.json) and are served with revalidation
+#   - every text file gets precompressed .gz (and .br when Brotli is
+#     installed) siblings, so the server never compresses per request
+#
+# ASSET_MANIFEST_NAME maps each URL path to its output and records the stat
+# of its source; unchanged sources are skipped on the next run and the
+# server (StaticAssets) falls back to the source file when the recorded
+# stat no longer matches, so a stale dist/ never serves old content.
+DIST_DIR = os.path.join(PROJECT_ROOT, "dist")
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+MANIFEST_VERSION = 1
+
+ENTRY_FILES = ["homePage.html", "config.json", os.path.join("Data", "news.json")]
+FINGERPRINT_DIRS = ["css", "js"]
+MEDIA_DIR_NAME = "media"  # Content-addressed already (see mediaStore.py)
+
+COMPRESSIBLE = (".html", ".css", ".js", ".json", ".svg", ".txt")
+MIN_COMPRESS_SIZE = 256  # bytes; smaller files are not worth an extra round of headers
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+ASSET_REF_RE = re.compile(r'((?:href|src)=")([^"?#]+\.(?:css|js))((?:\?[^"#]*)?)(")')
+HTML_COMMENT_RE = re.compile(r"<!--(?!\s*/?article-body).*?-->", re.DOTALL)
+HTML_RAW_BLOCK_RE = re.compile(r"(<(pre|textarea|script|style)\b.*?</\2>)", re.DOTALL | re.IGNORECASE)
+CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+
+
+# --- Minification ---
+# Deliberately conservative: only whitespace and comments that can never be
+# significant are removed, so no parser is needed.
+
+def minify_css(text):
+    text = CSS_COMMENT_RE.sub("", text)
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r"\s*([{};,>])\s*", r"\1", text)
+    text = re.sub(r":\s+", ":", text)  # Spaces before ':' can be part of a selector
+    return text.replace(";}", "}").strip()
+
+
+def minify_js(text):
+    """Drops indentation, blank lines and whole-line comments outside template literals."""
+    lines = []
+    in_template = False
+    in_block_comment = False
+    for line in text.splitlines():
+        if in_template:
+            lines.append(line)
+        else:
+            stripped = line.strip()
+            if in_block_comment:
+                in_block_comment = "*/" not in stripped
+                continue
+            if not stripped or stripped.startswith("//"):
+                continue
+            if stripped.startswith("/*"):
+                in_block_comment = "*/" not in stripped
+                continue
+            lines.append(stripped)
+        if (line.count("`") - line.count("\\`")) % 2:
+            in_template = not in_template
+    return "\n".join(lines) + "\n"
+
+
+def minify_html(text):
+    """Removes comments (except the article-body markers), indentation and blank lines."""
+    parts = HTML_RAW_BLOCK_RE.split(text)
+    out = []
+    # split() with two groups yields: text, block, tag name, text, block, tag name, ...
+    for i in range(0, len(parts), 3):
+        chunk = HTML_COMMENT_RE.sub("", parts[i])
+        out.append("\n".join(line.strip() for line in chunk.splitlines() if line.strip()))
+        if i + 1 < len(parts):
+            out.append(parts[i + 1])
+    return "\n".join(p for p in out if p) + "\n"
+
+
+def minify_json(text):
+    return json.dumps(json.loads(text), ensure_ascii=False, separators=(",", ":"))
+
+
+MINIFIERS = {
+    ".css": minify_css,
+    ".js": minify_js,
+    ".html": minify_html,
+    ".json": minify_json,
+}
+
+
+# --- Compression ---
+
+def compress_siblings(path, data):
+    """Writes <path>.gz (and <path>.br) when they are smaller; returns the encodings written."""
+    encodings = []
+    for encoding, suffix, compress in (
+        ("br", ".br", (lambda d: brotli.compress(d, quality=11)) if brotli else None),
+        ("gzip", ".gz", lambda d: gzip.compress(d, compresslevel=9, mtime=0)),
+    ):
+        sibling = path + suffix
+        if compress is None or len(data) < MIN_COMPRESS_SIZE:
+            remove_quietly(sibling)
+            continue
+        compressed = compress(data)
+        if len(compressed) >= len(data) * 0.95:
+            remove_quietly(sibling)
+            continue
+        write_bytes(sibling, compressed)
+        encodings.append(encoding)
+    return encodings
+
+
+def write_bytes(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def fingerprinted_name(url_path, data):
+    base, ext = posixpath.splitext(url_path)
+    return f"{base}.{hashlib.sha256(data).hexdigest()[:10]}{ext}"
+
+
+def file_stat(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def load_asset_manifest(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {"files": {}, "assets": {}}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {"files": {}, "assets": {}}
+    return manifest
+
+
+# --- Build ---
+
+class AssetPipeline:
+    """Builds DIST_DIR from the project sources, skipping files that did not change."""
+
+    def __init__(self, root=PROJECT_ROOT, dist_dir=DIST_DIR, news_dir=None, config=None):
+        config = load_config() if config is None else config
+        self.root = root
+        self.dist_dir = dist_dir
+        self.news_dir = news_dir or resolve_news_html_dir(config)
+        self.manifest_path = os.path.join(dist_dir, ASSET_MANIFEST_NAME)
+
+    def load_manifest(self):
+        return load_asset_manifest(self.manifest_path)
+
+    def sources(self):
+        """(url path, source file, fingerprint?) for everything the site serves."""
+        for name in FINGERPRINT_DIRS:
+            directory = os.path.join(self.root, name)
+            if os.path.isdir(directory):
+                for filename in sorted(os.listdir(directory)):
+                    if filename.endswith((".css", ".js")):
+                        yield f"{name}/{filename}", os.path.join(directory, filename), True
+        for name in ENTRY_FILES:
+            path = os.path.join(self.root, name)
+            if os.path.isfile(path):
+                yield name.replace(os.sep, "/"), path, False
+        for dirpath, _, filenames in os.walk(self.news_dir):
+            relative = os.path.relpath(dirpath, self.news_dir)
+            for filename in filenames:
+                if filename.endswith(".html"):
+                    url_path = posixpath.normpath(posixpath.join("News", relative.replace(os.sep, "/"), filename))
+                    yield url_path, os.path.join(dirpath, filename), False
+
+    def build(self, force=False):
+        previous = {"files": {}, "assets": {}} if force else self.load_manifest()
+        files = {}
+        assets = {}
+        built = skipped = 0
+
+        # Fingerprinted assets first: pages are rewritten to point at their new names
+        sources = sorted(self.sources(), key=lambda s: not s[2])
+        depends = None
+        for url_path, source, fingerprint in sources:
+            try:
+                stat = file_stat(source)
+            except OSError:
+                continue
+            old = previous["files"].get(url_path)
+            if not fingerprint and depends is None:
+                # Pages also depend on the fingerprints of the assets they reference
+                depends = hashlib.sha1(json.dumps(assets, sort_keys=True).encode("utf-8")).hexdigest()
+            if (old and old["stat"] == stat and old.get("depends") == (None if fingerprint else depends)
+                    and os.path.exists(os.path.join(self.dist_dir, old["output"]))):
+                files[url_path] = old
+                if fingerprint:
+                    assets[url_path] = old["output"]
+                skipped += 1
+                continue
+
+            with open(source, "rb") as f:
+                data = f.read()
+            ext = posixpath.splitext(url_path)[1]
+            if ext in MINIFIERS:
+                text = data.decode("utf-8")
+                if ext == ".html":
+                    text = self.rewrite_asset_refs(text, url_path, assets)
+                data = MINIFIERS[ext](text).encode("utf-8")
+
+            output = fingerprinted_name(url_path, data) if fingerprint else url_path
+            output_path = os.path.join(self.dist_dir, *output.split("/"))
+            write_bytes(output_path, data)
+            encodings = compress_siblings(output_path, data) if ext in COMPRESSIBLE else []
+
+            files[url_path] = {"output": output, "stat": stat, "encodings": encodings,
+                               "immutable": fingerprint, "depends": None if fingerprint else depends}
+            if fingerprint:
+                assets[url_path] = output
+            built += 1
+
+        removed = 0
+        live_outputs = {entry["output"] for entry in files.values()}
+        for url_path, entry in previous["files"].items():
+            if entry["output"] not in live_outputs:
+                for suffix in ("", ".gz", ".br"):
+                    remove_quietly(os.path.join(self.dist_dir, *entry["output"].split("/")) + suffix)
+                removed += 1
+
+        write_json_atomic(self.manifest_path, {"version": MANIFEST_VERSION, "files": files, "assets": assets},
+                          indent=1)
+        return {"files": len(files), "built": built, "skipped": skipped, "removed": removed}
+
+    @staticmethod
+    def rewrite_asset_refs(html, url_path, assets):
+        """Points href/src attributes at the fingerprinted copies of local stylesheets and scripts."""
+        page_dir = posixpath.dirname(url_path)
+
+        def replace(match):
+            ref = match.group(2)
+            if "://" in ref or ref.startswith("//"):
+                return match.group(0)
+            target = posixpath.normpath(posixpath.join(page_dir, ref)).lstrip("/")
+            while target.startswith("../"):
+                target = target[3:]  # Browsers clamp ".." at the site root
+            fingerprinted = assets.get(target)
+            if not fingerprinted:
+                return match.group(0)
+            # Same directory as the original, so only the file name changes (and the ?v= goes away)
+            new_ref = posixpath.join(posixpath.dirname(ref), posixpath.basename(fingerprinted))
+            return match.group(1) + new_ref + match.group(4)
+
+        return ASSET_REF_RE.sub(replace, html)
+
+
+# --- Serving ---
+
+class StaticAssets:
+    """
+    Resolves request paths to files in DIST_DIR (or the project sources as
+    a fallback) and picks the best precompressed variant.
+    """
+
+    def __init__(self, root=PROJECT_ROOT, dist_dir=DIST_DIR, news_dir=None, config=None):
+        config = load_config() if config is None else config
+        self.root = root
+        self.dist_dir = dist_dir
+        self.news_dir = news_dir or resolve_news_html_dir(config)
+        self.manifest_path = os.path.join(dist_dir, ASSET_MANIFEST_NAME)
+        self._manifest_stat = None
+        self._files = {}
+        self._outputs = {}  # output path -> manifest entry (fingerprinted names)
+
+    def _reload(self):
+        try:
+            stat = file_stat(self.manifest_path)
+        except OSError:
+            stat = None
+        if stat == self._manifest_stat:
+            return
+        self._manifest_stat = stat
+        files = load_asset_manifest(self.manifest_path)["files"] if stat else {}
+        self._files = files
+        self._outputs = {entry["output"]: (url_path, entry) for url_path, entry in files.items()}
+
+    def source_path(self, url_path):
+        """Project file behind a URL path, limited to what the site serves."""
+        parts = url_path.split("/")
+        if any(p in ("", ".", "..") for p in parts):
+            return None
+        if parts[0] == "News":
+            return os.path.join(self.news_dir, *parts[1:])
+        if parts[0] in FINGERPRINT_DIRS + [MEDIA_DIR_NAME] or url_path.replace("/", os.sep) in ENTRY_FILES:
+            return os.path.join(self.root, *parts)
+        return None
+
+    def resolve(self, url_path, accepted_encodings=()):
+        """
+        Returns (file path, content encoding or None, cache control) for a
+        request path, or None when there is nothing to serve.
+        """
+        self._reload()
+        entry = None
+        if url_path in self._outputs:
+            source_url, entry = self._outputs[url_path]
+        elif url_path in self._files:
+            source_url, entry = url_path, self._files[url_path]
+
+        if entry is not None:
+            source = self.source_path(source_url)
+            try:
+                fresh = source is not None and file_stat(source) == entry["stat"]
+            except OSError:
+                fresh = False
+            # A fingerprinted URL is immutable by definition; serve it even if the source moved on
+            if fresh or (entry["immutable"] and url_path == entry["output"]):
+                path = os.path.join(self.dist_dir, *entry["output"].split("/"))
+                cache_control = IMMUTABLE_CACHE_CONTROL if url_path == entry["output"] and entry["immutable"] \
+                    else REVALIDATE_CACHE_CONTROL
+                for encoding in entry["encodings"]:
+                    if encoding in accepted_encodings:
+                        suffix = ".br" if encoding == "br" else ".gz"
+                        return path + suffix, encoding, cache_control
+                return path, None, cache_control
+
+        # Not built (or changed since the last build): serve the source as is
+        source = self.source_path(url_path)
+        if source is None or not os.path.isfile(source):
+            return None
+        if url_path.startswith(MEDIA_DIR_NAME + "/"):
+            return source, None, IMMUTABLE_CACHE_CONTROL  # Named by content hash
+        return source, None, REVALIDATE_CACHE_CONTROL
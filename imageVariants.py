@@ -0,0 +1,72 @@
+import io
+
+from mediaStore import MediaStore
+
+# Card and slider sized copies of an article's lead image.
+#
+# The home page shows the lead image at 400x250 (news cards) and 220x160
+# (breaking news slider). Each size is cropped to fit and written to the
+# media store twice: as WebP (small, lossy) and as PNG for browsers without
+# WebP support. The URLs are recorded on the news index entry:
+#   "imgVariants": {"card": {"webp": ..., "png": ..., "width": 400, "height": 250}, "slider": {...}}
+#
+# Pillow is optional; without it exports simply skip the variants.
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - depends on the installation
+    Image = None
+
+VARIANT_SIZES = {
+    "card": (400, 250),
+    "slider": (220, 160),
+}
+WEBP_QUALITY = 80
+
+
+def variants_available():
+    return Image is not None
+
+
+def encode_image(image, fmt, **options):
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def build_variants(image_bytes, store=None):
+    """Writes every variant of an image into the media store and returns their URLs."""
+    if Image is None:
+        raise RuntimeError("Pillow is not installed (pip install Pillow).")
+    store = store or MediaStore()
+
+    with Image.open(io.BytesIO(image_bytes)) as source:
+        source = ImageOps.exif_transpose(source)
+        has_alpha = source.mode in ("RGBA", "LA") or "transparency" in source.info
+        source = source.convert("RGBA" if has_alpha else "RGB")
+
+        variants = {}
+        for name, (width, height) in VARIANT_SIZES.items():
+            resized = ImageOps.fit(source, (width, height), Image.LANCZOS)
+            variants[name] = {
+                "webp": store.put(encode_image(resized, "WEBP", quality=WEBP_QUALITY, method=6), "webp"),
+                "png": store.put(encode_image(resized, "PNG", optimize=True), "png"),
+                "width": width,
+                "height": height,
+            }
+    return variants
+
+
+def add_image_variants(entry, store=None):
+    """
+    Adds "imgVariants" to a news index entry whose "img" lives in the media
+    store. Returns True if the entry was changed.
+    """
+    if Image is None:
+        return False
+    store = store or MediaStore()
+    path = store.path_for_url(entry.get("img", ""))
+    if not path:
+        return False  # External or missing image; cards keep using "img"
+    with open(path, "rb") as f:
+        entry["imgVariants"] = build_variants(f.read(), store)
+    return True
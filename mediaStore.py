@@ -0,0 +1,82 @@
+import os
+import re
+import base64
+import hashlib
+
+# Content-addressed store for article images.
+# Every image is written once to media/<first two hex chars>/<sha256>.<ext>,
+# so the same picture exported twice (or shared by several articles) is stored
+# a single time and can be cached forever by browsers.
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+MEDIA_BASE_DIR = os.path.join(PROJECT_ROOT, "media")
+MEDIA_BASE_URL = "/media"
+
+DATA_URI_RE = re.compile(r"data:image/([a-zA-Z0-9.+-]+);base64,([A-Za-z0-9+/=\s]+)")
+IMG_SRC_RE = re.compile(r'(<img[^>]+src=")(data:image/[^"]+)(")')
+
+# Normalise MIME subtypes to the file extensions we serve
+EXTENSIONS = {
+    "jpeg": "jpg",
+    "svg+xml": "svg",
+    "x-icon": "ico",
+}
+
+
+class MediaStore:
+    """Writes image bytes into a hash-keyed directory and hands back their URLs."""
+
+    def __init__(self, base_dir=MEDIA_BASE_DIR, base_url=MEDIA_BASE_URL):
+        self.base_dir = base_dir
+        self.base_url = base_url.rstrip("/")
+
+    def path_for(self, digest, ext):
+        return os.path.join(self.base_dir, digest[:2], f"{digest}.{ext}")
+
+    def url_for(self, digest, ext):
+        return f"{self.base_url}/{digest[:2]}/{digest}.{ext}"
+
+    def path_for_url(self, url):
+        """Local file behind a media URL, or None for URLs outside the store."""
+        prefix = self.base_url + "/"
+        if not url or not url.startswith(prefix):
+            return None
+        relative = url[len(prefix):]
+        if ".." in relative.split("/"):
+            return None
+        return os.path.join(self.base_dir, *relative.split("/"))
+
+    def put(self, data, ext="png"):
+        """Stores raw image bytes (once) and returns the public URL."""
+        ext = EXTENSIONS.get(ext.lower(), ext.lower())
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest, ext)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary name first so a crash never leaves a
+            # half-written file under the final (hash) name.
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+
+        return self.url_for(digest, ext)
+
+    def put_data_uri(self, src):
+        """
+        Stores a data:image/...;base64 URI and returns its URL.
+        Anything that is not a base64 image data URI (regular URLs, empty
+        strings) is returned unchanged.
+        """
+        match = DATA_URI_RE.fullmatch(src.strip()) if src else None
+        if not match:
+            return src
+        ext, payload = match.groups()
+        data = base64.b64decode(re.sub(r"\s+", "", payload))
+        return self.put(data, ext)
+
+    def rewrite_html(self, html):
+        """Replaces every inline <img src="data:..."> in an HTML string with a media URL."""
+        return IMG_SRC_RE.sub(lambda m: m.group(1) + self.put_data_uri(m.group(2)) + m.group(3), html)
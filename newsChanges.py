@@ -0,0 +1,168 @@
+import os
+import time
+import bisect
+import threading
+import logging
+
+from newsStore import NewsStore, entry_seq
+
+# "What changed since cursor N" for the news index, used by /news/changes and
+# the /news/stream event stream.
+#
+# The cursor is the "seq" number NewsStore stamps on every appended record.
+# The tracker tails the append log the same way NewsFeed does and remembers
+# the newest record per article, ordered by seq, so a delta is a bisect plus
+# a short slice no matter how large the archive is. Only when the snapshot is
+# replaced behind its back (compaction) does it scan the snapshot, for
+# records it has not seen yet.
+#
+# Cursors older than the retained history (server restart, MAX_HISTORY
+# trimming, or a bulk rewrite of the index) get `reset: true`: the client
+# should reload what it shows and continue from the returned cursor.
+log = logging.getLogger(__name__)
+MAX_HISTORY = 5000
+MAX_CHANGES = 200  # records per response; clients call again while "more" is true
+
+
+class NewsChanges:
+    """Sequence-ordered history of recently added or updated articles."""
+
+    def __init__(self, store=None, max_history=MAX_HISTORY):
+        self.store = store or NewsStore()
+        self.max_history = max_history
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.seqs = []        # seq of each history row, ascending
+        self.rows = []        # uniqueId of each history row
+        self.articles = {}    # uniqueId -> newest record
+        self.floor = 0        # cursors below this cannot be answered from the history
+        self.latest = 0
+        self.reset_seq = 0
+        self._snapshot_stat = None
+        self._log_offset = 0
+        self._started = False
+        self._watcher = None
+
+    # --- Keeping the history current ---
+
+    def refresh(self):
+        """Picks up records written since the last call. Returns True if the cursor moved."""
+        with self.lock:
+            before = self.latest
+            sequence = self.store.read_sequence() or {"seq": 0, "reset": 0}
+            try:
+                st = os.stat(self.store.json_path)
+                snapshot_stat = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                snapshot_stat = None
+
+            if not self._started or sequence["reset"] > self.reset_seq:
+                # First look at the index, or a bulk rewrite: start a new history
+                entries, self._log_offset = self.store.read_log(0)
+                log_seqs = [entry_seq(e) for e in entries if entry_seq(e)]
+                if self._started or not log_seqs:
+                    floor = sequence["seq"]
+                else:
+                    floor = min(log_seqs) - 1  # Everything still in the log can be replayed
+                self._clear(max(floor, sequence["reset"]))
+                self.reset_seq = sequence["reset"]
+                self._snapshot_stat = snapshot_stat
+                self._started = True
+            elif snapshot_stat != self._snapshot_stat:
+                # Compaction folded the log into the snapshot; pick up records appended
+                # between the last tail and the compaction, then follow the new log.
+                entries = [e for e in self.store.read_snapshot() if entry_seq(e) > self.latest]
+                more, self._log_offset = self.store.read_log(0)
+                entries += more
+                self._snapshot_stat = snapshot_stat
+            else:
+                entries, self._log_offset = self.store.read_log(self._log_offset)
+
+            for entry in sorted(entries, key=entry_seq):
+                self._add(entry)
+            self._trim()
+            if self.latest != before:
+                self.changed.notify_all()
+            return self.latest != before
+
+    def watch(self, interval):
+        """Starts (once) a daemon thread that refreshes every `interval` seconds and wakes waiting streams."""
+        with self.lock:
+            if self._watcher is not None:
+                return
+            self._watcher = threading.Thread(target=self._watch, args=(interval,), daemon=True)
+        self._watcher.start()
+
+    def _watch(self, interval):
+        while True:
+            try:
+                self.refresh()
+            except (OSError, ValueError) as e:
+                log.error("News change tracking failed: %s", e)
+            time.sleep(interval)
+
+    def _clear(self, floor):
+        self.seqs, self.rows, self.articles = [], [], {}
+        self.floor = self.latest = floor
+
+    def _add(self, entry):
+        seq = entry_seq(entry)
+        unique_id = entry.get("uniqueId")
+        if not unique_id or seq <= self.latest:
+            return  # Already seen, or written before sequence numbers existed
+        self.articles[unique_id] = entry
+        self.seqs.append(seq)
+        self.rows.append(unique_id)
+        self.latest = seq
+
+    def _trim(self):
+        if len(self.seqs) <= self.max_history:
+            return
+        cut = len(self.seqs) - self.max_history
+        self.floor = self.seqs[cut - 1]
+        for unique_id in self.rows[:cut]:
+            entry = self.articles.get(unique_id)
+            if entry is not None and entry_seq(entry) <= self.floor:
+                del self.articles[unique_id]
+        del self.seqs[:cut]
+        del self.rows[:cut]
+
+    # --- Queries ---
+
+    def cursor(self):
+        with self.lock:
+            return self.latest
+
+    def changes(self, since=None, limit=MAX_CHANGES):
+        """
+        Articles added or updated after cursor `since`, oldest change first:
+        {"cursor", "items", "more", "reset"}. Without `since` only the current
+        cursor is returned.
+        """
+        with self.lock:
+            if since is None:
+                return {"cursor": self.latest, "items": [], "more": False, "reset": False}
+            if since < self.floor or since > self.latest:
+                return {"cursor": self.latest, "items": [], "more": False, "reset": True}
+
+            items = []
+            cursor = since
+            for idx in range(bisect.bisect_right(self.seqs, since), len(self.seqs)):
+                entry = self.articles.get(self.rows[idx])
+                if entry is None or entry_seq(entry) != self.seqs[idx]:
+                    continue  # Superseded by a later update of the same article
+                if len(items) == limit:
+                    return {"cursor": cursor, "items": items, "more": True, "reset": False}
+                items.append(entry)
+                cursor = self.seqs[idx]
+            return {"cursor": self.latest, "items": items, "more": False, "reset": False}
+
+    def wait_for_changes(self, since, timeout):
+        """
+        Blocks until the cursor moves past `since` or `timeout` seconds pass and
+        returns the cursor. Needs watch() running to be woken up early.
+        """
+        with self.lock:
+            if self.latest == since:
+                self.changed.wait(timeout)
+            return self.latest
@@ -0,0 +1,131 @@
+import uuid
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+# Background export for the Qt editors.
+#
+# An export is a list of (label, step) pairs; every step is a plain function
+# that receives a shared `state` dict. The editor snapshots everything it
+# needs from its widgets on the GUI thread (headline, HTML, image bytes, ...)
+# and the steps run on a worker thread, so building the page, writing images
+# and appending to the news index never block the window. Steps must not
+# touch widgets; they report back through ExportSignals, which Qt delivers
+# on the GUI thread.
+#
+# Jobs run one at a time in submission order, so several exports can be
+# queued while the author keeps writing and the news index sees appends in
+# the order they were made.
+
+
+class ExportCancelled(Exception):
+    """Raised inside a job when it was cancelled before its final step."""
+
+
+class ExportSignals(QObject):
+    progress = pyqtSignal(str, int, str)  # job id, percent, step label
+    finished = pyqtSignal(str, object)    # job id, final state
+    failed = pyqtSignal(str, str)         # job id, error message
+    cancelled = pyqtSignal(str)           # job id
+
+
+class ExportJob(QRunnable):
+    """
+    Runs export steps in order. Cancellation is checked between steps, so a
+    step that has started (in particular the final news index append, which
+    is the commit point) always completes. Steps can register undo callables
+    in state["cleanup"]; they run if the job fails or is cancelled.
+    """
+
+    def __init__(self, steps, label="", state=None):
+        super().__init__()
+        self.id = uuid.uuid4().hex
+        self.label = label
+        self.steps = steps
+        self.state = dict(state or {})
+        self.state.setdefault("cleanup", [])
+        self.state.setdefault("warnings", [])
+        self.signals = ExportSignals()
+        self._cancelled = False
+        self.setAutoDelete(False)  # The queue keeps a reference until the job reports back
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        try:
+            for index, (label, step) in enumerate(self.steps):
+                if self._cancelled:
+                    raise ExportCancelled()
+                self.signals.progress.emit(self.id, int(index * 100 / len(self.steps)), label)
+                step(self.state)
+        except ExportCancelled:
+            self._rollback()
+            self.signals.cancelled.emit(self.id)
+            return
+        except Exception as e:
+            self._rollback()
+            self.signals.failed.emit(self.id, str(e))
+            return
+        self.state.pop("cleanup", None)
+        self.signals.progress.emit(self.id, 100, "Done")
+        self.signals.finished.emit(self.id, self.state)
+
+    def _rollback(self):
+        for undo in reversed(self.state.get("cleanup", [])):
+            try:
+                undo()
+            except OSError as e:
+                print(f"Export cleanup failed: {e}")
+
+
+class ExportQueue(QObject):
+    """Single background thread that runs ExportJobs one after another."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.jobs = {}      # job id -> job that has not reported back yet
+        self.finished = {}  # job id -> job that reported back, kept until its callbacks ran
+
+    def submit(self, steps, label="", state=None, on_progress=None, on_finished=None, on_failed=None,
+               on_cancelled=None):
+        """Queues an export and returns its job; the callbacks run on the GUI thread."""
+        job = ExportJob(steps, label, state)
+        # Connected first so the callbacks already see the job gone from pending();
+        # _forget keeps the job (and its signals object) alive until they ran
+        job.signals.finished.connect(self._forget)
+        job.signals.failed.connect(self._forget)
+        job.signals.cancelled.connect(self._forget)
+        for signal, callback in ((job.signals.progress, on_progress), (job.signals.finished, on_finished),
+                                 (job.signals.failed, on_failed), (job.signals.cancelled, on_cancelled)):
+            if callback is not None:
+                signal.connect(callback)
+        self.jobs[job.id] = job
+        self.pool.start(job)
+        return job
+
+    def pending(self):
+        return len(self.jobs)
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is not None:
+            job.cancel()
+
+    def cancel_all(self):
+        for job in list(self.jobs.values()):
+            job.cancel()
+
+    def wait_for_done(self, msecs=-1):
+        return self.pool.waitForDone(msecs)
+
+    def _forget(self, job_id, *args):
+        job = self.jobs.pop(job_id, None)
+        if job is not None:
+            self.finished[job_id] = job
+            # Runs after the callbacks, which were queued together with this slot
+            QTimer.singleShot(0, lambda: self.finished.pop(job_id, None))
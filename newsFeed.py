@@ -0,0 +1,225 @@
+import os
+import bisect
+import hashlib
+import threading
+import logging
+from datetime import datetime, timezone
+
+from newsStore import NewsStore
+from searchIndex import SearchIndex
+
+# Server-side view of the news index used by the /news API.
+#
+# Articles are kept sorted (newest first) globally and per category, so a page
+# request is a slice instead of a sort + filter over the whole archive. The
+# index is refreshed cheaply on each request: if the snapshot file is
+# unchanged only the new tail of the append log is read and inserted.
+# Searches go through an inverted index that is maintained alongside.
+#
+# Only the very first load builds the view inside a request. A new snapshot
+# later on (compaction, bulk rewrite) is indexed by a background thread while
+# requests keep being answered from the current view, which is then swapped
+# for the new one in a single step.
+log = logging.getLogger(__name__)
+DEFAULT_PAGE_SIZE = 9
+MAX_PAGE_SIZE = 100
+BREAKING_NEWS_COUNT = 10
+REQUIRED_FIELDS = ("title", "summary", "img", "date", "category", "uniqueId")
+
+
+def sort_key(entry):
+    return (entry.get("date", ""), entry.get("Time", ""), entry["uniqueId"])
+
+
+class NewsFeed:
+    """Pre-sorted, category-indexed news index that follows the NewsStore files."""
+
+    def __init__(self, store=None):
+        self.store = store or NewsStore()
+        self.lock = threading.RLock()
+        self.articles = {}      # uniqueId -> entry
+        self.ordered = []       # sort keys, oldest first
+        self.by_category = {}   # lower-cased category -> sort keys, oldest first
+        self.category_ids = {}  # lower-cased category -> uniqueIds, to scope searches
+        self.search_index = SearchIndex()
+        self.version = 0
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self._snapshot_stat = None
+        self._log_offset = 0
+        self._loaded = False
+        self._rebuilder = None
+
+    # --- Keeping the index current ---
+
+    def refresh(self):
+        """Picks up articles published since the last call. Returns True if anything changed."""
+        with self.lock:
+            snapshot_stat = self._snapshot_file_stat()
+            changed = False
+            if not self._loaded:
+                self._rebuild(self.store.read_snapshot())
+                self._snapshot_stat = snapshot_stat
+                self._log_offset = 0
+                self._loaded = changed = True
+            elif snapshot_stat != self._snapshot_stat:
+                # New snapshot (compaction or bulk rewrite): re-index it without blocking requests
+                self._rebuild_in_background()
+
+            entries, self._log_offset = self.store.read_log(self._log_offset)
+            for entry in entries:
+                self._add(entry)
+            if entries:
+                changed = True
+
+            if changed:
+                self.version += 1
+                self.last_modified = self._files_mtime()
+            return changed
+
+    def _snapshot_file_stat(self):
+        try:
+            st = os.stat(self.store.json_path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _rebuild_in_background(self):
+        if self._rebuilder is not None and self._rebuilder.is_alive():
+            return
+        self._rebuilder = threading.Thread(target=self._rebuild_and_swap, name="news-feed-rebuild", daemon=True)
+        self._rebuilder.start()
+
+    def _rebuild_and_swap(self):
+        try:
+            while True:
+                snapshot_stat = self._snapshot_file_stat()
+                fresh = NewsFeed(self.store)
+                fresh._rebuild(self.store.read_snapshot())
+                with self.lock:
+                    if self._snapshot_file_stat() != snapshot_stat:
+                        continue  # Rewritten again while indexing: start over
+                    self.articles, self.ordered = fresh.articles, fresh.ordered
+                    self.by_category, self.category_ids = fresh.by_category, fresh.category_ids
+                    self.search_index = fresh.search_index
+                    self._snapshot_stat = snapshot_stat
+                    entries, self._log_offset = self.store.read_log(0)
+                    for entry in entries:
+                        self._add(entry)
+                    self.version += 1
+                    self.last_modified = self._files_mtime()
+                    return
+        except (OSError, ValueError) as e:
+            log.error("News index rebuild failed (the previous view keeps serving): %s", e)
+
+    def _files_mtime(self):
+        mtimes = [os.path.getmtime(p) for p in (self.store.json_path, self.store.log_path) if os.path.exists(p)]
+        if not mtimes:
+            return datetime.now(timezone.utc).replace(microsecond=0)
+        return datetime.fromtimestamp(int(max(mtimes)), timezone.utc)
+
+    def _rebuild(self, entries):
+        self.articles = {}
+        for entry in entries:
+            if all(entry.get(field) for field in REQUIRED_FIELDS):
+                self.articles[entry["uniqueId"]] = entry  # Later records replace earlier ones
+        self.ordered = sorted(sort_key(entry) for entry in self.articles.values())
+        self.by_category = {}
+        self.category_ids = {}
+        for key in self.ordered:
+            category = self.articles[key[2]]["category"].lower()
+            self.by_category.setdefault(category, []).append(key)
+            self.category_ids.setdefault(category, set()).add(key[2])
+        self.search_index = SearchIndex()
+        self.search_index.build((e["uniqueId"], e["title"], e["summary"]) for e in self.articles.values())
+
+    def _add(self, entry):
+        if not all(entry.get(field) for field in REQUIRED_FIELDS):
+            return  # Same filter the home page always applied client-side
+        unique_id = entry["uniqueId"]
+        if unique_id in self.articles:
+            self._remove(self.articles[unique_id])
+
+        key = sort_key(entry)
+        self.articles[unique_id] = entry
+        bisect.insort(self.ordered, key)
+        bisect.insort(self.by_category.setdefault(entry["category"].lower(), []), key)
+        self.category_ids.setdefault(entry["category"].lower(), set()).add(unique_id)
+        self.search_index.add(unique_id, entry["title"], entry["summary"])
+
+    def _remove(self, entry):
+        key = sort_key(entry)
+        for keys in (self.ordered, self.by_category.get(entry["category"].lower(), [])):
+            idx = bisect.bisect_left(keys, key)
+            if idx < len(keys) and keys[idx] == key:
+                del keys[idx]
+        self.category_ids.get(entry["category"].lower(), set()).discard(entry["uniqueId"])
+        self.search_index.remove(entry["uniqueId"])
+        del self.articles[entry["uniqueId"]]
+
+    # --- Queries ---
+
+    def etag(self, *parts):
+        # Snapshot stat + log offset identify the index contents across restarts
+        raw = "|".join([str(self._snapshot_stat), str(self._log_offset)] + [str(p) for p in parts])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def keys_for(self, category):
+        """Sort keys (oldest first) for a category tile: a category, 'All' or 'Breaking News'."""
+        if not category or category == "All":
+            return self.ordered
+        if category == "Breaking News":
+            return self.ordered[-BREAKING_NEWS_COUNT:]
+        return self.by_category.get(category.lower(), [])
+
+    @staticmethod
+    def keys_in_range(keys, date_from=None, date_to=None):
+        """Sort keys within inclusive ISO dates; keys start with the date, so this is a bisected slice."""
+        lo = bisect.bisect_left(keys, (date_from,)) if date_from else 0
+        hi = bisect.bisect_right(keys, (date_to + "\uffff",)) if date_to else len(keys)
+        return keys[lo:hi]
+
+    def search_scope(self, category, date_from=None, date_to=None):
+        """Ids a search within a category tile and date range is limited to (None: no limit)."""
+        if date_from or date_to:
+            return {key[2] for key in self.keys_in_range(self.keys_for(category), date_from, date_to)}
+        if not category or category == "All":
+            return None
+        if category == "Breaking News":
+            return {key[2] for key in self.keys_for(category)}
+        return self.category_ids.get(category.lower(), set())
+
+    def query(self, category="All", page=1, page_size=DEFAULT_PAGE_SIZE, q="", date_from=None, date_to=None):
+        """
+        Returns one page of articles: newest first, or by relevance when searching.
+        `date_from` / `date_to` are inclusive ISO dates (YYYY-MM-DD).
+        """
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        with self.lock:
+            if q:
+                # Only the results up to the requested page are ranked
+                total, results = self.search_index.search(q, limit=max(1, page) * page_size,
+                                                          within=self.search_scope(category, date_from, date_to))
+            else:
+                keys = self.keys_for(category)
+                if date_from or date_to:
+                    keys = self.keys_in_range(keys, date_from, date_to)
+                total = len(keys)
+
+            total_pages = max(1, -(-total // page_size))
+            page = max(1, min(page, total_pages))
+            if q:
+                start = (page - 1) * page_size
+                page_ids = [doc_id for _, doc_id in results[start:start + page_size]]
+            else:
+                # Keys are stored oldest first, so newest-first pages are slices from the end
+                end = total - (page - 1) * page_size
+                page_ids = [k[2] for k in reversed(keys[max(0, end - page_size):end])]
+            items = [self.articles[doc_id] for doc_id in page_ids]
+
+        return {
+            "items": items,
+            "page": page,
+            "page_size": page_size,
+            "total": total,
+            "total_pages": total_pages,
+        }
@@ -0,0 +1,382 @@
+import os
+import re
+import copy
+import json
+import time
+import heapq
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from newsStore import write_json_atomic
+from newsFeed import sort_key, REQUIRED_FIELDS, BREAKING_NEWS_COUNT, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+# Date-partitioned copy of the news index, sharded per category.
+#
+#   Data/shards/<Category>/<YYYY-MM>.json  - one month of one category, newest first
+#   Data/shards/manifest.json              - article counts per shard and the
+#                                            latest LATEST_COUNT articles per category
+#   Data/shards/locations.jsonl            - append-only log of the shard each
+#                                            article was last written to
+#
+# NewsStore keeps the shards in step with the index: publishing rewrites the
+# single shard the article belongs to plus the manifest, and compaction /
+# bulk rewrites rebuild the whole tree (writing only shards that changed).
+# Readers use the manifest counts to work out which shards a page or a date
+# range covers and load just those; the breaking-news slider and the first
+# page of every category come straight from the manifest.
+#
+# An edit that moves an article to another category or month also removes it
+# from its previous shard, found through the locations log; rebuilds rewrite
+# the log from scratch.
+#
+# The manifest "version" (part of every ETag) is the write time in
+# microseconds, bumped by one if that would not be newer than the previous
+# version. A manifest rebuilt after invalidate() therefore still gets a
+# version above every earlier one, and clients never see an old ETag again.
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+SHARDS_DIR = os.path.join(PROJECT_ROOT, "Data", "shards")
+MANIFEST_NAME = "manifest.json"
+LOCATIONS_NAME = "locations.jsonl"
+LATEST_COUNT = max(BREAKING_NEWS_COUNT, DEFAULT_PAGE_SIZE)
+UNDATED = "undated"  # Shard for articles whose date is not ISO formatted
+SHARD_CACHE_SIZE = 256
+MONTH_RE = re.compile(r"^\d{4}-\d{2}")
+UNSAFE_NAME_RE = re.compile(r"[^\w\- ]")
+
+
+def shard_month(entry):
+    date = entry.get("date", "")
+    return date[:7] if MONTH_RE.match(date) else UNDATED
+
+
+def month_order(month):
+    """Sort key that places the undated shard before (older than) every real month."""
+    return (month != UNDATED, month)
+
+
+def newest_first(entries):
+    return sorted(entries, key=sort_key, reverse=True)
+
+
+class NewsShards:
+    """Writer and reader for the sharded news index under `shards_dir`."""
+
+    def __init__(self, shards_dir=SHARDS_DIR, latest_count=LATEST_COUNT):
+        self.shards_dir = shards_dir
+        self.manifest_path = os.path.join(shards_dir, MANIFEST_NAME)
+        self.locations_path = os.path.join(shards_dir, LOCATIONS_NAME)
+        self.latest_count = latest_count
+        self.lock = threading.Lock()
+        self._manifest = None
+        self._manifest_stat = None
+        self._shards = OrderedDict()  # path -> (stat, entries)
+        self._locations = {}          # uniqueId -> (category, month), see read_locations()
+        self._locations_state = (None, 0)  # (inode, bytes read) of the locations log
+
+    def shard_path(self, category, month):
+        return os.path.join(self.shards_dir, UNSAFE_NAME_RE.sub("_", category), f"{month}.json")
+
+    # --- Reading ---
+
+    def available(self):
+        """True once a full build wrote the manifest and the locations log (put() needs both)."""
+        return os.path.exists(self.manifest_path) and os.path.exists(self.locations_path)
+
+    def read_manifest(self):
+        """The manifest, re-read only when the file changed; an empty one if it is missing."""
+        try:
+            st = os.stat(self.manifest_path)
+            stat = (st.st_ino, st.st_mtime_ns, st.st_size)
+        except OSError:
+            stat = None
+        with self.lock:
+            if stat != self._manifest_stat or self._manifest is None:
+                manifest = {}
+                if stat is not None:
+                    try:
+                        with open(self.manifest_path, "r", encoding="utf-8") as f:
+                            manifest = json.load(f)
+                    except (OSError, ValueError):
+                        manifest = {}
+                manifest.setdefault("version", 0)
+                manifest.setdefault("categories", {})
+                manifest.setdefault("breaking", [])
+                self._manifest, self._manifest_stat = manifest, stat
+            return self._manifest
+
+    def read_shard(self, category, month):
+        """Articles of one shard, newest first (cached until the file changes)."""
+        path = self.shard_path(category, month)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return []
+        stat = (st.st_ino, st.st_mtime_ns, st.st_size)
+        with self.lock:
+            cached = self._shards.get(path)
+            if cached and cached[0] == stat:
+                self._shards.move_to_end(path)
+                return cached[1]
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return []
+        if not isinstance(entries, list):
+            return []
+        with self.lock:
+            self._shards[path] = (stat, entries)
+            self._shards.move_to_end(path)
+            while len(self._shards) > SHARD_CACHE_SIZE:
+                self._shards.popitem(last=False)
+        return entries
+
+    def etag(self, *parts):
+        raw = "|".join([str(self.read_manifest()["version"])] + [str(p) for p in parts])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def last_modified(self):
+        try:
+            return datetime.fromtimestamp(int(os.path.getmtime(self.manifest_path)), timezone.utc)
+        except OSError:
+            return datetime.now(timezone.utc).replace(microsecond=0)
+
+    def categories_for(self, manifest, category):
+        """Manifest category names covered by a category tile ('All' covers every one)."""
+        if not category or category == "All":
+            return list(manifest["categories"])
+        wanted = category.lower()
+        return [name for name in manifest["categories"] if name.lower() == wanted]
+
+    def query(self, category="All", page=1, page_size=DEFAULT_PAGE_SIZE, date_from=None, date_to=None):
+        """
+        One page of articles, newest first, in the same shape as NewsFeed.query.
+        `date_from` / `date_to` are inclusive ISO dates (YYYY-MM-DD); only the
+        months they span are considered.
+        """
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        manifest = self.read_manifest()
+        in_range = self._date_filter(date_from, date_to)
+
+        if category == "Breaking News":
+            breaking = manifest["breaking"][:BREAKING_NEWS_COUNT]
+            return paginate([e for e in breaking if in_range(e)], page, page_size)
+
+        names = self.categories_for(manifest, category)
+        months = {}  # month -> [(category, article count)]
+        for name in names:
+            for month, count in manifest["categories"][name]["months"].items():
+                if self._month_in_range(month, date_from, date_to):
+                    months.setdefault(month, []).append((name, count))
+        ordered_months = sorted(months, key=month_order, reverse=True)
+
+        # Months cut by the date range are loaded up front to get exact counts
+        loaded = {}
+        counts = []
+        for month in ordered_months:
+            if self._month_is_partial(month, date_from, date_to):
+                loaded[month] = [e for e in self._merge_month(month, months[month]) if in_range(e)]
+                counts.append(len(loaded[month]))
+            else:
+                counts.append(sum(count for _, count in months[month]))
+        total = sum(counts)
+        total_pages = max(1, -(-total // page_size))
+        page = max(1, min(page, total_pages))
+        start = (page - 1) * page_size
+        end = start + page_size
+
+        if date_from is None and date_to is None:
+            latest = self._latest_for(manifest, names, category)
+            if end <= len(latest) or len(latest) == total:
+                return page_result(latest[start:end], page, page_size, total, total_pages)
+
+        items = []
+        position = 0
+        for month, count in zip(ordered_months, counts):
+            if position + count > start and position < end:
+                entries = loaded[month] if month in loaded else self._merge_month(month, months[month])
+                items.extend(entries[max(0, start - position):end - position])
+            position += count
+            if position >= end:
+                break
+        return page_result(items, page, page_size, total, total_pages)
+
+    def _latest_for(self, manifest, names, category):
+        if not category or category == "All":
+            return manifest["breaking"]  # The newest articles across every category
+        if len(names) == 1:
+            return manifest["categories"][names[0]]["latest"]
+        return []
+
+    def _merge_month(self, month, shards):
+        """Articles of one month across the given (category, count) shards, newest first."""
+        lists = [self.read_shard(name, month) for name, _ in shards]
+        if len(lists) == 1:
+            return lists[0]
+        return list(heapq.merge(*lists, key=sort_key, reverse=True))
+
+    @staticmethod
+    def _date_filter(date_from, date_to):
+        def in_range(entry):
+            date = entry.get("date", "")[:10]
+            return (date_from is None or date >= date_from) and (date_to is None or date <= date_to)
+        return in_range
+
+    @staticmethod
+    def _month_in_range(month, date_from, date_to):
+        if date_from is None and date_to is None:
+            return True
+        if month == UNDATED:
+            return False
+        return (date_from is None or month >= date_from[:7]) and (date_to is None or month <= date_to[:7])
+
+    @staticmethod
+    def _month_is_partial(month, date_from, date_to):
+        return (date_from is not None and month == date_from[:7]) or (date_to is not None and month == date_to[:7])
+
+    # --- Writing (called by NewsStore while it holds the index lock) ---
+
+    def read_locations(self):
+        """uniqueId -> (category, month) of the shard each article was last written to."""
+        try:
+            st = os.stat(self.locations_path)
+        except OSError:
+            self._locations, self._locations_state = {}, (None, 0)
+            return self._locations
+        inode, offset = self._locations_state
+        if inode != st.st_ino or offset > st.st_size:
+            self._locations, offset = {}, 0  # Rewritten by a rebuild since the last read
+        with open(self.locations_path, "rb") as f:
+            f.seek(offset)
+            chunk = f.read()
+        for line in chunk.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break  # Torn last line; read again once it is complete
+            offset += len(line)
+            try:
+                unique_id, category, month = json.loads(line)
+            except ValueError:
+                continue
+            self._locations[unique_id] = (category, month)
+        self._locations_state = (st.st_ino, offset)
+        return self._locations
+
+    def put(self, entry):
+        """
+        Stores one published or updated article: rewrites its shard (and the
+        one it was in before, if an edit moved it) and the manifest.
+        """
+        if not entry.get("uniqueId") or not entry.get("category"):
+            return
+        unique_id = entry["uniqueId"]
+        category, month = entry["category"], shard_month(entry)
+        previous = self.read_locations().get(unique_id)
+
+        manifest = copy.deepcopy(self.read_manifest())  # The cached copy stays intact if a write fails
+        if previous is not None and previous != (category, month):
+            old_category, old_month = previous
+            self._write_shard(manifest, old_category, old_month,
+                              [e for e in self.read_shard(old_category, old_month) if e["uniqueId"] != unique_id])
+        entries = [e for e in self.read_shard(category, month) if e["uniqueId"] != unique_id]
+        if all(entry.get(field) for field in REQUIRED_FIELDS):
+            entries = newest_first(entries + [entry])
+        self._write_shard(manifest, category, month, entries)
+
+        with open(self.locations_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps([unique_id, category, month], ensure_ascii=False) + "\n")
+        self._write_manifest(manifest)
+
+    def _write_shard(self, manifest, category, month, entries):
+        """Writes one shard and updates its count and the category's latest articles in `manifest`."""
+        shard_info = manifest["categories"].setdefault(category, {"months": {}, "latest": []})
+        write_json_atomic(self.shard_path(category, month), entries, ensure_ascii=False)
+        if entries:
+            shard_info["months"][month] = len(entries)
+        else:
+            shard_info["months"].pop(month, None)
+        shard_info["latest"] = self._collect_latest(category, shard_info["months"])
+
+    def rebuild(self, entries):
+        """Re-shards the whole index; shards whose contents did not change are left untouched."""
+        shards = {}
+        for entry in entries:
+            if all(entry.get(field) for field in REQUIRED_FIELDS):
+                shards.setdefault((entry["category"], shard_month(entry)), {})[entry["uniqueId"]] = entry
+
+        manifest = {"version": self.read_manifest()["version"], "categories": {}, "breaking": []}
+        keep = set()
+        for (category, month), by_id in shards.items():
+            shard = newest_first(by_id.values())
+            path = self.shard_path(category, month)
+            keep.add(os.path.abspath(path))
+            if self.read_shard(category, month) != shard:
+                write_json_atomic(path, shard, ensure_ascii=False)
+            info = manifest["categories"].setdefault(category, {"months": {}, "latest": []})
+            info["months"][month] = len(shard)
+        for category, info in manifest["categories"].items():
+            info["months"] = dict(sorted(info["months"].items(), key=lambda item: month_order(item[0])))
+            info["latest"] = self._collect_latest(category, info["months"])
+
+        for directory, _, files in os.walk(self.shards_dir):
+            for name in files:
+                path = os.path.abspath(os.path.join(directory, name))
+                if name.endswith(".json") and name != MANIFEST_NAME and path not in keep:
+                    os.remove(path)
+        self._write_locations(shards)
+        self._write_manifest(manifest)
+
+    def _write_locations(self, shards):
+        """Replaces the locations log with the shard of every article in `shards`."""
+        tmp_path = f"{self.locations_path}.{os.getpid()}.tmp"
+        os.makedirs(self.shards_dir, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for (category, month), by_id in shards.items():
+                for unique_id in by_id:
+                    f.write(json.dumps([unique_id, category, month], ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.locations_path)
+
+    def invalidate(self):
+        """Drops the manifest so readers fall back to the full index until the next rebuild."""
+        try:
+            os.remove(self.manifest_path)
+        except OSError:
+            pass
+
+    def _collect_latest(self, category, months):
+        """Newest articles of a category, reading shards from the newest month down."""
+        latest = []
+        for month in sorted(months, key=month_order, reverse=True):
+            latest.extend(self.read_shard(category, month)[:self.latest_count - len(latest)])
+            if len(latest) >= self.latest_count:
+                break
+        return latest
+
+    def _write_manifest(self, manifest):
+        manifest["version"] = max(manifest["version"] + 1, time.time_ns() // 1000)
+        latest = heapq.merge(*(info["latest"] for info in manifest["categories"].values()),
+                             key=sort_key, reverse=True)
+        manifest["breaking"] = [e for _, e in zip(range(self.latest_count), latest)]
+        manifest["categories"] = {name: info for name, info in manifest["categories"].items() if info["months"]}
+        write_json_atomic(self.manifest_path, manifest, ensure_ascii=False)
+
+
+def paginate(entries, page, page_size):
+    total = len(entries)
+    total_pages = max(1, -(-total // page_size))
+    page = max(1, min(page, total_pages))
+    start = (page - 1) * page_size
+    return page_result(entries[start:start + page_size], page, page_size, total, total_pages)
+
+
+def page_result(items, page, page_size, total, total_pages):
+    return {
+        "items": items,
+        "page": page,
+        "page_size": page_size,
+        "total": total,
+        "total_pages": total_pages,
+    }
@@ -0,0 +1,313 @@
+import os
+import json
+import time
+import threading
+import logging
+from contextlib import contextmanager
+
+# Crash-safe storage for the news index.
+#
+# The index is kept as two files:
+#   Data/news.json        - snapshot, a plain JSON list (what the site always read)
+#   Data/news.log.jsonl   - append-only log, one JSON article per line
+#
+# Publishing an article appends a single line to the log and fsyncs it, so the
+# cost no longer depends on how many articles already exist. Every
+# `compact_every` appends the log is folded into a fresh snapshot that is
+# written to a temporary file and atomically renamed over the old one.
+# Records are keyed by "uniqueId": a later record with the same id replaces
+# the earlier one, which also makes replaying the log after a crash harmless.
+# Records without a uniqueId are keyed by their seq instead, so a crash
+# between writing the snapshot and truncating the log does not duplicate them.
+#
+# Every record written by append() carries a "seq" number, reserved in
+# Data/news.seq.json before the log line is written, so numbers only ever
+# grow (a crash can leave a gap, never a duplicate). Clients use it as a
+# cursor for "what changed since". write_all() starts a new epoch: its
+# "reset" seq tells cursor holders to reload instead of applying deltas.
+#
+# The main index is also kept as date-partitioned, per-category shards under
+# Data/shards (see newsShards.py), updated under the same lock.
+log = logging.getLogger(__name__)
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+NEWS_JSON_PATH = os.path.join(PROJECT_ROOT, "Data", "news.json")
+NEWS_SHARDS_DIR = os.path.join(PROJECT_ROOT, "Data", "shards")
+COMPACT_EVERY = 500
+LOCK_TIMEOUT = 30  # seconds without a heartbeat after which a lock file is considered stale
+
+
+def fsync_dir(path):
+    """Flushes a directory entry (after a rename) where the platform supports it."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # Windows cannot open directories; rename is already durable enough there
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_json_atomic(path, data, **dump_kwargs):
+    """Writes JSON to a temporary file, fsyncs it and renames it into place."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, **dump_kwargs)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    fsync_dir(directory)
+
+
+class NewsStore:
+    """Append-only news index with periodic compaction into a JSON snapshot."""
+
+    def __init__(self, json_path=NEWS_JSON_PATH, compact_every=COMPACT_EVERY, shards_dir=None):
+        self.json_path = json_path
+        base, _ = os.path.splitext(json_path)
+        self.log_path = f"{base}.log.jsonl"
+        self.lock_path = f"{json_path}.lock"
+        self.seq_path = f"{base}.seq.json"
+        self.compact_every = compact_every
+        # Only the main index is sharded unless a directory is given ("" disables it)
+        if shards_dir is None and os.path.abspath(json_path) == NEWS_JSON_PATH:
+            shards_dir = NEWS_SHARDS_DIR
+        self.shards_dir = shards_dir or None
+        self._shards = None
+
+    @property
+    def shards(self):
+        """NewsShards for this index, or None when it is not sharded."""
+        if self.shards_dir and self._shards is None:
+            from newsShards import NewsShards  # newsShards imports this module
+            self._shards = NewsShards(self.shards_dir)
+        return self._shards
+
+    # --- Locking ---
+
+    @contextmanager
+    def lock(self):
+        """
+        Inter-process lock based on an exclusively created lock file. While it
+        is held, a thread touches the file every LOCK_TIMEOUT / 3 seconds, so
+        only the lock of a crashed writer ever looks stale.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.lock_path)), exist_ok=True)
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.lock_path) > LOCK_TIMEOUT:
+                        os.remove(self.lock_path)  # Writer crashed while holding the lock
+                        continue
+                except OSError:
+                    continue
+                time.sleep(0.01)
+        held = threading.Event()
+
+        def heartbeat():
+            while not held.wait(LOCK_TIMEOUT / 3):
+                try:
+                    os.utime(self.lock_path)
+                except OSError:
+                    pass
+
+        keeper = threading.Thread(target=heartbeat, name="news-lock-heartbeat", daemon=True)
+        try:
+            os.write(fd, str(os.getpid()).encode())
+            keeper.start()
+            yield
+        finally:
+            held.set()
+            if keeper.is_alive():
+                keeper.join()
+            os.close(fd)
+            try:
+                os.remove(self.lock_path)
+            except OSError:
+                pass
+
+    # --- Reading ---
+
+    def read_snapshot(self):
+        if not os.path.exists(self.json_path):
+            return []
+        with open(self.json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, list) else []
+
+    def read_log(self, offset=0):
+        """
+        Returns (entries, new_offset) for the log records written after `offset`.
+        A torn last line (crash in the middle of an append) is left unread so
+        callers tailing the log pick it up once it is complete.
+        """
+        if not os.path.exists(self.log_path):
+            return [], 0
+        with open(self.log_path, "rb") as f:
+            if offset > os.fstat(f.fileno()).st_size:
+                offset = 0  # The log was compacted (truncated) since the last read
+            f.seek(offset)
+            chunk = f.read()
+
+        entries = []
+        consumed = 0
+        for line in chunk.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break
+            consumed += len(line)
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Skip a record damaged by an earlier crash
+            if isinstance(entry, dict):
+                entries.append(entry)
+        return entries, offset + consumed
+
+    def load(self):
+        """Returns the full index: snapshot merged with the log, in publishing order."""
+        entries, _ = self.read_log()
+        return merge_entries(self.read_snapshot(), entries)
+
+    def read_sequence(self):
+        """{"seq": last reserved seq, "reset": seq of the last bulk rewrite}, or None if not recorded yet."""
+        try:
+            with open(self.seq_path, "r", encoding="utf-8") as f:
+                sequence = json.load(f)
+            return {"seq": int(sequence.get("seq", 0)), "reset": int(sequence.get("reset", 0))}
+        except (OSError, ValueError, TypeError, AttributeError):
+            return None
+
+    # --- Writing ---
+
+    def _reserve_seq(self, reset=False):
+        sequence = self.read_sequence()
+        if sequence is None:
+            # Index written before sequence numbers existed: continue after the highest one seen
+            sequence = {"seq": max((entry_seq(e) for e in self.load()), default=0), "reset": 0}
+        sequence["seq"] += 1
+        if reset:
+            sequence["reset"] = sequence["seq"]
+        write_json_atomic(self.seq_path, sequence)
+        return sequence["seq"]
+
+    def append(self, entry):
+        """
+        Appends one article record; cost is independent of the index size.
+        Returns the record's sequence number.
+        """
+        with self.lock():
+            entry = dict(entry, seq=self._reserve_seq())
+            line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+            fd = os.open(self.log_path, os.O_CREAT | os.O_APPEND | os.O_RDWR | getattr(os, "O_BINARY", 0), 0o644)
+            try:
+                size = os.fstat(fd).st_size
+                if size:
+                    # Terminate a line left incomplete by a crashed writer
+                    os.lseek(fd, size - 1, os.SEEK_SET)
+                    if os.read(fd, 1) != b"\n":
+                        line = b"\n" + line
+                os.write(fd, line)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+            if self.count_log_records() >= self.compact_every:
+                self._compact_locked()
+            elif self.shards and self.shards.available():
+                self._update_shards(lambda: self.shards.put(entry))
+            elif self.shards:
+                # Never sharded (or invalidated): a manifest of just this article would hide the rest
+                self._update_shards(lambda: self.shards.rebuild(self.load()))
+            return entry["seq"]
+
+    def count_log_records(self):
+        if not os.path.exists(self.log_path):
+            return 0
+        with open(self.log_path, "rb") as f:
+            return sum(1 for line in f if line.strip())
+
+    def compact(self):
+        """Folds the log into a new snapshot and empties the log."""
+        with self.lock():
+            self._compact_locked()
+
+    def _compact_locked(self):
+        entries = self.load()
+        write_json_atomic(self.json_path, entries, indent=4)
+        # The snapshot already contains every log record, so a crash before
+        # the truncate only means those records are merged again next time.
+        with open(self.log_path, "wb") as f:
+            f.flush()
+            os.fsync(f.fileno())
+        if self.shards:
+            self._update_shards(lambda: self.shards.rebuild(entries))
+
+    def write_all(self, entries):
+        """Replaces the whole index (bulk generators and cleanup scripts)."""
+        entries = list(entries)
+        with self.lock():
+            self._reserve_seq(reset=True)
+            write_json_atomic(self.json_path, entries, indent=4)
+            with open(self.log_path, "wb") as f:
+                f.flush()
+                os.fsync(f.fileno())
+            if self.shards:
+                self._update_shards(lambda: self.shards.rebuild(entries))
+
+    def rebuild_shards(self):
+        """Re-shards the whole index (first run, or after a failed shard update)."""
+        with self.lock():
+            self.shards.rebuild(self.load())
+
+    def _update_shards(self, update):
+        # The snapshot/log are the source of truth: a shard failure must not
+        # fail the publish, it only sends readers back to the full index.
+        try:
+            update()
+        except (OSError, ValueError) as e:
+            log.warning("Could not update news shards: %s", e)
+            self.shards.invalidate()
+
+
+def entry_seq(entry):
+    """Sequence number of a record; 0 for records written before sequences existed."""
+    seq = entry.get("seq")
+    return seq if isinstance(seq, int) else 0
+
+
+def record_key(entry):
+    """Identity of a record when merging: its uniqueId, else its seq, else None (never merged)."""
+    unique_id = entry.get("uniqueId")
+    if unique_id:
+        return unique_id
+    seq = entry_seq(entry)
+    return ("seq", seq) if seq else None
+
+
+def merge_entries(entries, updates):
+    """Applies `updates` on top of `entries`; records with the same record_key are replaced in place."""
+    merged = list(entries)
+    positions = {}
+    for i, e in enumerate(merged):
+        key = record_key(e)
+        if key is not None:
+            positions[key] = i
+    for entry in updates:
+        key = record_key(entry)
+        if key is not None and key in positions:
+            merged[positions[key]] = entry
+        else:
+            if key is not None:
+                positions[key] = len(merged)
+            merged.append(entry)
+    return merged
@@ -0,0 +1,185 @@
+import os
+import math
+import time
+import uuid
+import sqlite3
+import threading
+
+# Admission control for summary requests.
+#
+# Two independent limits, both kept in a local SQLite file so every server
+# process on the machine shares them:
+#   - a token bucket per client address: `perClientBurst` requests at once,
+#     then `perClientRate` per second;
+#   - a guard on real LLM calls (cache hits and requests joining an in-flight
+#     job do not count): at most `llmConcurrency` running across all workers,
+#     and `llmBudgetPerHour` calls per hour (a global token bucket). Every
+#     backend call is charged, so a map-reduce summary of an article in five
+#     chunks costs six. `llmConcurrency` also sizes each process's job pool.
+# A request over a limit is rejected immediately with the number of seconds
+# after which a retry can succeed, instead of waiting for a free worker. Once
+# a summary job is accepted, its calls wait for a free slot instead.
+#
+# Concurrency is tracked as leases with an expiry, so a worker that dies in
+# the middle of a call frees its slot after `llmLeaseSeconds`.
+#
+# Settings come from the "rateLimits" section of config.json.
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+RATE_LIMIT_PATH = os.path.join(PROJECT_ROOT, "Data", "ratelimits.sqlite3")
+DEFAULT_SETTINGS = {
+    "perClientRate": 0.1,
+    "perClientBurst": 5,
+    "llmConcurrency": 4,
+    "llmBudgetPerHour": 300,
+    "llmLeaseSeconds": 300,
+    "trustForwardedFor": False,
+}
+BUDGET_BUCKET = "llm-budget"
+BUSY_RETRY_AFTER = 2  # seconds; LLM calls usually finish well within this many
+SLOT_POLL_INTERVAL = 0.1  # seconds between tries while waiting for a free LLM slot
+PRUNE_EVERY = 1000    # client buckets are pruned once every this many checks
+
+
+class RateLimited(Exception):
+    """Raised when a request is over a limit; `retry_after` is in seconds."""
+
+    def __init__(self, message, retry_after, reason):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.reason = reason
+
+    def retry_after_header(self):
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+def rate_limit_settings(config):
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update((config or {}).get("rateLimits", {}))
+    return settings
+
+
+class RateLimiter:
+    """Per-client token buckets and an LLM concurrency/budget guard shared through SQLite."""
+
+    def __init__(self, settings=None, db_path=RATE_LIMIT_PATH):
+        settings = settings or DEFAULT_SETTINGS
+        self.client_rate = float(settings["perClientRate"])
+        self.client_burst = float(settings["perClientBurst"])
+        self.llm_concurrency = int(settings["llmConcurrency"])
+        self.llm_budget = float(settings["llmBudgetPerHour"])
+        self.lease_seconds = float(settings["llmLeaseSeconds"])
+        self.trust_forwarded_for = bool(settings["trustForwardedFor"])
+        self.lock = threading.Lock()
+        self.checks = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # Autocommit mode: every check is one explicit BEGIN IMMEDIATE transaction
+        self.db = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")  # Losing the last bucket update in a crash is harmless
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " key TEXT PRIMARY KEY,"
+            " tokens REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            " id TEXT PRIMARY KEY,"
+            " expires_at REAL NOT NULL)"
+        )
+
+    def _transaction(self, work):
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(time.time())
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+            return result
+
+    def _level(self, now, key, rate, capacity):
+        """Tokens currently in a bucket."""
+        row = self.db.execute("SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)).fetchone()
+        return capacity if row is None else min(capacity, row[0] + max(0.0, now - row[1]) * rate)
+
+    def _take(self, now, key, rate, capacity):
+        """Takes one token from a bucket; returns 0, or the seconds until a token is available."""
+        tokens = self._level(now, key, rate, capacity)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / rate if rate > 0 else 3600.0
+        self.db.execute("INSERT OR REPLACE INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                        (key, tokens, now))
+        return wait
+
+    # --- Per-client limit ---
+
+    def check_client(self, client):
+        """Counts one request from `client`; raises RateLimited if its bucket is empty."""
+        def work(now):
+            self.checks += 1
+            if self.checks % PRUNE_EVERY == 0 and self.client_rate > 0:
+                # A bucket untouched for this long has refilled completely; it is the same as no row
+                self.db.execute("DELETE FROM buckets WHERE key LIKE 'client:%' AND updated_at < ?",
+                                (now - self.client_burst / self.client_rate,))
+            return self._take(now, f"client:{client}", self.client_rate, self.client_burst)
+
+        wait = self._transaction(work)
+        if wait:
+            raise RateLimited("Too many summary requests, please slow down.", wait, "client")
+
+    # --- LLM guard ---
+
+    def check_llm_budget(self):
+        """Raises RateLimited if the hourly budget has no call left (takes nothing)."""
+        def work(now):
+            rate = self.llm_budget / 3600
+            tokens = self._level(now, BUDGET_BUCKET, rate, self.llm_budget)
+            if tokens >= 1:
+                return 0.0
+            return (1 - tokens) / rate if rate > 0 else 3600.0
+
+        wait = self._transaction(work)
+        if wait:
+            raise RateLimited("The summary budget for this hour is used up.", wait, "budget")
+
+    def admit_llm_call(self, wait=0.0):
+        """
+        Reserves one LLM call against the concurrency cap and the hourly budget,
+        waiting up to `wait` seconds for a free slot. Returns a function that
+        releases the slot; raises RateLimited if none is free or the budget is used up.
+        """
+        lease_id = uuid.uuid4().hex
+        deadline = time.monotonic() + wait
+
+        def work(now):
+            self.db.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+            running = self.db.execute("SELECT COUNT(*) FROM leases").fetchone()[0]
+            if running >= self.llm_concurrency:
+                return RateLimited("The summarizer is busy, please retry shortly.", BUSY_RETRY_AFTER, "concurrency")
+            wait = self._take(now, BUDGET_BUCKET, self.llm_budget / 3600, self.llm_budget)
+            if wait:
+                return RateLimited("The summary budget for this hour is used up.", wait, "budget")
+            self.db.execute("INSERT INTO leases (id, expires_at) VALUES (?, ?)", (lease_id, now + self.lease_seconds))
+            return None
+
+        while True:
+            rejected = self._transaction(work)
+            if rejected is None:
+                return lambda: self._release(lease_id)
+            if rejected.reason != "concurrency" or time.monotonic() >= deadline:
+                raise rejected
+            time.sleep(SLOT_POLL_INTERVAL)
+
+    def _release(self, lease_id):
+        with self.lock:
+            self.db.execute("DELETE FROM leases WHERE id = ?", (lease_id,))
+
+    def running_llm_calls(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM leases WHERE expires_at >= ?", (time.time(),)).fetchone()[0]
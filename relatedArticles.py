@@ -0,0 +1,410 @@
+import os
+import math
+import threading
+import importlib.util
+import logging
+from functools import lru_cache
+from collections import Counter
+
+from articleText import read_local_article
+from newsFeed import REQUIRED_FIELDS
+from newsStore import NewsStore, entry_seq
+from searchIndex import tokenize
+
+# "Related stories": the TOP_K most similar articles of every article, by
+# cosine similarity of TF-IDF vectors over the title (counted twice), the
+# summary and, when the page is on disk, the article text.
+#
+# The vectors are the rows of one L2-normalised SciPy sparse matrix. Instead
+# of comparing every pair of articles, neighbours are found a batch of rows
+# at a time with one sparse product against the transposed matrix, so the
+# work only touches articles that share a term with the batch. Two limits
+# keep that tractable on a 100k-article archive:
+#   - terms found in more than MAX_DF of the articles (and STOP_WORDS) are not
+#     indexed: they make every pair a candidate and say little about the topic;
+#   - each query row keeps only its QUERY_TERMS heaviest terms, so scores are
+#     a slight underestimate of the full cosine.
+#
+# Publishing is applied incrementally (update()): the new row is scored
+# against the matrix with one sparse product, gets its own neighbours, and is
+# inserted into the lists of the articles it beats. The vocabulary and IDF
+# weights stay as they were at the last full build (words first seen later
+# are ignored) and replaced rows stay in the matrix as zero rows; once
+# REBUILD_FRACTION of the rows changed that way, sync() rebuilds in the
+# background while the old index keeps serving.
+#
+# The index is saved to Data/related/index.npz ("General Applications/
+# buildRelated.py" builds it offline). NumPy and SciPy are optional: without
+# them the feature is simply unavailable. They are imported by the functions
+# that build, update and load the index, not with this module, so server
+# workers only pay for them once the index is used (or at warm-up).
+log = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+RELATED_INDEX_PATH = os.path.join(PROJECT_ROOT, "Data", "related", "index.npz")
+NEWS_DIR = os.path.join(PROJECT_ROOT, "News")
+INDEX_FORMAT = 1
+TOP_K = 10
+MIN_DF = 2              # terms in fewer articles cannot link two articles
+MAX_DF = 0.05           # share of articles above which a term is dropped ...
+MAX_DF_MIN_DOCS = 200   # ... once the archive is large enough for that to mean something
+QUERY_TERMS = 64
+BATCH_ROWS = 256
+MIN_SCORE = 0.05
+REBUILD_FRACTION = 0.2
+TITLE_WEIGHT = 2
+STOP_WORDS = frozenset("""
+a about after all also an and any are as at be been but by can could did do does for from had has have he her
+his how i if in into is it its more most not of on one or our out over said says she so some than that the their
+them then there these they this to up was we were what when which who will with would you your
+""".split())
+
+
+@lru_cache(maxsize=None)
+def available():
+    """True if NumPy and SciPy are installed (checked without importing them)."""
+    return all(importlib.util.find_spec(name) is not None for name in ("numpy", "scipy"))
+
+
+def article_terms(entry, news_dir=NEWS_DIR):
+    """Term counts of an article: title (weighted), summary and the page text if it is on disk."""
+    texts = [entry.get("title", "")] * TITLE_WEIGHT + [entry.get("summary", "")]
+    if news_dir and entry.get("category") and entry.get("uniqueId"):
+        path = os.path.join(news_dir, os.path.basename(entry["category"]), f"{entry['uniqueId']}.html")
+        try:
+            texts.append(read_local_article(path))
+        except (OSError, ValueError, ImportError):
+            pass  # No page (external article), an unreadable one, or no HTML parser: title and summary only
+    return Counter(token for text in texts for token in tokenize(text)
+                   if len(token) > 1 and not token.isdigit() and token not in STOP_WORDS)
+
+
+def vectorize(term_counts, vocabulary, idf):
+    """L2-normalised TF-IDF rows (sublinear tf) for a list of term Counters; unknown terms are ignored."""
+    import numpy as np
+    from scipy import sparse
+    indptr, indices, tfs = [0], [], []
+    for counts in term_counts:
+        for term, count in counts.items():
+            column = vocabulary.get(term)
+            if column is not None:
+                indices.append(column)
+                tfs.append(1.0 + math.log(count))
+        indptr.append(len(indices))
+    indices = np.asarray(indices, dtype=np.int32)
+    data = np.asarray(tfs, dtype=np.float32) * idf[indices]
+    rows = sparse.csr_matrix((data, indices, np.asarray(indptr, dtype=np.int64)),
+                             shape=(len(term_counts), len(vocabulary)))
+    norms = np.sqrt(np.asarray(rows.multiply(rows).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    rows = sparse.csr_matrix(sparse.diags(1.0 / norms).dot(rows), dtype=np.float32)
+    rows.sort_indices()
+    return rows
+
+
+def truncate_rows(rows, terms=QUERY_TERMS):
+    """Copy of a CSR matrix keeping the `terms` largest values of each row."""
+    import numpy as np
+    rows = rows.copy()
+    for i in np.nonzero(np.diff(rows.indptr) > terms)[0]:
+        lo, hi = rows.indptr[i], rows.indptr[i + 1]
+        values = rows.data[lo:hi]
+        values[np.argpartition(values, hi - lo - terms)[:hi - lo - terms]] = 0
+    rows.eliminate_zeros()
+    return rows
+
+
+def top_k(columns, values, k, exclude):
+    """The k best (column, value) pairs of one row of scores, best first, without `exclude`."""
+    import numpy as np
+    keep = (columns != exclude) & (values >= MIN_SCORE)
+    columns, values = columns[keep], values[keep]
+    if len(values) > k:
+        best = np.argpartition(-values, k - 1)[:k]
+        columns, values = columns[best], values[best]
+    order = np.argsort(-values, kind="stable")
+    return columns[order], values[order]
+
+
+class RelatedArticles:
+    """TF-IDF nearest-neighbour index of the news archive, kept current from NewsChanges."""
+
+    def __init__(self, store=None, news_dir=NEWS_DIR, index_path=RELATED_INDEX_PATH, top_k=TOP_K):
+        self.store = store or NewsStore()
+        self.news_dir = news_dir
+        self.index_path = index_path
+        self.top_k = top_k
+        self.lock = threading.RLock()
+        self.ids = []            # row -> uniqueId (replaced rows keep theirs)
+        self.row_of = {}         # uniqueId -> current row
+        self.vocabulary = {}     # term -> column
+        self.idf = None
+        self.matrix = None       # rows x terms, L2-normalised
+        self.neighbors = None    # rows x top_k row numbers, -1 where there are fewer
+        self.scores = None       # rows x top_k similarities, best first
+        self.cursor = 0          # NewsStore seq the index includes
+        self.built_rows = 0
+        self.changed_rows = 0
+        self._loaded = False
+        self._builder = None
+
+    @property
+    def ready(self):
+        return self.matrix is not None
+
+    # --- Full build ---
+
+    def build(self, entries=None, cursor=None):
+        """Indexes the whole archive (the news index when `entries` is not given) and swaps it in."""
+        import numpy as np
+        if entries is None:
+            sequence = self.store.read_sequence()
+            cursor = sequence["seq"] if sequence else 0  # Read first: later records are replayed
+            entries = self.store.load()
+        entries = {e["uniqueId"]: e for e in entries if all(e.get(field) for field in REQUIRED_FIELDS)}
+        if cursor is None:
+            cursor = max((entry_seq(e) for e in entries.values()), default=0)
+        ids = list(entries)
+        term_counts = [article_terms(entries[unique_id], self.news_dir) for unique_id in ids]
+
+        doc_freq = Counter(term for counts in term_counts for term in counts)
+        max_df = len(ids) * MAX_DF if len(ids) >= MAX_DF_MIN_DOCS else len(ids)
+        terms = sorted(term for term, df in doc_freq.items() if MIN_DF <= df <= max_df)
+        vocabulary = {term: column for column, term in enumerate(terms)}
+        idf = np.array([math.log((1 + len(ids)) / (1 + doc_freq[term])) + 1 for term in terms], dtype=np.float32)
+        matrix = vectorize(term_counts, vocabulary, idf)
+        neighbors, scores = self._neighbors_in_batches(truncate_rows(matrix), matrix)
+
+        with self.lock:
+            self.ids, self.row_of = ids, {unique_id: row for row, unique_id in enumerate(ids)}
+            self.vocabulary, self.idf, self.matrix = vocabulary, idf, matrix
+            self.neighbors, self.scores = neighbors, scores
+            self.cursor = cursor
+            self.built_rows, self.changed_rows = len(ids), 0
+            self._loaded = True
+
+    def _neighbors_in_batches(self, queries, matrix):
+        import numpy as np
+        rows = queries.shape[0]
+        neighbors = np.full((rows, self.top_k), -1, dtype=np.int32)
+        scores = np.zeros((rows, self.top_k), dtype=np.float32)
+        transposed = matrix.T.tocsr()
+        for start in range(0, rows, BATCH_ROWS):
+            block = (queries[start:start + BATCH_ROWS] @ transposed).tocsr()
+            for i in range(block.shape[0]):
+                lo, hi = block.indptr[i], block.indptr[i + 1]
+                columns, values = top_k(block.indices[lo:hi], block.data[lo:hi], self.top_k, start + i)
+                neighbors[start + i, :len(columns)] = columns
+                scores[start + i, :len(values)] = values
+        return neighbors, scores
+
+    # --- Incremental updates ---
+
+    def update(self, entries):
+        """Applies published or edited articles to the index (in publishing order)."""
+        import numpy as np
+        from scipy import sparse
+        with self.lock:
+            if not self.ready:
+                return
+            added = {}
+            for entry in entries:
+                unique_id = entry.get("uniqueId")
+                if not unique_id:
+                    continue
+                self._drop(unique_id)
+                added.pop(unique_id, None)
+                if all(entry.get(field) for field in REQUIRED_FIELDS):
+                    added[unique_id] = entry
+            if not added:
+                return
+
+            rows = vectorize([article_terms(e, self.news_dir) for e in added.values()], self.vocabulary, self.idf)
+            first = self.matrix.shape[0]
+            self.matrix = sparse.vstack([self.matrix, rows], format="csr")
+            self.neighbors = np.vstack([self.neighbors, np.full((len(added), self.top_k), -1, dtype=np.int32)])
+            self.scores = np.vstack([self.scores, np.zeros((len(added), self.top_k), dtype=np.float32)])
+            for offset, unique_id in enumerate(added):
+                self.ids.append(unique_id)
+                self.row_of[unique_id] = first + offset
+            self.changed_rows += len(added)
+
+            # Scores of the new rows against every row, as columns of one sparse product
+            block = (self.matrix @ truncate_rows(rows).T).T.tocsr()
+            for offset in range(len(added)):
+                row = first + offset
+                lo, hi = block.indptr[offset], block.indptr[offset + 1]
+                columns, values = top_k(block.indices[lo:hi], block.data[lo:hi], self.top_k, row)
+                self.neighbors[row, :len(columns)] = columns
+                self.scores[row, :len(values)] = values
+                # The new article joins the lists of older articles it is closer to than their last
+                # neighbour (the other new rows already found each other above)
+                beaten = (columns < first) & (values > self.scores[columns, -1])
+                for other, score in zip(columns[beaten], values[beaten]):
+                    self._insert(other, row, score)
+
+    def _drop(self, unique_id):
+        row = self.row_of.pop(unique_id, None)
+        if row is None:
+            return
+        lo, hi = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+        self.matrix.data[lo:hi] = 0  # A zero row never scores; the next build removes it
+        self.neighbors[row] = -1
+        self.scores[row] = 0
+        self.changed_rows += 1
+
+    def _insert(self, row, neighbor, score):
+        import numpy as np
+        position = int(np.searchsorted(-self.scores[row], -score))
+        self.neighbors[row, position + 1:] = self.neighbors[row, position:-1].copy()
+        self.scores[row, position + 1:] = self.scores[row, position:-1].copy()
+        self.neighbors[row, position] = neighbor
+        self.scores[row, position] = score
+
+    def needs_rebuild(self):
+        with self.lock:
+            return self.changed_rows > max(1, self.built_rows) * REBUILD_FRACTION
+
+    # --- Keeping current with the news index ---
+
+    def sync(self, news_changes):
+        """
+        Applies what was published since the index was built, using the
+        NewsChanges history. Loads the saved index on first call and starts a
+        background rebuild when there is none, when the history no longer
+        reaches back to the index, or after many incremental changes.
+        Returns True when the index is ready to answer.
+        """
+        if not self._loaded:
+            with self.lock:
+                if not self._loaded:
+                    self._loaded = True
+                    self.load()
+        if not self.ready:
+            self.rebuild_in_background()  # Also retries a build that failed
+            return False
+
+        news_changes.refresh()
+        with self.lock:
+            while news_changes.cursor() != self.cursor:
+                result = news_changes.changes(self.cursor)
+                if result["reset"]:
+                    sequence = self.store.read_sequence()
+                    if sequence is None or sequence["seq"] <= self.cursor:
+                        self.cursor = max(self.cursor, result["cursor"])  # Nothing newer than the index
+                    else:
+                        self.rebuild_in_background()
+                    break
+                self.update(result["items"])
+                self.cursor = result["cursor"]
+                if not result["more"]:
+                    break
+        if self.needs_rebuild():
+            self.rebuild_in_background()
+        return True
+
+    def rebuild_in_background(self):
+        """Starts (once at a time) a full build from the news index; the current index keeps serving."""
+        with self.lock:
+            if self._builder is not None and self._builder.is_alive():
+                return
+            self._builder = threading.Thread(target=self._rebuild, name="related-articles", daemon=True)
+        self._builder.start()
+
+    def _rebuild(self):
+        try:
+            self.build()
+            self.save()
+        except (OSError, ValueError, MemoryError) as e:
+            log.error("Related articles build failed: %s", e)
+
+    # --- Queries ---
+
+    def related(self, unique_id, count=TOP_K):
+        """[(uniqueId, score)] of the most similar articles, best first; None for an unknown article."""
+        with self.lock:
+            row = self.row_of.get(unique_id)
+            if row is None:
+                return None
+            results, seen = [], {unique_id}
+            for neighbor, score in zip(self.neighbors[row], self.scores[row]):
+                if neighbor < 0 or len(results) == count:
+                    break
+                other = self.ids[neighbor]
+                if other in seen or self.row_of.get(other) != neighbor:
+                    continue  # Row replaced by an edit (the score was for the old text), or removed
+                seen.add(other)
+                results.append((other, round(float(score), 4)))
+            return results
+
+    def stats(self):
+        with self.lock:
+            if not self.ready:
+                return {"ready": False}
+            return {
+                "ready": True,
+                "articles": len(self.row_of),
+                "terms": len(self.vocabulary),
+                "nonzeros": int(self.matrix.nnz),
+                "changed_rows": self.changed_rows,
+                "cursor": self.cursor,
+            }
+
+    # --- Persistence ---
+
+    def save(self, path=None):
+        import numpy as np
+        path = path or self.index_path
+        with self.lock:
+            arrays = {
+                "format": np.array(INDEX_FORMAT),
+                "cursor": np.array(self.cursor, dtype=np.int64),
+                "ids": np.array(self.ids, dtype=str),
+                "alive": np.array([self.row_of.get(unique_id) == row for row, unique_id in enumerate(self.ids)]),
+                "terms": np.array(sorted(self.vocabulary, key=self.vocabulary.get), dtype=str),
+                "idf": self.idf,
+                "data": self.matrix.data,
+                "indices": self.matrix.indices,
+                "indptr": self.matrix.indptr,
+                "neighbors": self.neighbors,
+                "scores": self.scores,
+            }
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(f, **arrays)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+
+    def load(self, path=None):
+        """Reads a saved index; returns False if there is none (or it is from another format)."""
+        import numpy as np
+        from scipy import sparse
+        try:
+            with np.load(path or self.index_path, allow_pickle=False) as saved:
+                if int(saved["format"]) != INDEX_FORMAT:
+                    return False
+                ids = saved["ids"].tolist()
+                alive = saved["alive"]
+                terms = saved["terms"].tolist()
+                matrix = sparse.csr_matrix((saved["data"], saved["indices"], saved["indptr"]),
+                                           shape=(len(ids), len(terms)))
+                state = (ids, alive, terms, saved["idf"], matrix, saved["neighbors"], saved["scores"],
+                         int(saved["cursor"]))
+        except (OSError, ValueError, KeyError) as e:
+            if os.path.exists(path or self.index_path):
+                log.warning("Could not load the related articles index: %s", e)
+            return False
+        ids, alive, terms, idf, matrix, neighbors, scores, cursor = state
+        if neighbors.shape[1] != self.top_k:
+            return False
+        with self.lock:
+            self.ids = ids
+            self.row_of = {unique_id: row for row, unique_id in enumerate(ids) if alive[row]}
+            self.vocabulary = {term: column for column, term in enumerate(terms)}
+            self.idf, self.matrix, self.neighbors, self.scores = idf, matrix, neighbors, scores
+            self.cursor = cursor
+            self.built_rows, self.changed_rows = len(self.row_of), len(ids) - len(self.row_of)
+            self._loaded = True
+        return True
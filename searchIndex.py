@@ -0,0 +1,204 @@
+import re
+import math
+import heapq
+import bisect
+
+# In-memory inverted index over article titles and summaries.
+#
+# Each term maps to a postings dict {doc_id: weighted term frequency}. The
+# vocabulary is also kept as a sorted list so the last word of a query can be
+# treated as a prefix (search-as-you-type) with a binary search. Results are
+# ranked with BM25; title matches count more than summary matches.
+#
+# Searches return only the best `limit` results. When a query matches many
+# documents (a common word), not every match is scored: each term's postings
+# are walked in descending BM25 impact order (tf against document length,
+# sorted once per term and kept until the term's postings change) and only
+# the first SCORE_POOL matches per term are scored exactly.
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+FIELD_WEIGHTS = {"title": 2.0, "summary": 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_PREFIX_EXPANSIONS = 50   # most frequent completions used for the prefix word
+PREFIX_SCAN_LIMIT = 2000     # vocabulary entries looked at for one prefix
+MIN_PREFIX_LENGTH = 3        # shorter last words only match exactly
+EXACT_SCORING_LIMIT = 2000   # match sets up to this size are scored in full
+SCORE_POOL = 200             # matches per term scored for larger match sets
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+class SearchIndex:
+    """BM25-ranked inverted index with prefix matching on the last query word."""
+
+    def __init__(self):
+        self.postings = {}    # term -> {doc_id: weighted tf}
+        self.doc_terms = {}   # doc_id -> {term: weighted tf}, needed to remove/replace a document
+        self.doc_len = {}     # doc_id -> weighted length
+        self.total_len = 0.0
+        self.vocabulary = []  # sorted terms, for prefix lookups
+        self._impact_order = {}  # term -> doc ids by descending BM25 impact, built on first use
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    # --- Maintenance ---
+
+    def add(self, doc_id, title, summary):
+        """Indexes (or re-indexes) one article."""
+        self._add(doc_id, title, summary, keep_sorted=True)
+
+    def build(self, documents):
+        """Indexes many (doc_id, title, summary) at once; the vocabulary is sorted once at the end."""
+        for doc_id, title, summary in documents:
+            self._add(doc_id, title, summary, keep_sorted=False)
+        self.vocabulary = sorted(self.postings)
+
+    def _add(self, doc_id, title, summary, keep_sorted):
+        if doc_id in self.doc_len:
+            self.remove(doc_id)
+
+        terms = {}
+        for field, text in (("title", title), ("summary", summary)):
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(text):
+                terms[token] = terms.get(token, 0.0) + weight
+
+        for term, tf in terms.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                if keep_sorted:
+                    bisect.insort(self.vocabulary, term)
+            postings[doc_id] = tf
+            self._impact_order.pop(term, None)
+
+        length = sum(terms.values())
+        self.doc_terms[doc_id] = terms
+        self.doc_len[doc_id] = length
+        self.total_len += length
+
+    def remove(self, doc_id):
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self.postings[term]
+            del postings[doc_id]
+            self._impact_order.pop(term, None)
+            if not postings:
+                del self.postings[term]
+                idx = bisect.bisect_left(self.vocabulary, term)
+                del self.vocabulary[idx]
+        self.total_len -= self.doc_len.pop(doc_id)
+
+    # --- Querying ---
+
+    def expand_prefix(self, prefix):
+        """Most frequent vocabulary terms starting with `prefix`."""
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        matches = []
+        for term in self.vocabulary[start:start + PREFIX_SCAN_LIMIT]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        if len(matches) > MAX_PREFIX_EXPANSIONS:
+            matches.sort(key=lambda t: len(self.postings[t]), reverse=True)
+            matches = matches[:MAX_PREFIX_EXPANSIONS]
+        return matches
+
+    def _idf(self, term):
+        df = len(self.postings[term])
+        n = len(self.doc_len)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def _bm25(self, idf, doc_id, tf, avg_len):
+        norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len[doc_id] / avg_len)
+        return idf * tf * (BM25_K1 + 1) / norm
+
+    def _impacts(self, term, avg_len):
+        order = self._impact_order.get(term)
+        if order is None:
+            postings = self.postings[term]
+            doc_len = self.doc_len
+
+            def impact(doc_id):
+                tf = postings[doc_id]
+                return tf / (tf + BM25_K1 * (1 - BM25_B + BM25_B * doc_len[doc_id] / avg_len))
+
+            order = self._impact_order[term] = sorted(postings, key=impact, reverse=True)
+        return order
+
+    def search(self, query, prefix=True, limit=None, within=None):
+        """
+        Returns (total matches, [(score, doc_id), ...] best first). Every query word
+        must match; with `prefix` the last word also matches longer terms
+        ("elec" -> "election"). `within` (a set of doc ids) restricts the matches
+        and `limit` returns only the best `limit` of them.
+        """
+        words = tokenize(query)
+        if not words or not self.doc_len:
+            return 0, []
+
+        # One group of alternative terms per query word
+        groups = [[w] if w in self.postings else [] for w in words]
+        if prefix and not query[-1:].isspace() and len(words[-1]) >= MIN_PREFIX_LENGTH:
+            groups[-1] = self.expand_prefix(words[-1])
+        if not all(groups):
+            return 0, []
+
+        # Intersect starting from the smallest set, testing membership in the larger ones
+        match_sets = []
+        for terms in groups:
+            if len(terms) == 1:
+                match_sets.append(self.postings[terms[0]].keys())
+            else:
+                docs = set()
+                for term in terms:
+                    docs.update(self.postings[term])
+                match_sets.append(docs)
+        if within is not None:
+            match_sets.append(within)
+        match_sets.sort(key=len)
+        candidates = match_sets[0]
+        for docs in match_sets[1:]:
+            candidates = candidates & docs
+            if not candidates:
+                return 0, []
+        total = len(candidates)
+
+        avg_len = self.total_len / len(self.doc_len) or 1.0
+        if limit is None or total <= max(EXACT_SCORING_LIMIT, limit):
+            pool = candidates
+        else:
+            # Too many matches to score: take each term's highest-impact matches
+            pool = set()
+            wanted = max(limit, SCORE_POOL)
+            for terms in groups:
+                for term in terms:
+                    taken = 0
+                    for doc_id in self._impacts(term, avg_len):
+                        if doc_id in candidates:
+                            pool.add(doc_id)
+                            taken += 1
+                            if taken == wanted:
+                                break
+
+        scores = dict.fromkeys(pool, 0.0)
+        for terms in groups:
+            for term in terms:
+                postings = self.postings[term]
+                idf = self._idf(term)
+                if len(postings) < len(scores):
+                    items = ((d, postings[d]) for d in postings if d in scores)
+                else:
+                    items = ((d, postings[d]) for d in scores if d in postings)
+                for doc_id, tf in items:
+                    scores[doc_id] += self._bm25(idf, doc_id, tf, avg_len)
+
+        ranked = ((score, doc_id) for doc_id, score in scores.items())
+        if limit is None:
+            return total, sorted(ranked, reverse=True)
+        return total, heapq.nlargest(limit, ranked)
@@ -0,0 +1,221 @@
+import sys
+import json
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+# Request and stage metrics for the Flask server, exported in the Prometheus
+# text format (no client library needed).
+#
+#   http_request_duration_seconds{method, route}   histogram per route
+#   http_requests_total{method, route, status}     responses by status code
+#   http_request_exceptions_total{method, route}   unhandled exceptions
+#   http_requests_in_flight{route}                 requests being handled
+#   summary_stage_duration_seconds{stage}          fetch / parse / llm / cache / ...
+#   summary_stage_errors_total{stage}              stages that raised
+#   rate_limited_total{reason}                     429s by limit (client / concurrency / budget)
+#   weather_requests_total{cache}                  /weather answers (fresh / stale / miss / error)
+#   weather_upstream_calls_total                   calls made to the weather provider
+#
+# Routes are labelled by their URL rule ("/summarize/jobs/<job_id>"), not the
+# raw path, to keep the number of series bounded. For streamed responses the
+# request duration ends when the headers are sent; the summary stages cover
+# the generation itself. Values are per process: scrape every worker (or
+# aggregate in Prometheus) when running several.
+#
+# With ACCESS_LOG set ("-" for stdout, or a file path) every request is also
+# written as one JSON line.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HELP = {
+    "http_request_duration_seconds": "Time to produce the response, by route.",
+    "http_requests_total": "Responses sent, by route and status code.",
+    "http_request_exceptions_total": "Requests that raised an unhandled exception.",
+    "http_requests_in_flight": "Requests currently being handled.",
+    "summary_stage_duration_seconds": "Time spent in each summarization stage.",
+    "summary_stage_errors_total": "Summarization stages that raised an exception.",
+    "rate_limited_total": "Summary requests rejected with 429, by limit.",
+    "weather_requests_total": "Weather requests by cache outcome.",
+    "weather_upstream_calls_total": "Weather provider calls made by this worker.",
+}
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in pairs) + "}"
+
+
+class Metrics:
+    """Thread-safe registry of counters, gauges and histograms keyed by (name, labels)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}    # name -> {labels tuple: value}
+        self.gauges = {}
+        self.histograms = {}
+        self.callbacks = {}   # name -> (help, function returning the current value)
+
+    def inc(self, name, labels=(), amount=1):
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + amount
+
+    def add(self, name, labels=(), amount=1):
+        with self.lock:
+            series = self.gauges.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + amount
+
+    def observe(self, name, labels, seconds):
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram()
+            histogram.observe(seconds)
+
+    def gauge_callback(self, name, help_text, function):
+        """Gauge whose value is read from `function()` at scrape time."""
+        self.callbacks[name] = (help_text, function)
+
+    @contextmanager
+    def stage(self, stage):
+        """Times one summarization stage: `with metrics.stage("fetch"): ...`."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:  # Not GeneratorExit: a client leaving a stream is not a stage error
+            self.inc("summary_stage_errors_total", (("stage", stage),))
+            raise
+        finally:
+            self.observe("summary_stage_duration_seconds", (("stage", stage),), time.perf_counter() - started)
+
+    def timed(self, stage, function):
+        """Wraps `function` so every call is recorded as `stage`."""
+        def wrapper(*args, **kwargs):
+            with self.stage(stage):
+                return function(*args, **kwargs)
+        wrapper.__name__ = getattr(function, "__name__", "timed")
+        wrapper.__doc__ = getattr(function, "__doc__", None)
+        return wrapper
+
+    def instrument(self, target, stage, methods):
+        """Proxy of `target` whose listed methods are timed as `stage`; everything else passes through."""
+        return InstrumentedProxy(target, {name: self.timed(stage, getattr(target, name)) for name in methods})
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            for name, series in sorted(self.counters.items()):
+                lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} counter"]
+                lines += [f"{name}{format_labels(labels)} {value}" for labels, value in sorted(series.items())]
+            for name, series in sorted(self.gauges.items()):
+                lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} gauge"]
+                lines += [f"{name}{format_labels(labels)} {value}" for labels, value in sorted(series.items())]
+            for name, series in sorted(self.histograms.items()):
+                lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} histogram"]
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{name}_bucket{format_labels(labels, [('le', le)])} {cumulative}")
+                    lines.append(f"{name}_sum{format_labels(labels)} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+            callbacks = list(self.callbacks.items())
+        for name, (help_text, function) in sorted(callbacks):
+            try:
+                value = function()
+            except Exception:
+                continue
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+class InstrumentedProxy:
+    def __init__(self, target, methods):
+        self._target = target
+        self.__dict__.update(methods)
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+
+class AccessLog:
+    """Writes one JSON object per request to stdout ("-") or an append-only file."""
+
+    def __init__(self, destination):
+        self.lock = threading.Lock()
+        self.stream = sys.stdout if destination == "-" else open(destination, "a", encoding="utf-8", buffering=1)
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self.lock:
+            self.stream.write(line + "\n")
+
+
+def install(app, metrics, access_log=None):
+    """Hooks request timing, in-flight and error counting (and the access log) into a Flask app."""
+    from flask import g, request
+
+    def route_label():
+        return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+    @app.before_request
+    def start_timer():
+        g.metrics_started = time.perf_counter()
+        g.metrics_route = route_label()
+        metrics.add("http_requests_in_flight", (("route", g.metrics_route),))
+
+    @app.after_request
+    def record_response(response):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return response
+        duration = time.perf_counter() - started
+        labels = (("method", request.method), ("route", g.metrics_route))
+        metrics.observe("http_request_duration_seconds", labels, duration)
+        metrics.inc("http_requests_total", labels + (("status", response.status_code),))
+        if access_log is not None:
+            access_log.write({
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "method": request.method,
+                "path": request.path,
+                "route": g.metrics_route,
+                "status": response.status_code,
+                "duration_ms": round(duration * 1000, 2),
+                "bytes": response.calculate_content_length(),
+                "remote_addr": request.remote_addr,
+                "user_agent": request.headers.get("User-Agent", ""),
+            })
+        return response
+
+    @app.teardown_request
+    def finish_request(error=None):
+        route = g.pop("metrics_route", None)
+        if route is None:
+            return
+        metrics.add("http_requests_in_flight", (("route", route),), -1)
+        if error is not None:
+            metrics.inc("http_request_exceptions_total", (("method", request.method), ("route", route)))
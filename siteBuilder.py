@@ -0,0 +1,530 @@
+import os
+import re
+import json
+import shutil
+import bisect
+import hashlib
+from html import escape
+from string import Template
+from concurrent.futures import ThreadPoolExecutor
+
+from appConfig import PROJECT_ROOT, load_config, resolve_news_html_dir
+from articleTemplate import ARTICLE_TEMPLATE, extract_article_body, render_article, stylesheet_href, stylesheet_version
+from newsFeed import sort_key
+from newsStore import NewsStore, merge_entries, write_json_atomic
+
+# Static site build.
+#
+# Pre-renders the archive into SITE_DIR:
+#   index.html                          newest articles of all categories
+#   category/<Category>/index.html      newest articles of one category
+#   category/<Category>/page-<n>.html   listing pages
+#   News/<Category>/<id>.html           article pages (shared template)
+#   css/                                stylesheets
+#
+# Listing pages are chunked from the oldest article, so page-1 always holds
+# the first `pageSize` articles ever published in a category and a new
+# article only changes the newest page (plus the front index pages). Older
+# pages keep their content and URL, which keeps them cacheable.
+#
+# Every output records a hash of everything it is rendered from (entry
+# data, source page stat, template and settings) in MANIFEST_NAME; a build
+# only renders outputs whose hash changed and removes outputs that are no
+# longer produced. Article pages are rendered from the body stored in the
+# exported page under News/, so the source pages must stay in place.
+#
+# A long-running builder (buildSite.py --watch) keeps the sorted index in
+# memory and update() only reads the news records appended since the last
+# build, re-plans the pages those articles appear on and appends the changed
+# hashes to MANIFEST_LOG_NAME, so publishing one article costs a handful of
+# page writes instead of a pass over the whole archive.
+SITE_DIR = os.path.join(PROJECT_ROOT, "site")
+CSS_DIR = os.path.join(PROJECT_ROOT, "css")
+MANIFEST_NAME = "build-manifest.json"
+MANIFEST_LOG_NAME = "build-manifest.log.jsonl"
+MANIFEST_COMPACT_EVERY = 200  # incremental builds recorded in the log before it is folded in
+MANIFEST_VERSION = 1
+ALL_CATEGORY = "All"
+
+DEFAULT_SITE_SETTINGS = {
+    "pageSize": 9,
+    "siteName": "Classic News",
+}
+
+SLUG_RE = re.compile(r"[^A-Za-z0-9_-]+")
+# Pages exported before the body markers existed: body follows the <h2> headline
+LEGACY_BODY_RE = re.compile(r"<h2>.*?</h2>\s*(.*?)\s*</div>\s*<footer>", re.DOTALL)
+
+LISTING_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>$title</title>
+<link rel="stylesheet" href="${root}css/homePage.css">
+</head>
+<body>
+<header class="header">
+  <div class="container header-flex">
+    <h1>$site_name</h1>
+  </div>
+</header>
+<main class="container">
+  <nav class="static-categories">$categories</nav>
+  <h2>$heading</h2>
+  <section class="news-grid">
+$cards
+  </section>
+  <nav class="pagination-bar">$pagination</nav>
+</main>
+</body>
+</html>
+""")
+
+# str.format template: cards are rendered ~2 per article per build, where
+# string.Template's regex substitution shows up in profiles
+CARD_TEMPLATE = """    <div class="news-card">
+      {image}
+      <div class="card-content-wrapper">
+        <div class="news-meta-info"><span class="news-date-text">{date}</span>{location}</div>
+        <h3>{title}</h3>
+        <p class="news-summary-justify">{summary}</p>
+        <div class="news-card-actions"><a class="read-more-btn" href="{href}">Read More</a></div>
+      </div>
+    </div>"""
+
+
+def category_slug(category):
+    return SLUG_RE.sub("-", category).strip("-") or "uncategorized"
+
+
+def entry_digest(entry):
+    # repr() of a parsed JSON entry is stable between builds and far cheaper than
+    # json.dumps on 100k entries; it only has to detect changes between builds.
+    return hashlib.sha1(repr(entry).encode("utf-8")).hexdigest()
+
+
+def inputs_hash(*parts):
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+def site_settings(config):
+    settings = dict(DEFAULT_SITE_SETTINGS)
+    settings.update((config or {}).get("site", {}))
+    settings["pageSize"] = max(1, int(settings["pageSize"]))
+    return settings
+
+
+def read_article_body(source_path):
+    with open(source_path, "r", encoding="utf-8") as f:
+        page = f.read()
+    body = extract_article_body(page)
+    if body is None:
+        match = LEGACY_BODY_RE.search(page)
+        if not match:
+            raise ValueError("article body not found")
+        body = match.group(1)
+    return body
+
+
+class SiteBuilder:
+    """Incremental static build of the news archive driven by a content-hash manifest."""
+
+    def __init__(self, site_dir=SITE_DIR, store=None, news_dir=None, config=None, workers=None):
+        config = load_config() if config is None else config
+        self.site_dir = site_dir
+        self.store = store or NewsStore()
+        self.news_dir = news_dir or resolve_news_html_dir(config)
+        self.settings = site_settings(config)
+        self.categories = config.get("baseCategories", [])
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.manifest_path = os.path.join(site_dir, MANIFEST_NAME)
+        self.manifest_log_path = os.path.join(site_dir, MANIFEST_LOG_NAME)
+
+        # State of the last build, kept so update() only re-plans what changed
+        self.manifest = None    # output path -> inputs hash
+        self.entries = {}       # uniqueId -> entry
+        self.digests = {}       # uniqueId -> entry digest
+        self.by_category = {}   # category (and ALL_CATEGORY) -> sort keys, oldest first
+        self.nav = []
+        self.versions = None
+        self._snapshot_stat = None
+        self._log_offset = 0
+        self._manifest_log_records = 0
+
+        self._created_dirs = set()
+        self._cards = {}  # (uniqueId, root) -> card HTML, shared by the category and "All" listings
+        self._stylesheet = None
+
+    # --- Manifest ---
+
+    def load_manifest(self):
+        """Manifest snapshot plus the changes appended by incremental builds."""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != MANIFEST_VERSION:
+            return {}
+        manifest = data.get("outputs", {})
+        try:
+            with open(self.manifest_log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        changes = json.loads(line)
+                    except ValueError:
+                        break  # Torn last line of an interrupted build; the rest is rebuilt
+                    for output, key in changes.items():
+                        if key is None:
+                            manifest.pop(output, None)
+                        else:
+                            manifest[output] = key
+        except OSError:
+            pass
+        return manifest
+
+    def write_manifest(self):
+        write_json_atomic(self.manifest_path, {"version": MANIFEST_VERSION, "outputs": self.manifest},
+                          separators=(",", ":"))
+        try:
+            os.remove(self.manifest_log_path)
+        except OSError:
+            pass
+        self._manifest_log_records = 0
+
+    def append_manifest(self, changes):
+        """Records an incremental build without rewriting the whole manifest."""
+        with open(self.manifest_log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(changes, separators=(",", ":")) + "\n")
+        self._manifest_log_records += 1
+        if self._manifest_log_records >= MANIFEST_COMPACT_EVERY:
+            self.write_manifest()
+
+    def template_versions(self):
+        """Hashes of the templates and settings; a change rebuilds every page that uses them."""
+        article = inputs_hash(ARTICLE_TEMPLATE.template, stylesheet_version())
+        listing = inputs_hash(LISTING_TEMPLATE.template, CARD_TEMPLATE, self.settings,
+                              self.categories, self.asset_version("homePage.css"))
+        assets = {name: self.asset_version(name) for name in sorted(os.listdir(CSS_DIR))}
+        return article, listing, assets
+
+    @staticmethod
+    def asset_version(name):
+        try:
+            st = os.stat(os.path.join(CSS_DIR, name))
+        except OSError:
+            return None
+        return [st.st_mtime_ns, st.st_size]
+
+    # --- Index state ---
+
+    def _snapshot_state(self):
+        try:
+            st = os.stat(self.store.json_path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _load_index(self):
+        self._snapshot_stat = self._snapshot_state()
+        entries, self._log_offset = self.store.read_log(0)
+        self.entries = {}
+        self.digests = {}
+        for entry in merge_entries(self.store.read_snapshot(), entries):
+            if entry.get("uniqueId"):
+                self.entries[entry["uniqueId"]] = entry
+                self.digests[entry["uniqueId"]] = entry_digest(entry)
+
+        ordered = sorted(sort_key(e) for e in self.entries.values())
+        self.by_category = {ALL_CATEGORY: ordered}
+        for key in ordered:
+            self.by_category.setdefault(self.entries[key[2]].get("category", ""), []).append(key)
+
+        categories = [c for c in self.categories if c in self.by_category and c != ALL_CATEGORY]
+        categories += sorted(c for c in self.by_category if c not in categories and c != ALL_CATEGORY)
+        self.nav = [ALL_CATEGORY] + categories
+
+    # --- Plan ---
+
+    def plan(self):
+        """
+        Returns {output path (relative to site_dir): (inputs hash, render job)}
+        for every file the site consists of.
+        """
+        outputs = {}
+        for name, version in self.versions[2].items():
+            outputs[f"css/{name}"] = (inputs_hash(version), ("copy", os.path.join(CSS_DIR, name)))
+        for unique_id in self.entries:
+            self._plan_article(outputs, unique_id)
+        for category in self.nav:
+            self._plan_listing(outputs, category)
+        return outputs
+
+    def _plan_article(self, outputs, unique_id):
+        entry = self.entries[unique_id]
+        category = entry.get("category", "")
+        source = f"{self.news_dir}{os.sep}{category}{os.sep}{unique_id}.html"
+        try:
+            st = os.stat(source)
+        except OSError:
+            return  # Listed in the index but never exported (or removed); cards still link to it
+        key = f"{self.versions[0]}:{self.digests[unique_id]}:{st.st_mtime_ns}:{st.st_size}"
+        outputs[f"News/{category}/{unique_id}.html"] = (hashlib.sha1(key.encode("utf-8")).hexdigest(),
+                                                        ("article", entry, source))
+
+    def _plan_listing(self, outputs, category, first_page=1):
+        """Plans the listing pages of a category from `first_page` on, plus its front page."""
+        keys = self.by_category.get(category, [])
+        page_size = self.settings["pageSize"]
+        slug = category_slug(category)
+        page_count = (len(keys) + page_size - 1) // page_size
+        listing_version = self.versions[1]
+
+        # Chunks counted from the oldest article: page-n never changes once it is full
+        for number in range(max(1, first_page), page_count + 1):
+            chunk = [self.entries[k[2]] for k in keys[(number - 1) * page_size:number * page_size]]
+            page = {
+                "category": category, "heading": f"{category} - page {number}",
+                "items": chunk[::-1], "older": number - 1 if number > 1 else None,
+                "newer": number + 1 if number < page_count else "index", "nav": self.nav,
+            }
+            key = inputs_hash(listing_version, [self.digests[e["uniqueId"]] for e in chunk], page["heading"],
+                              page["older"], page["newer"])
+            outputs[f"category/{slug}/page-{number}.html"] = (key, ("listing", page, "../../"))
+
+        # Front page of the category: the newest `page_size` articles
+        latest = [self.entries[k[2]] for k in keys[-page_size:][::-1]] if keys else []
+        oldest_shown = len(keys) - len(latest)
+        index_page = {
+            "category": category, "heading": category, "items": latest,
+            "older": (oldest_shown - 1) // page_size + 1 if oldest_shown else None, "newer": None,
+            "nav": self.nav,
+        }
+        key = inputs_hash(listing_version, [self.digests[e["uniqueId"]] for e in latest], index_page["older"])
+        outputs[f"category/{slug}/index.html"] = (key, ("listing", index_page, "../../"))
+        if category == ALL_CATEGORY:
+            outputs["index.html"] = (key, ("listing", index_page, ""))
+        return page_count
+
+    # --- Render ---
+
+    def render(self, output, job):
+        path = os.path.join(self.site_dir, *output.split("/"))
+        directory = os.path.dirname(path)
+        if directory not in self._created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._created_dirs.add(directory)
+
+        kind = job[0]
+        if kind == "copy":
+            shutil.copyfile(job[1], path)
+            return
+        if kind == "article":
+            entry, source = job[1], job[2]
+            timestamp = f"{entry.get('date', '')} {entry.get('Time', '')}".strip()
+            html = render_article(entry.get("title", ""), read_article_body(source), timestamp,
+                                  location=entry.get("location"), stylesheet=self._stylesheet)
+        else:
+            html = self.render_listing(job[1], job[2])
+        # Written in place: the manifest only records the page once the write succeeded
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+
+    def render_listing(self, page, root):
+        slug = category_slug(page["category"])
+        listing_dir = f"{root}category/{slug}/"
+
+        cards = [self.render_card(entry, root) for entry in page["items"]]
+
+        links = []
+        if page["newer"] == "index":
+            links.append(f'<a href="{listing_dir}index.html">&#8592; Newest</a>')
+        elif page["newer"]:
+            links.append(f'<a href="{listing_dir}page-{page["newer"]}.html">&#8592; Newer</a>')
+        if page["older"]:
+            links.append(f'<a href="{listing_dir}page-{page["older"]}.html">Older &#8594;</a>')
+
+        categories = " ".join(f'<a href="{root}category/{category_slug(c)}/index.html">{escape(c)}</a>'
+                              for c in page["nav"])
+        return LISTING_TEMPLATE.substitute(
+            title=escape(f"{self.settings['siteName']} - {page['heading']}"),
+            site_name=escape(self.settings["siteName"]),
+            root=root,
+            categories=categories,
+            heading=escape(page["heading"]),
+            cards="\n".join(cards) or "    <p>No news found for this category.</p>",
+            pagination=" ".join(links),
+        )
+
+    def render_card(self, entry, root):
+        key = (entry["uniqueId"], root)
+        card = self._cards.get(key)
+        if card is None:
+            location = entry.get("location")
+            card = self._cards[key] = CARD_TEMPLATE.format(
+                image=self.card_image(entry),
+                date=escape(entry.get("date", "")),
+                location=f'<span class="news-meta-separator">|</span><span class="news-location-text">'
+                         f'{escape(location)}</span>' if location else "",
+                title=escape(entry.get("title", "")),
+                summary=escape(entry.get("summary", "")),
+                href=f"{root}News/{escape(entry.get('category', ''))}/{entry['uniqueId']}.html",
+            )
+        return card
+
+    @staticmethod
+    def card_image(entry):
+        alt = escape(entry.get("title", ""))
+        variant = (entry.get("imgVariants") or {}).get("card")
+        if not variant:
+            return f'<img src="{escape(entry.get("img", ""))}" alt="{alt}" loading="lazy">'
+        return (f'<picture><source type="image/webp" srcset="{escape(variant["webp"])}">'
+                f'<img src="{escape(variant["png"])}" width="{variant["width"]}" height="{variant["height"]}" '
+                f'alt="{alt}" loading="lazy"></picture>')
+
+    # --- Build ---
+
+    def build(self, force=False):
+        """Full build: re-plans every output, renders the changed ones and removes stale ones."""
+        previous = {} if force else (self.manifest if self.manifest is not None else self.load_manifest())
+        self.versions = self.template_versions()
+        self._load_index()
+        outputs = self.plan()
+
+        self.manifest = {output: key for output, (key, _) in outputs.items()}
+        rendered, failed = self._render_changed(outputs, previous)
+        removed = self._remove(output for output in previous if output not in outputs)
+
+        if rendered or failed or removed or self.manifest != previous:
+            self.write_manifest()
+        return {"outputs": len(outputs), "rendered": rendered, "failed": failed, "removed": removed,
+                "unchanged": len(outputs) - rendered - failed}
+
+    def update(self):
+        """
+        Incremental build after the first one: reads only the news records
+        appended since the last build and re-plans the pages they appear on.
+        Falls back to build() when the snapshot was rewritten (compaction,
+        cleanup scripts), a new category appeared or a template changed.
+        """
+        if self.versions is None or self._snapshot_state() != self._snapshot_stat:
+            return self.build()
+        versions = self.template_versions()
+        if versions != self.versions:
+            return self.build()
+
+        records, self._log_offset = self.store.read_log(self._log_offset)
+        page_size = self.settings["pageSize"]
+        first_changed = {}  # category -> index of the oldest changed position
+        page_counts = {}    # category -> page count before the update
+        changed_ids = []
+        stale = set()
+
+        for entry in records:
+            unique_id = entry.get("uniqueId")
+            if not unique_id:
+                continue
+            digest = entry_digest(entry)
+            if self.digests.get(unique_id) == digest:
+                continue
+            if entry.get("category", "") not in self.by_category:
+                return self.build()  # New category: every page's navigation changes
+
+            old = self.entries.get(unique_id)
+            if old is not None:
+                old_key = sort_key(old)
+                old_category = old.get("category", "")
+                for category in (ALL_CATEGORY, old_category):
+                    keys = self.by_category[category]
+                    page_counts.setdefault(category, (len(keys) + page_size - 1) // page_size)
+                    position = bisect.bisect_left(keys, old_key)
+                    if position < len(keys) and keys[position] == old_key:
+                        del keys[position]
+                        first_changed[category] = min(first_changed.get(category, position), position)
+                if old_category != entry.get("category", ""):
+                    stale.add(f"News/{old_category}/{unique_id}.html")
+
+            new_key = sort_key(entry)
+            self.entries[unique_id] = entry
+            self.digests[unique_id] = digest
+            changed_ids.append(unique_id)
+            for category in (ALL_CATEGORY, entry.get("category", "")):
+                keys = self.by_category[category]
+                page_counts.setdefault(category, (len(keys) + page_size - 1) // page_size)
+                position = bisect.bisect_left(keys, new_key)
+                keys.insert(position, new_key)
+                first_changed[category] = min(first_changed.get(category, position), position)
+
+        if not changed_ids:
+            return {"outputs": len(self.manifest), "rendered": 0, "failed": 0, "removed": 0,
+                    "unchanged": len(self.manifest)}
+
+        outputs = {}
+        for unique_id in changed_ids:
+            self._plan_article(outputs, unique_id)
+        for category, position in first_changed.items():
+            # The last existing page also changes when a new page is added (its "newer" link)
+            first_page = min(position // page_size + 1, max(1, page_counts[category]))
+            page_count = self._plan_listing(outputs, category, first_page)
+            slug = category_slug(category)
+            stale.update(f"category/{slug}/page-{n}.html" for n in range(page_count + 1, page_counts[category] + 1))
+
+        previous = self.manifest
+        changes = {}
+        rendered, failed = self._render_changed(outputs, previous, changes)
+        stale = {output for output in stale if output not in outputs and output in previous}
+        removed = self._remove(stale)
+        for output in stale:
+            previous.pop(output, None)
+            changes[output] = None
+        if changes:
+            self.append_manifest(changes)
+        return {"outputs": len(self.manifest), "rendered": rendered, "failed": failed, "removed": removed,
+                "unchanged": len(self.manifest) - rendered - failed}
+
+    def _render_changed(self, outputs, previous, changes=None):
+        """
+        Renders outputs whose inputs hash differs from `previous` and records
+        them in self.manifest (and `changes`). Returns (rendered, failed).
+        """
+        changed = [(output, key, job) for output, (key, job) in outputs.items() if previous.get(output) != key]
+        self._stylesheet = stylesheet_href()
+        self._cards = {}
+        failed = []
+
+        def render(item):
+            output, key, job = item
+            try:
+                self.render(output, job)
+            except (OSError, ValueError) as e:
+                failed.append(output)
+                print(f"{output}: {e}")
+
+        if self.workers > 1 and len(changed) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                list(executor.map(render, changed))
+        else:
+            for item in changed:
+                render(item)
+
+        failed_outputs = set(failed)
+        for output, key, _ in changed:
+            if output in failed_outputs:
+                self.manifest.pop(output, None)  # Retried on the next build
+                key = None
+            else:
+                self.manifest[output] = key
+            if changes is not None:
+                changes[output] = key
+        return len(changed) - len(failed), len(failed)
+
+    def _remove(self, outputs):
+        removed = 0
+        for output in outputs:
+            try:
+                os.remove(os.path.join(self.site_dir, *output.split("/")))
+                removed += 1
+            except OSError:
+                pass
+        return removed
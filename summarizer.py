@@ -0,0 +1,437 @@
+import os
+import re
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Process-wide summarizer shared by every request.
+#
+# The LangChain prompt, chat model and chain are built once, on first use,
+# and then reused so each summary only pays for the LLM call itself (the
+# Gemini client keeps its connection open between calls). Backends are
+# pluggable: "gemini" talks to Google, "stub" is a deterministic local
+# stand-in for benchmarks, load tests and offline development.
+#
+# Long articles are summarized map-reduce style (MapReduceSummarizer): the
+# text is split on paragraph boundaries into chunks of at most `chunkTokens`,
+# the chunks are summarized concurrently and the partial summaries are merged
+# into the final one. Articles up to `mapReduceThreshold` tokens still go to
+# the LLM in a single call. Token counts are estimated (CHARS_PER_TOKEN), which
+# is close enough for budgeting and needs no tokenizer.
+#
+# Settings come from the "summarizer" section of config.json:
+#   {"backend": "gemini", "model": "gemini-pro", "temperature": 0.3, "stubDelay": 0,
+#    "stubDelayPerKTokens": 0, "mapReduceThreshold": 6000, "chunkTokens": 2500, "mapConcurrency": 4}
+# and SUMMARIZER_BACKEND in the environment overrides the backend.
+log = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    "backend": "gemini",
+    "model": "gemini-pro",
+    "temperature": 0.3,
+    "stubDelay": 0.0,
+    "stubDelayPerKTokens": 0.0,
+    "mapReduceThreshold": 6000,
+    "chunkTokens": 2500,
+    "mapConcurrency": 4,
+}
+CHARS_PER_TOKEN = 4
+MAX_REDUCE_ROUNDS = 3  # Reduce rounds over chunk summaries before the rest is cut to fit
+SENTENCE_RE = re.compile(r"[^.!?]+[.!?]?")
+
+SUMMARY_PROMPT_TEMPLATE = """
+    You are an expert news summarizer. Your goal is to provide a concise, easy-to-understand summary
+    of the following news article content. Focus on the key points and present them clearly.
+
+    Article Content:
+    "{article_text}"
+
+    Your Concise Summary:
+    """
+
+CHUNK_PROMPT_TEMPLATE = """
+    You are an expert news summarizer. The following text is one section of a longer news article.
+    List the key facts, names, numbers and events it contains in a few short sentences.
+
+    Article Section:
+    "{article_text}"
+
+    Key Points of This Section:
+    """
+
+REDUCE_PROMPT_TEMPLATE = """
+    You are an expert news summarizer. The following notes summarize consecutive sections of one
+    news article. Combine them into a single concise, easy-to-understand summary of the whole article,
+    without repeating points.
+
+    Section Notes:
+    "{article_text}"
+
+    Your Concise Summary:
+    """
+
+
+def estimate_tokens(text):
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def split_into_chunks(text, chunk_tokens):
+    """
+    Splits text into chunks of at most `chunk_tokens` (estimated), keeping
+    paragraphs (lines) whole where possible; an oversized paragraph is split
+    between sentences, and an oversized sentence between words.
+    """
+    budget = max(1, chunk_tokens * CHARS_PER_TOKEN)
+    pieces = []
+    for paragraph in text.split("\n"):
+        paragraph = paragraph.strip()
+        if len(paragraph) <= budget:
+            if paragraph:
+                pieces.append(paragraph)
+            continue
+        for sentence in SENTENCE_RE.findall(paragraph):
+            sentence = sentence.strip()
+            while len(sentence) > budget:
+                cut = sentence.rfind(" ", 0, budget)
+                cut = cut if cut > 0 else budget
+                pieces.append(sentence[:cut])
+                sentence = sentence[cut:].strip()
+            if sentence:
+                pieces.append(sentence)
+
+    chunks = []
+    current = []
+    size = 0
+    for piece in pieces:
+        if current and size + 1 + len(piece) > budget:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        size += len(piece) + (1 if current else 0)
+        current.append(piece)
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+class SummarizerBackend:
+    """Interface of a summarization backend."""
+
+    name = "base"
+    requires_api_key = False
+    prompt_template = SUMMARY_PROMPT_TEMPLATE
+
+    def summarize(self, article_text):
+        return self.complete(self.prompt_template, article_text)
+
+    def complete(self, prompt_template, article_text):
+        """Runs one LLM call with `article_text` filled into `prompt_template`."""
+        raise NotImplementedError
+
+    def stream(self, prompt_template, article_text):
+        """Like complete(), but yields the output in pieces as it is generated."""
+        yield self.complete(prompt_template, article_text)
+
+    def warm_up(self):
+        """Imports libraries and creates clients ahead of the first call (no LLM request is made)."""
+
+    def cache_version(self):
+        """Everything besides the article text that changes the output (part of the cache key)."""
+        return (self.name,)
+
+
+class GeminiBackend(SummarizerBackend):
+    """Gemini through LangChain; the client and chain are created lazily, once."""
+
+    name = "gemini"
+    requires_api_key = True
+
+    def __init__(self, api_key, model, temperature, prompt_template=SUMMARY_PROMPT_TEMPLATE):
+        self.api_key = api_key
+        self.model = model
+        self.temperature = temperature
+        self.prompt_template = prompt_template
+        self._llm = None
+        self._chains = {}  # prompt template -> chain sharing the one client
+        self._lock = threading.Lock()
+
+    def _get_llm(self):
+        if self._llm is None:
+            with self._lock:
+                if self._llm is None:
+                    if not self.api_key:
+                        raise RuntimeError("GOOGLE_API_KEY not found on the server.")
+                    from langchain_google_genai import ChatGoogleGenerativeAI
+
+                    log.info("Initializing LLM client (%s)", self.model)
+                    self._llm = ChatGoogleGenerativeAI(
+                        model=self.model,
+                        google_api_key=self.api_key,
+                        temperature=self.temperature,
+                        convert_system_message_to_human=True
+                    )
+        return self._llm
+
+    def _get_chain(self, prompt_template):
+        chain = self._chains.get(prompt_template)
+        if chain is None:
+            llm = self._get_llm()
+            with self._lock:
+                chain = self._chains.get(prompt_template)
+                if chain is None:
+                    from langchain.chains import LLMChain
+                    from langchain.prompts import PromptTemplate
+
+                    prompt = PromptTemplate(input_variables=["article_text"], template=prompt_template)
+                    chain = LLMChain(llm=llm, prompt=prompt)
+                    self._chains[prompt_template] = chain
+        return chain
+
+    def warm_up(self):
+        if self.api_key:
+            self._get_chain(self.prompt_template)
+
+    def complete(self, prompt_template, article_text):
+        chain = self._get_chain(prompt_template)
+        log.debug("Generating summary")
+        return chain.run({"article_text": article_text})
+
+    def stream(self, prompt_template, article_text):
+        llm = self._get_llm()
+        log.debug("Streaming summary")
+        for chunk in llm.stream(prompt_template.format(article_text=article_text)):
+            if chunk.content:
+                yield chunk.content
+
+    def cache_version(self):
+        return (self.name, self.model, self.temperature, self.prompt_template)
+
+
+class StubBackend(SummarizerBackend):
+    """
+    Deterministic offline backend: sleeps a fixed delay plus a delay per 1000
+    input tokens (roughly how LLM latency grows), then returns the first two
+    sentences.
+    """
+
+    name = "stub"
+
+    def __init__(self, delay=0.0, delay_per_k_tokens=0.0):
+        self.delay = delay
+        self.delay_per_k_tokens = delay_per_k_tokens
+
+    def complete(self, prompt_template, article_text):
+        delay = self._delay(article_text)
+        if delay:
+            time.sleep(delay)
+        return self._summary(article_text)
+
+    def stream(self, prompt_template, article_text):
+        # First word after half the delay, the rest spread over the other half
+        delay = self._delay(article_text)
+        words = self._summary(article_text).split(" ")
+        for index, word in enumerate(words):
+            if delay:
+                time.sleep(delay / 2 if index == 0 else delay / 2 / len(words))
+            yield word if index == 0 else " " + word
+
+    def _delay(self, article_text):
+        return self.delay + self.delay_per_k_tokens * estimate_tokens(article_text) / 1000
+
+    @staticmethod
+    def _summary(article_text):
+        sentences = [s.strip() for s in SENTENCE_RE.findall(article_text.replace("\n", " ")) if s.strip()]
+        return " ".join(sentences[:2])
+
+    def cache_version(self):
+        return (self.name,)
+
+
+class AdmittedBackend(SummarizerBackend):
+    """
+    Wraps a backend so every LLM call first calls `admit()`, which returns a
+    release function or raises to refuse the call (see RateLimiter.admit_llm_call).
+    """
+
+    def __init__(self, backend, admit):
+        self.backend = backend
+        self.admit = admit
+        self.name = backend.name
+        self.requires_api_key = backend.requires_api_key
+        self.prompt_template = backend.prompt_template
+
+    def complete(self, prompt_template, article_text):
+        release = self.admit()
+        try:
+            return self.backend.complete(prompt_template, article_text)
+        finally:
+            release()
+
+    def stream(self, prompt_template, article_text):
+        release = self.admit()
+        try:
+            yield from self.backend.stream(prompt_template, article_text)
+        finally:
+            release()
+
+    def warm_up(self):
+        self.backend.warm_up()
+
+    def cache_version(self):
+        return self.backend.cache_version()
+
+
+class MapReduceSummarizer(SummarizerBackend):
+    """
+    Picks the strategy by length: a single call for articles up to
+    `threshold_tokens`, otherwise chunk summaries (in parallel, up to
+    `concurrency` LLM calls) reduced into one summary. If the chunk summaries
+    are themselves too long they are reduced in groups first, for at most
+    MAX_REDUCE_ROUNDS rounds; whatever still does not fit is truncated.
+    """
+
+    def __init__(self, backend, threshold_tokens, chunk_tokens, concurrency):
+        self.backend = backend
+        self.name = backend.name
+        self.requires_api_key = backend.requires_api_key
+        self.threshold_tokens = threshold_tokens
+        self.chunk_tokens = min(chunk_tokens, threshold_tokens)
+        self.concurrency = max(1, concurrency)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def summarize(self, article_text):
+        return self.summarize_with_timings(article_text)[0]
+
+    def complete(self, prompt_template, article_text):
+        return self.backend.complete(prompt_template, article_text)
+
+    def stream(self, prompt_template, article_text):
+        return self.backend.stream(prompt_template, article_text)
+
+    def warm_up(self):
+        self.backend.warm_up()
+
+    def summarize_with_timings(self, article_text):
+        """Returns (summary, timings): the strategy used, chunk count and seconds per stage."""
+        started = time.perf_counter()
+        prompt_template, text, timings = self._prepare(article_text, started)
+        summary = self.backend.complete(prompt_template, text)
+        return summary, self._finish_timings(timings, started)
+
+    def summarize_stream(self, article_text, timings=None):
+        """
+        Yields the summary in pieces as the LLM produces them. Chunk summaries
+        of a long article are computed first; only the final call streams.
+        `timings` (a dict) is filled in like summarize_with_timings, plus
+        first_token_seconds.
+        """
+        started = time.perf_counter()
+        prompt_template, text, prepared = self._prepare(article_text, started)
+        first_token = None
+        for piece in self.backend.stream(prompt_template, text):
+            if first_token is None:
+                first_token = time.perf_counter()
+            yield piece
+        if timings is not None:
+            timings.update(self._finish_timings(prepared, started))
+            if first_token is not None:
+                timings["first_token_seconds"] = round(first_token - started, 3)
+
+    def _prepare(self, article_text, started):
+        """Runs the map stage if needed; returns (prompt template, text, timings) for the final call."""
+        tokens = estimate_tokens(article_text)
+        if tokens <= self.threshold_tokens:
+            return self.backend.prompt_template, article_text, {"strategy": "single", "input_tokens": tokens,
+                                                                "chunks": 1}
+
+        chunks = split_into_chunks(article_text, self.chunk_tokens)
+        summaries = self._map(CHUNK_PROMPT_TEMPLATE, chunks)
+        rounds = 1
+        combined = "\n".join(summaries)
+        while (estimate_tokens(combined) > self.threshold_tokens and len(summaries) > 1
+               and rounds < MAX_REDUCE_ROUNDS):
+            summaries = self._map(REDUCE_PROMPT_TEMPLATE, split_into_chunks(combined, self.chunk_tokens))
+            combined = "\n".join(summaries)
+            rounds += 1
+        timings = {
+            "strategy": "map-reduce",
+            "input_tokens": tokens,
+            "chunks": len(chunks),
+            "reduce_rounds": rounds,
+        }
+        if estimate_tokens(combined) > self.threshold_tokens:
+            # The partial summaries did not shrink enough; the final call gets as much as fits
+            log.warning("Chunk summaries still %d tokens after %d rounds, truncating",
+                        estimate_tokens(combined), rounds)
+            combined = combined[:self.threshold_tokens * CHARS_PER_TOKEN]
+            timings["truncated"] = True
+        timings["map_seconds"] = round(time.perf_counter() - started, 3)
+        return REDUCE_PROMPT_TEMPLATE, combined, timings
+
+    @staticmethod
+    def _finish_timings(timings, started):
+        total = time.perf_counter() - started
+        if "map_seconds" in timings:
+            timings["reduce_seconds"] = round(total - timings["map_seconds"], 3)
+        timings["total_seconds"] = round(total, 3)
+        return timings
+
+    def _map(self, prompt_template, chunks):
+        if len(chunks) == 1:
+            return [self.backend.complete(prompt_template, chunks[0])]
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                                        thread_name_prefix="summarizer-map")
+        return list(self._executor.map(lambda chunk: self.backend.complete(prompt_template, chunk), chunks))
+
+    def cache_version(self):
+        return self.backend.cache_version() + ("map-reduce", self.threshold_tokens, self.chunk_tokens,
+                                               CHUNK_PROMPT_TEMPLATE, REDUCE_PROMPT_TEMPLATE)
+
+
+def summarizer_settings(config):
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update((config or {}).get("summarizer", {}))
+    backend = os.getenv("SUMMARIZER_BACKEND")
+    if backend:
+        settings["backend"] = backend
+    return settings
+
+
+def create_summarizer(config=None, api_key=None, backend=None, admit=None):
+    """
+    Builds the summarizer from the config (no network or heavy imports happen
+    here). `backend` overrides the configured backend, e.g. "stub" for dry runs.
+    With `admit`, every LLM call (each chunk of a map-reduce summary too) goes
+    through it first, see AdmittedBackend.
+    """
+    settings = summarizer_settings(config)
+    backend = backend or settings["backend"]
+    if backend == "stub":
+        llm = StubBackend(delay=float(settings["stubDelay"]),
+                          delay_per_k_tokens=float(settings["stubDelayPerKTokens"]))
+    elif backend == "gemini":
+        llm = GeminiBackend(api_key, settings["model"], float(settings["temperature"]))
+    else:
+        raise ValueError(f"Unknown summarizer backend: {backend}")
+    if admit is not None:
+        llm = AdmittedBackend(llm, admit)
+    return MapReduceSummarizer(llm, int(settings["mapReduceThreshold"]), int(settings["chunkTokens"]),
+                               int(settings["mapConcurrency"]))
+
+
+_summarizer = None
+_summarizer_lock = threading.Lock()
+
+
+def get_summarizer(config=None, api_key=None, admit=None):
+    """Returns the process-wide summarizer, creating it on first call."""
+    global _summarizer
+    if _summarizer is None:
+        with _summarizer_lock:
+            if _summarizer is None:
+                _summarizer = create_summarizer(config, api_key, admit=admit)
+    return _summarizer
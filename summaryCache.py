@@ -0,0 +1,101 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Two-tier cache for article summaries.
+#
+# Keys are a hash of the extracted article text together with everything
+# that changes the LLM output (prompt template, model, temperature), so an
+# edited article or a new prompt never returns a stale summary. Lookups hit
+# a bounded in-memory LRU first and fall back to a local SQLite file that
+# survives restarts and is shared by all server processes.
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+SUMMARY_CACHE_PATH = os.path.join(PROJECT_ROOT, "Data", "summaries.sqlite3")
+MEMORY_CACHE_SIZE = 1024
+
+
+def summary_cache_key(article_text, *version_parts):
+    """Hash of the article text plus prompt/model identifiers."""
+    digest = hashlib.sha256()
+    for part in version_parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(article_text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """In-memory LRU in front of a SQLite table of summaries, with hit/miss counters."""
+
+    def __init__(self, db_path=SUMMARY_CACHE_PATH, memory_size=MEMORY_CACHE_SIZE):
+        self.db_path = db_path
+        self.memory_size = memory_size
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            " key TEXT PRIMARY KEY,"
+            " summary TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self.db.commit()
+
+    def _remember(self, key, summary):
+        self.memory[key] = summary
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def get(self, key):
+        """Returns the cached summary or None."""
+        with self.lock:
+            summary = self.memory.get(key)
+            if summary is not None:
+                self.memory.move_to_end(key)
+                self.memory_hits += 1
+                return summary
+
+            row = self.db.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, row[0])
+            return row[0]
+
+    def contains(self, key):
+        """Checks for a summary without touching the counters or the LRU order."""
+        with self.lock:
+            if key in self.memory:
+                return True
+            return self.db.execute("SELECT 1 FROM summaries WHERE key = ?", (key,)).fetchone() is not None
+
+    def put(self, key, summary):
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, created_at) VALUES (?, ?, ?)",
+                (key, summary, time.time()),
+            )
+            self.db.commit()
+            self._remember(key, summary)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self.memory),
+            }
@@ -0,0 +1,194 @@
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Background summarization jobs.
+#
+# LLM calls run on a small worker pool so Flask workers are not tied up for
+# the length of a Gemini call. The pool size is the number of summaries a
+# process works on at once (app.py uses rateLimits.llmConcurrency; the LLM
+# calls themselves are limited by the rate limiter), the number of queued +
+# running jobs is bounded, and
+# identical requests (same cache key) that arrive while a job is in flight
+# are attached to that job instead of starting another LLM call.
+#
+# Streamed summaries are jobs too, so they share the pool, the pending limit
+# and the coalescing: a job submitted with a `stream` function records the
+# summary piece by piece, and every request attached to it (streaming or
+# polling) follows the same single LLM call. The call runs to the end even if
+# the client that started it goes away; the result still lands in the cache.
+DEFAULT_CONCURRENCY = 2
+MAX_PENDING_JOBS = int(os.getenv("SUMMARY_MAX_PENDING_JOBS", "32"))
+RESULT_TTL = 600  # seconds a finished job stays pollable
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+ERROR = "error"
+
+
+class QueueFullError(Exception):
+    """Raised when too many summaries are already queued or running."""
+
+
+class SummaryJob:
+    def __init__(self, key):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = QUEUED
+        self.summary = None
+        self.timings = None
+        self.error = None
+        self.cached = False
+        self.created_at = time.time()
+        self.finished_at = None
+        self.done_event = threading.Event()
+        self.pieces = []  # text generated so far by a streamed job
+        self.progress = threading.Condition()
+
+    def add_piece(self, text):
+        with self.progress:
+            self.pieces.append(text)
+            self.progress.notify_all()
+
+    def finish(self, summary=None, error=None, timings=None):
+        with self.progress:
+            self.summary = summary
+            self.timings = timings
+            self.error = error
+            self.status = ERROR if error else DONE
+            self.finished_at = time.time()
+            self.done_event.set()
+            self.progress.notify_all()
+
+    def wait(self, timeout=None):
+        """Blocks until the job finished or `timeout` seconds passed. Returns True if finished."""
+        return self.done_event.wait(timeout)
+
+    def follow(self, timeout):
+        """
+        Yields the streamed pieces generated so far and then as they arrive,
+        until the job finished. Raises TimeoutError after `timeout` seconds.
+        Jobs that do not stream yield nothing and just finish.
+        """
+        deadline = time.monotonic() + timeout
+        sent = 0
+        while True:
+            with self.progress:
+                while sent == len(self.pieces) and not self.done_event.is_set():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("Timed out waiting for the summary.")
+                    self.progress.wait(remaining)
+                pieces = self.pieces[sent:]
+                finished = self.done_event.is_set()
+            sent += len(pieces)
+            yield from pieces
+            if finished:
+                return
+
+    def to_dict(self):
+        data = {"job_id": self.id, "status": self.status}
+        if self.status == DONE:
+            data["summary"] = self.summary
+            data["cached"] = self.cached
+            if self.timings:
+                data["timings"] = self.timings
+        elif self.status == ERROR:
+            data["error"] = self.error
+        return data
+
+
+class SummaryJobQueue:
+    """
+    Bounded, coalescing job queue in front of a `summarize(article_text)`
+    callable returning the summary or (summary, timings dict).
+    """
+
+    def __init__(self, summarize, cache=None, concurrency=DEFAULT_CONCURRENCY, max_pending=MAX_PENDING_JOBS,
+                 result_ttl=RESULT_TTL, admission=None):
+        self.summarize = summarize
+        self.cache = cache
+        # Called before a new job is queued; raises to reject it, may return a release function for when it ends
+        self.admission = admission
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="summarizer")
+        self.lock = threading.Lock()
+        self.jobs = {}       # job id -> job (in flight and recently finished)
+        self.in_flight = {}  # cache key -> job that is queued or running
+        self.coalesced = 0
+
+    def submit(self, key, article_text, stream=None):
+        """
+        Returns a job for `key`: an already finished one if the summary is
+        cached, the in-flight job for the same key, or a newly queued job.
+        With `stream` (a function(article_text, timings) yielding text pieces)
+        a new job is generated piece by piece; read them with job.follow().
+        """
+        with self.lock:
+            self._expire_finished()
+
+            job = self.in_flight.get(key)
+            if job is not None:
+                self.coalesced += 1
+                return job
+
+            if self.cache is not None:
+                summary = self.cache.get(key)
+                if summary is not None:
+                    job = SummaryJob(key)
+                    job.cached = True
+                    job.finish(summary=summary)
+                    self.jobs[job.id] = job
+                    return job
+
+            if len(self.in_flight) >= self.max_pending:
+                raise QueueFullError("Too many summaries in progress, please retry shortly.")
+            release = self.admission() if self.admission is not None else None
+
+            job = SummaryJob(key)
+            self.jobs[job.id] = job
+            self.in_flight[key] = job
+
+        self.executor.submit(self._run, job, article_text, release, stream)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def pending(self):
+        with self.lock:
+            return len(self.in_flight)
+
+    def _run(self, job, article_text, release=None, stream=None):
+        job.status = RUNNING
+        try:
+            if stream is not None:
+                timings = {}
+                for piece in stream(article_text, timings):
+                    job.add_piece(piece)
+                summary = "".join(job.pieces)
+            else:
+                result = self.summarize(article_text)
+                summary, timings = result if isinstance(result, tuple) else (result, None)
+            if self.cache is not None:
+                self.cache.put(job.key, summary)
+            job.finish(summary=summary, timings=timings)
+        except Exception as e:
+            job.finish(error=f"Failed to generate summary. {e}")
+        finally:
+            if release is not None:
+                release()
+            with self.lock:
+                self.in_flight.pop(job.key, None)
+
+    def _expire_finished(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self.jobs.items() if job.finished_at and job.finished_at < cutoff]
+        for job_id in expired:
+            del self.jobs[job_id]
+
@@ -0,0 +1,95 @@
+import random
+
+import pytest
+
+from newsFeed import NewsFeed
+from newsShards import NewsShards
+from newsStore import NewsStore
+
+CATEGORIES = ["World", "Tech", "Health"]
+
+
+def article(unique_id, category="World", date="2024-05-01", **fields):
+    return dict({"title": f"Title {unique_id}", "summary": "Summary", "img": "img.png", "date": date,
+                 "Time": "12:00:00", "category": category, "uniqueId": unique_id}, **fields)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return NewsStore(str(tmp_path / "news.json"), shards_dir=str(tmp_path / "shards"))
+
+
+def all_ids(shards, category="All", **dates):
+    result = shards.query(category, 1, 50, **dates)
+    return sorted(e["uniqueId"] for e in result["items"]), result["total"]
+
+
+def test_first_publish_to_an_unsharded_archive_shards_the_whole_index(tmp_path):
+    unsharded = NewsStore(str(tmp_path / "news.json"), shards_dir="")
+    unsharded.write_all([article(str(i)) for i in range(4)])
+
+    store = NewsStore(str(tmp_path / "news.json"), shards_dir=str(tmp_path / "shards"))
+    assert not store.shards.available()
+    store.append(article("new"))
+    assert store.shards.available()
+    assert all_ids(store.shards) == (["0", "1", "2", "3", "new"], 5)
+
+
+def test_invalidated_shards_are_rebuilt_on_the_next_publish(store):
+    store.write_all([article(str(i)) for i in range(3)])
+    store.shards.invalidate()
+    store.append(article("new"))
+    assert all_ids(store.shards)[1] == 4
+
+
+def test_edit_that_moves_an_article_leaves_no_copy_in_its_old_shard(store):
+    store.write_all([article("a"), article("b")])
+    store.append(article("a", category="Tech", title="Moved"))
+    store.append(article("b", date="2023-01-15"))
+
+    assert all_ids(store.shards) == (["a", "b"], 2)
+    assert all_ids(store.shards, "World") == (["b"], 1)
+    assert all_ids(store.shards, "Tech") == (["a"], 1)
+    assert all_ids(store.shards, "World", date_from="2024-05-01", date_to="2024-05-31") == ([], 0)
+    breaking = [e["uniqueId"] for e in store.shards.query("Breaking News", 1, 50)["items"]]
+    assert sorted(breaking) == ["a", "b"]
+
+
+def test_manifest_version_keeps_growing_across_invalidate(store):
+    store.write_all([article("a")])
+    etags = [store.shards.etag("x")]
+    versions = [store.shards.read_manifest()["version"]]
+    store.append(article("b"))
+    versions.append(store.shards.read_manifest()["version"])
+    store.shards.invalidate()
+    store.rebuild_shards()
+    versions.append(store.shards.read_manifest()["version"])
+    etags.append(store.shards.etag("x"))
+    assert versions == sorted(versions) and len(set(versions)) == 3
+    assert etags[0] != etags[1]
+
+
+def test_shards_answer_like_the_full_index_after_random_publishing(store):
+    rng = random.Random(3)
+    store.write_all([article(f"s{i}", rng.choice(CATEGORIES), f"2024-0{rng.randint(1, 6)}-1{rng.randint(0, 9)}")
+                     for i in range(40)])
+    for i in range(60):
+        unique_id = f"s{rng.randrange(50)}"  # Mix of new articles and edits
+        store.append(article(unique_id, rng.choice(CATEGORIES), f"2024-0{rng.randint(1, 6)}-2{rng.randint(0, 8)}",
+                             Time=f"1{rng.randint(0, 9)}:00:00"))
+
+    feed = NewsFeed(store)
+    feed.refresh()
+    for category in ["All"] + CATEGORIES:
+        for dates in ({}, {"date_from": "2024-02-15", "date_to": "2024-04-20"}):
+            for page in (1, 2):
+                expected = feed.query(category, page, 7, **dates)
+                actual = store.shards.query(category, page, 7, **dates)
+                assert actual["total"] == expected["total"]
+                assert [e["uniqueId"] for e in actual["items"]] == [e["uniqueId"] for e in expected["items"]]
+
+
+def test_missing_manifest_reads_as_empty(tmp_path):
+    shards = NewsShards(str(tmp_path / "shards"))
+    assert not shards.available()
+    assert shards.read_manifest()["categories"] == {}
@@ -0,0 +1,104 @@
+import os
+import json
+import time
+import threading
+
+import pytest
+
+import newsStore
+from newsStore import NewsStore, merge_entries, write_json_atomic
+
+
+def article(unique_id, **fields):
+    return dict({"title": f"Title {unique_id}", "summary": "Summary", "img": "img.png", "date": "2024-05-01",
+                 "category": "World", "uniqueId": unique_id}, **fields)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return NewsStore(str(tmp_path / "news.json"), shards_dir="")
+
+
+def test_append_replaces_records_with_the_same_id_in_place(store):
+    store.append(article("a"))
+    store.append(article("b"))
+    store.append(article("a", title="Edited"))
+    entries = store.load()
+    assert [e["uniqueId"] for e in entries] == ["a", "b"]
+    assert entries[0]["title"] == "Edited"
+
+
+def test_seq_numbers_only_grow_and_write_all_starts_an_epoch(store):
+    seqs = [store.append(article(str(i))) for i in range(3)]
+    assert seqs == sorted(seqs) and len(set(seqs)) == 3
+    store.write_all([article("x")])
+    sequence = store.read_sequence()
+    assert sequence["reset"] == sequence["seq"] > seqs[-1]
+    assert store.append(article("y")) > sequence["seq"]
+
+
+def test_torn_last_log_line_is_skipped_and_terminated_by_the_next_append(store):
+    store.append(article("a"))
+    with open(store.log_path, "ab") as f:
+        f.write(b'{"uniqueId": "torn", "tit')  # Writer crashed in the middle of the line
+    assert [e["uniqueId"] for e in store.load()] == ["a"]
+
+    store.append(article("b"))
+    assert [e["uniqueId"] for e in store.load()] == ["a", "b"]
+
+
+def test_compaction_folds_the_log_into_the_snapshot(tmp_path):
+    store = NewsStore(str(tmp_path / "news.json"), compact_every=3, shards_dir="")
+    for i in range(3):
+        store.append(article(str(i)))
+    assert store.count_log_records() == 0
+    assert [e["uniqueId"] for e in store.read_snapshot()] == ["0", "1", "2"]
+    store.append(article("3"))
+    assert [e["uniqueId"] for e in store.load()] == ["0", "1", "2", "3"]
+
+
+def test_crash_before_the_log_truncate_does_not_duplicate_records(store):
+    store.append(article("a"))
+    store.append({"title": "Record without an id"})
+    # Compaction wrote the snapshot, then the process died before emptying the log
+    write_json_atomic(store.json_path, store.load(), indent=4)
+    entries = store.load()
+    assert len(entries) == 2
+    assert [e.get("uniqueId") for e in entries] == ["a", None]
+
+
+def test_merge_keeps_records_without_id_or_seq_apart():
+    merged = merge_entries([{"title": "x"}], [{"title": "x"}, {"title": "y", "seq": 4}, {"title": "y2", "seq": 4}])
+    assert [e["title"] for e in merged] == ["x", "x", "y2"]
+
+
+def test_stale_lock_of_a_crashed_writer_is_taken_over(store):
+    with open(store.lock_path, "w") as f:
+        f.write("12345")
+    old = time.time() - newsStore.LOCK_TIMEOUT - 5
+    os.utime(store.lock_path, (old, old))
+    store.append(article("a"))
+    assert not os.path.exists(store.lock_path)
+
+
+def test_held_lock_is_kept_fresh_and_not_taken_over(store, monkeypatch):
+    monkeypatch.setattr(newsStore, "LOCK_TIMEOUT", 0.3)
+    acquired = threading.Event()
+
+    def second_writer():
+        with store.lock():
+            acquired.set()
+
+    with store.lock():
+        time.sleep(0.5)  # Longer than LOCK_TIMEOUT: only the heartbeat keeps the lock
+        other = threading.Thread(target=second_writer, daemon=True)
+        other.start()
+        assert not acquired.wait(0.6)
+    assert acquired.wait(2)
+
+
+def test_log_records_are_json_lines_with_seq(store):
+    store.append(article("a"))
+    with open(store.log_path, encoding="utf-8") as f:
+        record = json.loads(f.readline())
+    assert record["uniqueId"] == "a" and isinstance(record["seq"], int)
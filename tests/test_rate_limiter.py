@@ -0,0 +1,76 @@
+import threading
+
+import pytest
+
+from rateLimiter import RateLimiter, RateLimited, DEFAULT_SETTINGS
+
+
+def limiter(tmp_path, **settings):
+    return RateLimiter(dict(DEFAULT_SETTINGS, **settings), db_path=str(tmp_path / "limits.sqlite3"))
+
+
+def test_client_bucket_allows_the_burst_then_rejects_with_retry_after(tmp_path):
+    rl = limiter(tmp_path, perClientBurst=3, perClientRate=0.5)
+    for _ in range(3):
+        rl.check_client("1.2.3.4")
+    with pytest.raises(RateLimited) as rejected:
+        rl.check_client("1.2.3.4")
+    assert rejected.value.reason == "client"
+    assert 0 < rejected.value.retry_after <= 2
+    rl.check_client("5.6.7.8")  # Other clients have their own bucket
+
+
+def test_concurrency_leases_are_shared_by_every_limiter_on_the_same_file(tmp_path):
+    first, second = limiter(tmp_path, llmConcurrency=2), limiter(tmp_path, llmConcurrency=2)
+    release = first.admit_llm_call()
+    second.admit_llm_call()
+    with pytest.raises(RateLimited) as rejected:
+        first.admit_llm_call()
+    assert rejected.value.reason == "concurrency"
+    assert first.running_llm_calls() == 2
+    release()
+    second.admit_llm_call()
+
+
+def test_waiting_admission_gets_the_slot_once_it_is_released(tmp_path):
+    rl = limiter(tmp_path, llmConcurrency=1)
+    release = rl.admit_llm_call()
+    threading.Timer(0.2, release).start()
+    rl.admit_llm_call(wait=5)()
+    assert rl.running_llm_calls() == 0
+
+
+def test_expired_lease_of_a_dead_worker_frees_its_slot(tmp_path):
+    rl = limiter(tmp_path, llmConcurrency=1, llmLeaseSeconds=-1)
+    rl.admit_llm_call()  # Never released
+    rl.admit_llm_call()
+
+
+def test_every_call_is_charged_to_the_hourly_budget(tmp_path):
+    rl = limiter(tmp_path, llmBudgetPerHour=2)
+    rl.check_llm_budget()
+    rl.admit_llm_call()()
+    rl.admit_llm_call()()
+    with pytest.raises(RateLimited) as rejected:
+        rl.check_llm_budget()
+    assert rejected.value.reason == "budget"
+    with pytest.raises(RateLimited):
+        rl.admit_llm_call(wait=5)  # Waiting only applies to busy slots, not to the budget
+
+
+def test_map_reduce_summary_is_charged_per_backend_call(tmp_path):
+    from summarizer import create_summarizer
+    rl = limiter(tmp_path, llmBudgetPerHour=100)
+    admitted = []
+
+    def admit():
+        admitted.append(1)
+        return rl.admit_llm_call(wait=5)
+
+    summarizer = create_summarizer({"summarizer": {"mapReduceThreshold": 200, "chunkTokens": 100}},
+                                   backend="stub", admit=admit)
+    text = "\n\n".join(f"Paragraph {i} about the story. " * 8 for i in range(6))
+    _, timings = summarizer.summarize_with_timings(text)
+    assert timings["strategy"] == "map-reduce" and timings["reduce_rounds"] == 1
+    assert len(admitted) == timings["chunks"] + 1  # Every chunk plus the final reduce call
+    assert rl.running_llm_calls() == 0
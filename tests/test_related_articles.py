@@ -0,0 +1,67 @@
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+from newsStore import NewsStore
+from relatedArticles import RelatedArticles
+
+TOPICS = {
+    "space": "rocket launch orbit satellite astronauts",
+    "football": "goal striker league match referee",
+    "markets": "stocks shares investors inflation bonds",
+}
+
+
+def article(unique_id, topic, extra=""):
+    words = TOPICS[topic].split()
+    return {"title": f"{words[0]} {words[1]} {extra}", "summary": f"{' '.join(words[1:])} {extra}",
+            "img": "img.png", "date": "2024-05-01", "category": "World", "uniqueId": unique_id}
+
+
+@pytest.fixture
+def related(tmp_path):
+    store = NewsStore(str(tmp_path / "news.json"), shards_dir="")
+    store.write_all([article(f"{topic}{i}", topic, f"note{i}") for topic in TOPICS for i in range(4)])
+    index = RelatedArticles(store, news_dir=None, index_path=str(tmp_path / "related.npz"))
+    index.build()
+    return index
+
+
+def neighbour_ids(index, unique_id):
+    return [other for other, _ in index.related(unique_id)]
+
+
+def test_neighbours_are_articles_on_the_same_topic(related):
+    assert set(neighbour_ids(related, "space0")[:3]) == {"space1", "space2", "space3"}
+    assert related.related("missing") is None
+
+
+def test_update_adds_a_published_article_like_a_full_build(related, tmp_path):
+    published = article("space-new", "space", "note1")
+    related.update([published])
+    incremental = neighbour_ids(related, "space-new")
+    assert incremental[0] == "space1"  # Shares the extra word as well
+    assert "space-new" in neighbour_ids(related, "space1")
+
+    rebuilt = RelatedArticles(related.store, news_dir=None, index_path=str(tmp_path / "rebuilt.npz"))
+    related.store.append(published)
+    rebuilt.build()
+    assert set(incremental) == set(neighbour_ids(rebuilt, "space-new"))
+
+
+def test_edited_article_moves_to_its_new_topic(related):
+    related.update([article("space0", "football", "note0")])
+    assert neighbour_ids(related, "space0")[0] == "football0"  # Same topic and the same extra word
+    assert set(neighbour_ids(related, "space0")[1:4]) == {"football1", "football2", "football3"}
+    assert "space0" not in neighbour_ids(related, "space1")  # Its old row is no longer a neighbour
+    assert "space0" in neighbour_ids(related, "football1")
+
+
+def test_saved_index_loads_with_the_same_answers(related, tmp_path):
+    related.update([article("markets-new", "markets")])
+    related.save()
+    loaded = RelatedArticles(related.store, news_dir=None, index_path=related.index_path)
+    assert loaded.load()
+    for unique_id in ("markets-new", "space0", "football2"):
+        assert loaded.related(unique_id) == related.related(unique_id)
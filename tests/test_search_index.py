@@ -0,0 +1,82 @@
+import random
+
+import searchIndex
+from searchIndex import SearchIndex, tokenize
+
+
+def ids(results):
+    return [doc_id for _, doc_id in results]
+
+
+def make_index():
+    index = SearchIndex()
+    index.add("title", "Election results announced", "Counting finished overnight")
+    index.add("summary", "Results of the night", "The election went smoothly")
+    index.add("other", "Football final", "A late goal decided the match")
+    return index
+
+
+def test_tokenize_lowercases_words():
+    assert tokenize("Hello, World! 2024") == ["hello", "world", "2024"]
+
+
+def test_title_matches_rank_above_summary_matches():
+    total, results = make_index().search("election", prefix=False)
+    assert total == 2
+    assert ids(results) == ["title", "summary"]
+
+
+def test_every_query_word_must_match():
+    index = make_index()
+    assert ids(index.search("election overnight", prefix=False)[1]) == ["title"]
+    assert index.search("election goal", prefix=False) == (0, [])
+
+
+def test_last_word_matches_as_a_prefix():
+    index = make_index()
+    assert set(ids(index.search("elec")[1])) == {"title", "summary"}
+    assert index.search("elec", prefix=False) == (0, [])
+    assert index.search("elec ")[0] == 0  # A finished word (trailing space) is matched exactly
+    assert index.search("el")[0] == 0     # Too short to expand
+
+
+def test_limit_and_within_restrict_the_results_but_total_counts_all_matches():
+    index = make_index()
+    total, results = index.search("election", limit=1)
+    assert total == 2 and ids(results) == ["title"]
+    total, results = index.search("election", within={"summary", "other"})
+    assert total == 1 and ids(results) == ["summary"]
+
+
+def test_removed_and_replaced_documents_are_not_found_under_old_terms():
+    index = make_index()
+    index.remove("title")
+    assert ids(index.search("election")[1]) == ["summary"]
+    index.add("summary", "Weather report", "Sunny")
+    assert index.search("election")[0] == 0
+    assert ids(index.search("sunny")[1]) == ["summary"]
+    assert len(index) == 2
+
+
+def test_bulk_build_ranks_like_incremental_adds():
+    documents = [(f"d{i}", f"Story {i} about markets", "Prices " * (i % 5 + 1)) for i in range(50)]
+    built = SearchIndex()
+    built.build(documents)
+    added = SearchIndex()
+    for document in documents:
+        added.add(*document)
+    assert built.search("prices markets") == added.search("prices markets")
+
+
+def test_limited_search_of_a_large_match_set_finds_the_best_matches(monkeypatch):
+    rng = random.Random(7)
+    index = SearchIndex()
+    for i in range(3000):
+        filler = " ".join(rng.choice(["alpha", "beta", "gamma", "delta"]) for _ in range(rng.randint(3, 30)))
+        index.add(f"d{i}", f"news {filler}", "news " * rng.randint(1, 4))
+    exact_total, exact = index.search("news", prefix=False)
+
+    monkeypatch.setattr(searchIndex, "EXACT_SCORING_LIMIT", 100)
+    total, fast = index.search("news", prefix=False, limit=10)
+    assert total == exact_total == 3000
+    assert [round(score, 9) for score, _ in fast] == [round(score, 9) for score, _ in exact[:10]]
@@ -0,0 +1,109 @@
+import threading
+
+import pytest
+
+from summaryJobs import SummaryJobQueue, QueueFullError, DONE, ERROR
+
+
+class DictCache:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def put(self, key, summary):
+        self.data[key] = summary
+
+
+class GatedSummarizer:
+    """summarize() that blocks until released, counting its calls."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.calls = 0
+
+    def __call__(self, article_text):
+        self.calls += 1
+        self.gate.wait(5)
+        return f"summary of {article_text}", {"strategy": "single"}
+
+
+def test_identical_requests_share_one_call():
+    summarize = GatedSummarizer()
+    queue = SummaryJobQueue(summarize, cache=DictCache(), concurrency=2)
+    first = queue.submit("k", "text")
+    second = queue.submit("k", "text")
+    other = queue.submit("other", "more text")
+    assert first is second and first is not other
+    summarize.gate.set()
+    assert first.wait(5) and other.wait(5)
+    assert summarize.calls == 2
+    assert first.status == DONE and first.summary == "summary of text"
+    assert queue.coalesced == 1 and queue.pending() == 0
+
+
+def test_cached_summary_finishes_at_once_without_a_call():
+    summarize = GatedSummarizer()
+    cache = DictCache()
+    cache.put("k", "from cache")
+    job = SummaryJobQueue(summarize, cache=cache).submit("k", "text")
+    assert job.status == DONE and job.cached and job.summary == "from cache"
+    assert summarize.calls == 0
+
+
+def test_full_queue_and_admission_reject_new_jobs():
+    summarize = GatedSummarizer()
+    queue = SummaryJobQueue(summarize, concurrency=1, max_pending=1)
+    queue.submit("a", "text")
+    with pytest.raises(QueueFullError):
+        queue.submit("b", "text")
+    summarize.gate.set()
+
+    def reject():
+        raise RuntimeError("over budget")
+
+    with pytest.raises(RuntimeError):
+        SummaryJobQueue(summarize, admission=reject).submit("c", "text")
+
+
+def test_failed_job_reports_the_error_and_releases_its_admission():
+    released = []
+
+    def fail(article_text):
+        raise ValueError("backend down")
+
+    queue = SummaryJobQueue(fail, admission=lambda: (lambda: released.append(1)))
+    job = queue.submit("k", "text")
+    assert job.wait(5)
+    assert job.status == ERROR and "backend down" in job.error
+    assert released == [1] and queue.pending() == 0
+
+
+def test_streamed_job_is_followed_by_every_request_for_the_key():
+    gate = threading.Event()
+
+    def stream(article_text, timings):
+        yield "Hello"
+        gate.wait(5)
+        yield " world"
+        timings["strategy"] = "single"
+
+    queue = SummaryJobQueue(GatedSummarizer(), cache=DictCache())
+    job = queue.submit("k", "text", stream=stream)
+    first = job.follow(5)
+    assert next(first) == "Hello"
+    assert queue.submit("k", "text") is job  # A polling request joins the stream
+    gate.set()
+    assert list(first) == [" world"]
+    assert list(job.follow(5)) == ["Hello", " world"]  # Late followers get the pieces replayed
+    assert job.summary == "Hello world" and job.timings == {"strategy": "single"}
+    assert queue.cache.get("k") == "Hello world"
+
+
+def test_follow_times_out_while_nothing_arrives():
+    summarize = GatedSummarizer()
+    job = SummaryJobQueue(summarize).submit("k", "text")
+    with pytest.raises(TimeoutError):
+        list(job.follow(0.1))
+    summarize.gate.set()
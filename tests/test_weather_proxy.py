@@ -0,0 +1,81 @@
+import time
+import threading
+
+import pytest
+
+from weatherProxy import (WeatherProxy, StubWeatherProvider, WeatherUnavailable, DEFAULT_SETTINGS, FRESH, STALE,
+                          MISS, grid_cell, weather_settings)
+
+
+def proxy(delay=0.0, **settings):
+    settings = dict(DEFAULT_SETTINGS, provider="stub", stubDelay=delay, **settings)
+    calls = []
+    return WeatherProxy(settings, on_upstream_call=lambda: calls.append(1)), calls
+
+
+class FlakyProvider(StubWeatherProvider):
+    def __init__(self):
+        super().__init__()
+        self.failing = False
+
+    def fetch(self, lat, lon):
+        if self.failing:
+            self.calls += 1
+            raise WeatherUnavailable("provider down")
+        return super().fetch(lat, lon)
+
+
+def test_points_in_one_grid_cell_share_a_cached_answer():
+    weather, calls = proxy()
+    data, state, max_age = weather.get(51.501, -0.121)
+    assert state == MISS and max_age > 0
+    assert grid_cell(51.501, -0.121, 0.1)[0] == grid_cell(51.549, -0.101, 0.1)[0]
+    again, state, _ = weather.get(51.549, -0.101)
+    assert state == FRESH and again is data
+    assert weather.provider.calls == 1 and len(calls) == 1
+
+
+def test_concurrent_misses_for_a_cell_make_one_upstream_call():
+    weather, _ = proxy(delay=0.2)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(weather.get(10.0, 10.0))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 5 and weather.provider.calls == 1
+
+
+def test_stale_answer_is_served_at_once_while_one_refresh_runs():
+    weather, _ = proxy(delay=0.1, ttlSeconds=0.1, staleSeconds=60)
+    weather.get(10.0, 10.0)
+    time.sleep(0.15)
+    started = time.perf_counter()
+    _, state, max_age = weather.get(10.0, 10.0)
+    assert state == STALE and max_age == 0 and time.perf_counter() - started < 0.05
+    weather.get(10.0, 10.0)  # Still stale; the refresh is already running
+    time.sleep(0.3)
+    assert weather.provider.calls == 2
+
+
+def test_failures_are_remembered_and_the_last_good_answer_is_served():
+    settings = dict(DEFAULT_SETTINGS, ttlSeconds=0, staleSeconds=0, errorTtlSeconds=60)
+    provider = FlakyProvider()
+    weather = WeatherProxy(settings, provider=provider)
+    good, _, _ = weather.get(10.0, 10.0)
+
+    provider.failing = True
+    data, state, _ = weather.get(10.0, 10.0)
+    assert state == STALE and data is good
+    weather.get(10.0, 10.0)
+    assert provider.calls == 2  # The failure is not retried within errorTtlSeconds
+
+    with pytest.raises(WeatherUnavailable):
+        weather.get(-40.0, 100.0)
+
+
+def test_api_key_comes_only_from_the_environment(monkeypatch):
+    monkeypatch.setenv("WEATHER_API_KEY", "from-env")
+    assert weather_settings({"weatherApi": {"key": "from-config"}})["key"] == "from-env"
+    monkeypatch.delenv("WEATHER_API_KEY")
+    assert weather_settings({"weatherApi": {"key": "from-config"}})["key"] == ""
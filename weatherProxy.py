@@ -0,0 +1,245 @@
+import os
+import math
+import time
+import zlib
+import threading
+import logging
+from collections import OrderedDict
+
+# Server-side proxy for the weather widget (GET /weather?lat=&lon=).
+#
+# Visitors' coordinates are snapped to a grid cell (`gridDegrees`, 0.1 deg is
+# about 11 km) and the upstream provider is asked about the cell centre, so
+# everyone in the same town shares one cached answer. Per cell:
+#   - younger than `ttlSeconds`                  -> served from the cache;
+#   - older, but younger than ttl + staleSeconds -> served at once while one
+#                                                   background call refreshes it;
+#   - missing or older                           -> fetched; concurrent requests
+#                                                   for the cell wait on that one call.
+# A failed upstream call is remembered for `errorTtlSeconds` (no retry storm
+# while the provider is down), and the last good answer is served instead
+# whenever there is one, however old. Upstream traffic therefore grows with
+# the number of cells visited per TTL, not with the number of visitors.
+#
+# The cache is per process (at most `maxCells` cells, least recently used
+# dropped first). Settings come from the "weatherApi" section of config.json,
+# except the API key: config.json is served to browsers, so the key is read
+# from WEATHER_API_KEY in the environment (or .env) only. WEATHER_PROVIDER=stub
+# swaps in a local provider that makes up readings, for tests and offline
+# development.
+log = logging.getLogger(__name__)
+DEFAULT_SETTINGS = {
+    "provider": "weatherapi",
+    "key": "",
+    "baseUrl": "https://api.weatherapi.com/v1/current.json",
+    "gridDegrees": 0.1,
+    "ttlSeconds": 600,
+    "staleSeconds": 3600,
+    "errorTtlSeconds": 30,
+    "maxCells": 5000,
+    "timeout": 10,
+    "stubDelay": 0.0,
+}
+PLACEHOLDER_KEY = "YOUR_WEATHERAPI_API_KEY"
+FRESH, STALE, MISS = "fresh", "stale", "miss"
+STUB_CONDITIONS = ["Sunny", "Partly cloudy", "Overcast", "Light rain", "Mist", "Thundery outbreaks", "Light snow"]
+
+
+class WeatherUnavailable(Exception):
+    """Raised when there is no reading for a cell: not cached and the provider failed."""
+
+
+def weather_settings(config):
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update((config or {}).get("weatherApi", {}))
+    settings["key"] = os.getenv("WEATHER_API_KEY", "")  # Never from config.json, which browsers can read
+    provider = os.getenv("WEATHER_PROVIDER")
+    if provider:
+        settings["provider"] = provider
+    return settings
+
+
+def grid_cell(lat, lon, degrees):
+    """(cell key, centre latitude, centre longitude) of the grid cell containing a point."""
+    row = math.floor(lat / degrees)
+    col = math.floor(lon / degrees)
+    centre_lat = round((row + 0.5) * degrees, 4)
+    centre_lon = round((col + 0.5) * degrees, 4)
+    return f"{row}:{col}", centre_lat, centre_lon
+
+
+class WeatherApiProvider:
+    """Current conditions from WeatherAPI.com, trimmed to what the widget shows."""
+
+    name = "weatherapi"
+
+    def __init__(self, settings, session_factory=None):
+        self.key = settings["key"]
+        self.base_url = settings["baseUrl"]
+        self.timeout = float(settings["timeout"])
+        self.session_factory = session_factory
+
+    @property
+    def configured(self):
+        return bool(self.key) and self.key != PLACEHOLDER_KEY
+
+    def fetch(self, lat, lon):
+        if not self.configured:
+            raise WeatherUnavailable("WEATHER_API_KEY is not set on the server.")
+        import requests
+        session = self.session_factory() if self.session_factory else requests
+        try:
+            response = session.get(self.base_url, params={"key": self.key, "q": f"{lat},{lon}"},
+                                   timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise WeatherUnavailable(f"Weather provider request failed: {e}") from None
+        if not isinstance(data, dict) or "location" not in data or "current" not in data:
+            raise WeatherUnavailable("Weather provider returned an unexpected response.")
+        return {"location": data["location"], "current": data["current"]}
+
+
+class StubWeatherProvider:
+    """Deterministic made-up readings per location; counts its calls."""
+
+    name = "stub"
+    configured = True
+
+    def __init__(self, settings=None):
+        self.delay = float((settings or DEFAULT_SETTINGS).get("stubDelay", 0.0))
+        self.calls = 0
+
+    def fetch(self, lat, lon):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        seed = zlib.crc32(f"{lat},{lon}".encode("utf-8"))
+        temp_c = round(30 - abs(lat) * 0.5 + (seed % 100) / 10 - 5, 1)
+        return {
+            "location": {"name": f"Stub {lat:.2f},{lon:.2f}", "region": "", "country": "", "lat": lat, "lon": lon},
+            "current": {
+                "temp_c": temp_c,
+                "temp_f": round(temp_c * 9 / 5 + 32, 1),
+                "condition": {"text": STUB_CONDITIONS[seed % len(STUB_CONDITIONS)]},
+                "last_updated_epoch": int(time.time()),
+            },
+        }
+
+
+def create_provider(settings, session_factory=None):
+    if settings["provider"] == "stub":
+        return StubWeatherProvider(settings)
+    if settings["provider"] == "weatherapi":
+        return WeatherApiProvider(settings, session_factory)
+    raise ValueError(f"Unknown weather provider: {settings['provider']}")
+
+
+class _Cell:
+    __slots__ = ("data", "fetched_at", "failed_at", "error", "refreshing")
+
+    def __init__(self):
+        self.data = None
+        self.fetched_at = 0.0
+        self.failed_at = 0.0
+        self.error = None
+        self.refreshing = None  # threading.Event while an upstream call for the cell runs
+
+
+class WeatherProxy:
+    """Grid-cell cache with request coalescing and stale-while-revalidate in front of a provider."""
+
+    def __init__(self, settings=None, provider=None, session_factory=None, on_upstream_call=None):
+        settings = settings or DEFAULT_SETTINGS
+        self.provider = provider or create_provider(settings, session_factory)
+        self.grid_degrees = float(settings["gridDegrees"])
+        self.ttl = float(settings["ttlSeconds"])
+        self.stale = float(settings["staleSeconds"])
+        self.error_ttl = float(settings["errorTtlSeconds"])
+        self.max_cells = int(settings["maxCells"])
+        self.timeout = float(settings["timeout"])
+        self.lock = threading.Lock()
+        self.cells = OrderedDict()  # cell key -> _Cell, least recently used first
+        self.upstream_calls = 0
+        self.on_upstream_call = on_upstream_call  # Called once per provider call, e.g. to count it
+        self.counts = {FRESH: 0, STALE: 0, MISS: 0}
+
+    def get(self, lat, lon):
+        """
+        Weather for a point: (data, state, max_age) where state is fresh / stale /
+        miss and max_age is how long the answer may be cached by the client.
+        Raises WeatherUnavailable when there is nothing to serve.
+        """
+        key, centre_lat, centre_lon = grid_cell(lat, lon, self.grid_degrees)
+        with self.lock:
+            cell = self.cells.get(key)
+            if cell is None:
+                cell = self.cells[key] = _Cell()
+                while len(self.cells) > self.max_cells:
+                    self.cells.popitem(last=False)
+            self.cells.move_to_end(key)
+
+            now = time.time()
+            age = now - cell.fetched_at
+            if cell.data is not None and age < self.ttl:
+                return self._answer(cell.data, FRESH, self.ttl - age)
+            if cell.data is not None and age < self.ttl + self.stale:
+                if cell.refreshing is None and now - cell.failed_at >= self.error_ttl:
+                    self._start_fetch(cell)
+                    threading.Thread(target=self._fetch, args=(cell, centre_lat, centre_lon),
+                                     name="weather-refresh", daemon=True).start()
+                return self._answer(cell.data, STALE, 0)
+            if now - cell.failed_at < self.error_ttl:
+                return self._fallback(cell)
+
+            leader = cell.refreshing is None
+            if leader:
+                self._start_fetch(cell)
+            done = cell.refreshing
+
+        if leader:
+            self._fetch(cell, centre_lat, centre_lon)
+        else:
+            done.wait(self.timeout)  # Coalesced: another request is already asking the provider
+
+        with self.lock:
+            if cell.data is not None and time.time() - cell.fetched_at < self.ttl:
+                return self._answer(cell.data, MISS, self.ttl - (time.time() - cell.fetched_at))
+            return self._fallback(cell)
+
+    def _answer(self, data, state, max_age):
+        self.counts[state] += 1
+        return data, state, max(0, int(max_age))
+
+    def _fallback(self, cell):
+        """The last good reading however old, or the provider's error."""
+        if cell.data is not None:
+            return self._answer(cell.data, STALE, 0)
+        raise WeatherUnavailable(cell.error or "Weather data is not available yet.")
+
+    def _start_fetch(self, cell):
+        cell.refreshing = threading.Event()
+        self.upstream_calls += 1
+        if self.on_upstream_call is not None:
+            self.on_upstream_call()
+
+    def _fetch(self, cell, lat, lon):
+        """Runs one upstream call for a cell (the caller has set cell.refreshing)."""
+        try:
+            data = self.provider.fetch(lat, lon)
+        except WeatherUnavailable as e:
+            data, error = None, str(e)
+        except Exception as e:
+            data, error = None, f"Weather provider failed: {e}"
+        with self.lock:
+            if data is not None:
+                cell.data, cell.fetched_at, cell.error = data, time.time(), None
+            else:
+                log.warning("Weather update failed: %s", error)
+                cell.failed_at, cell.error = time.time(), error
+            done, cell.refreshing = cell.refreshing, None
+        done.set()
+
+    def stats(self):
+        with self.lock:
+            return {"cells": len(self.cells), "upstream_calls": self.upstream_calls, **self.counts}